@@ -0,0 +1,111 @@
+"""
+Upstream Audio Coalescing
+
+Every audio message the relay forwards becomes its own LiveRequest, IngestQueue
+entry, base64 + JSON realtime_input frame and model-side message, so the fixed
+per-message cost scales with how finely the client chops its audio, not with
+how much audio there is. The AudioCoalescer sits in front of the IngestQueue
+and merges consecutive PCM chunks until at least AUDIO_COALESCE_MS of audio is
+pending, then forwards them as one blob.
+
+Chunks already at or above the target pass straight through (the web client's
+64 ms worklet chunks are untouched at the default 60 ms). Pending audio is
+flushed early so coalescing never holds back the end of an utterance:
+
+  speech_end   the voice gate closed (voice_activity.py)
+  text         the user sent text input
+  timer        the oldest pending chunk has waited AUDIO_COALESCE_MS
+  mime         the stream switched format
+
+A merged blob carries the receive time of its oldest chunk, so the
+relay_to_model latency (clock_sync.py) includes the time spent waiting here.
+Set AUDIO_COALESCE_MS=0 to disable.
+"""
+
+import asyncio
+import os
+
+from google.adk.agents.live_request_queue import LiveRequest
+from google.genai import types
+
+from ingest_queue import IngestQueue  # type: ignore
+
+AUDIO_COALESCE_MS = float(os.getenv("AUDIO_COALESCE_MS", "60"))
+
+PCM_RATES = {"audio/pcm;rate=16000": 16000, "audio/pcm": 16000, "audio/pcm;rate=24000": 24000}
+
+
+class AudioCoalescer:
+    """Per-session merger of small PCM chunks in front of an IngestQueue."""
+
+    def __init__(self, queue: IngestQueue, target_ms: float = AUDIO_COALESCE_MS) -> None:
+        self._queue = queue
+        self.target_ms = target_ms
+        self._pending = bytearray()
+        self._mime: str | None = None
+        self._first_received: float | None = None
+        self._timer: asyncio.TimerHandle | None = None
+
+        self.chunks_in = 0
+        self.blobs_out = 0
+        self.flushes = {"speech_end": 0, "text": 0, "timer": 0, "mime": 0}
+
+    def _target_bytes(self, mime_type: str) -> int:
+        return int(PCM_RATES.get(mime_type, 16000) * self.target_ms / 1000) * 2
+
+    async def put(self, mime_type: str, data: bytes, received_at: float) -> None:
+        self.chunks_in += 1
+        if self._pending and mime_type != self._mime:
+            self.flush("mime")
+        if self.target_ms <= 0 or mime_type not in PCM_RATES:
+            await self._forward(mime_type, data, received_at)
+            return
+        target = self._target_bytes(mime_type)
+        if not self._pending and len(data) >= target:
+            await self._forward(mime_type, data, received_at)
+            return
+
+        if not self._pending:
+            self._mime = mime_type
+            self._first_received = received_at
+            self._timer = asyncio.get_running_loop().call_later(self.target_ms / 1000, self.flush, "timer")
+        self._pending += data
+        if len(self._pending) >= target:
+            data, received_at = self._take()
+            await self._forward(mime_type, data, received_at)
+
+    def flush(self, reason: str) -> None:
+        """Forward whatever is pending now (no backpressure wait)."""
+        if not self._pending:
+            return
+        self.flushes[reason] += 1
+        mime_type = self._mime
+        data, received_at = self._take()
+        self.blobs_out += 1
+        self._queue.send(LiveRequest(blob=types.Blob(mime_type=mime_type, data=data)), received_at)
+
+    def _take(self) -> tuple[bytes, float | None]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        data, received_at = bytes(self._pending), self._first_received
+        self._pending.clear()
+        self._first_received = None
+        return data, received_at
+
+    async def _forward(self, mime_type: str, data: bytes, received_at: float | None) -> None:
+        self.blobs_out += 1
+        await self._queue.put_realtime(types.Blob(mime_type=mime_type, data=data), received_at)
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "chunks_in": self.chunks_in,
+            "blobs_out": self.blobs_out,
+            "merge_ratio": round(self.chunks_in / self.blobs_out, 2) if self.blobs_out else 0.0,
+            **{f"flush_{reason}": count for reason, count in self.flushes.items()},
+        }
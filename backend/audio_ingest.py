@@ -0,0 +1,236 @@
+"""
+Compressed Audio Ingest
+
+Raw 16 kHz PCM costs the client 256 kbit/s of uplink, which on mobile networks
+is most of the upstream latency. Clients may instead send any of these
+formats, which the relay decodes to 16 kHz mono PCM before the voice gate and
+the IngestQueue ever see them:
+
+  audio/pcm;rate=<hz>     16-bit PCM at the capture rate (48000 / 44100 /
+                          24000 …), so the browser can skip its own resampler
+  audio/pcmu;rate=<hz>    G.711 µ-law, 8 bits per sample: 128 kbit/s at 16 kHz,
+                          64 kbit/s at 8 kHz. Cheap to encode in a worklet.
+  audio/opus              raw Opus packets, one per message (e.g. from a
+                          WebCodecs AudioEncoder): ~24 kbit/s. Needs PyAV
+                          (the `opus` extra); without it Opus is rejected.
+
+Decoding and resampling run in a small shared thread pool (numpy and libopus
+release the GIL), so the event loop only waits on a future. Each session has
+one AudioIngest, which keeps per-format decoder state (resampler phase and
+filter history, the Opus decoder) across chunks. 16 kHz PCM and unknown
+formats pass through without leaving the event loop. Chunks that fail to
+decode, or declare a rate outside INGEST_MIN_RATE..INGEST_MAX_RATE (a tiny rate
+would make the resampler expand every chunk by orders of magnitude), are
+dropped and logged once per format; the session carries on. At most
+INGEST_MAX_DECODERS decoders are kept per session, since the mime type of a
+JSON message is whatever the client wrote.
+
+Per-session wire / PCM byte counts and decode CPU time are logged at session
+end and added to relay_audio_ingest_bytes_total / relay_audio_decode_seconds_total.
+"""
+
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from loguru import logger
+
+try:
+    import av
+except ImportError:  # optional: pip install 'backend[opus]'
+    av = None
+
+AUDIO_DECODE_WORKERS = int(os.getenv("AUDIO_DECODE_WORKERS", "2"))
+RESAMPLE_TAPS = int(os.getenv("RESAMPLE_TAPS", "33"))
+
+TARGET_RATE = 16000
+# Accepted `rate=` range for PCM / µ-law, matching the rates in wire_protocol.MIME_TYPES.
+INGEST_MIN_RATE = 8000
+INGEST_MAX_RATE = 48000
+INGEST_MAX_DECODERS = 4
+TARGET_MIME = "audio/pcm;rate=16000"
+PASSTHROUGH_MIME_TYPES = frozenset({TARGET_MIME, "audio/pcm"})
+OPUS_AVAILABLE = av is not None
+
+_executor = ThreadPoolExecutor(max_workers=AUDIO_DECODE_WORKERS, thread_name_prefix="audio-decode")
+
+
+class AudioDecodeError(ValueError):
+    """Raised when a chunk cannot be decoded in its declared format."""
+
+
+def parse_mime(mime_type: str) -> tuple[str, int | None]:
+    """("audio/pcm", 48000) from "audio/pcm;rate=48000"."""
+    base, *params = (part.strip() for part in mime_type.split(";"))
+    rate = None
+    for param in params:
+        key, _, value = param.partition("=")
+        if key.strip() == "rate" and value.strip().isdigit():
+            rate = int(value)
+    return base.lower(), rate
+
+
+def _ulaw_table() -> np.ndarray:
+    code = ~np.arange(256, dtype=np.uint8)
+    exponent = (code >> 4) & 0x07
+    mantissa = (code & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(code & 0x80, -magnitude, magnitude).astype(np.float32)
+
+
+ULAW_TABLE = _ulaw_table()
+
+
+def lowpass(taps: int, cutoff: float) -> np.ndarray:
+    """Hamming-windowed sinc; `cutoff` as a fraction of the sample rate."""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+class Resampler:
+    """Streaming mono resampler: anti-alias FIR (when downsampling), then linear interpolation."""
+
+    def __init__(self, source_rate: int, target_rate: int = TARGET_RATE, taps: int = RESAMPLE_TAPS) -> None:
+        self.step = source_rate / target_rate
+        # Cut off just below the target Nyquist (7.2 kHz for 16 kHz output).
+        self._fir = lowpass(taps, 0.45 * target_rate / source_rate) if source_rate > target_rate else None
+        self._history = np.zeros(taps - 1 if self._fir is not None else 0, dtype=np.float32)
+        self._previous = np.float32(0)
+        # Position of the next output sample, in input samples from the start of the next chunk.
+        self._position = 0.0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self._fir is not None:
+            padded = np.concatenate([self._history, samples])
+            self._history = padded[padded.size - self._history.size :]
+            samples = np.convolve(padded, self._fir, mode="valid")
+        if samples.size == 0:
+            return samples
+        count = max(0, math.floor((samples.size - 1 - self._position) / self.step) + 1)
+        positions = self._position + self.step * np.arange(count)
+        # Index 0 is the last sample of the previous chunk, so output can straddle the boundary.
+        out = np.interp(positions + 1, np.arange(samples.size + 1), np.concatenate([[self._previous], samples]))
+        self._position += self.step * count - samples.size
+        self._previous = samples[-1]
+        return out
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return np.clip(np.rint(samples), -32768, 32767).astype("<i2").tobytes()
+
+
+class _PcmDecoder:
+    def __init__(self, rate: int) -> None:
+        self._resampler = Resampler(rate) if rate != TARGET_RATE else None
+
+    def decode(self, data: bytes) -> bytes:
+        if self._resampler is None:
+            return data
+        samples = np.frombuffer(data, dtype="<i2", count=len(data) // 2).astype(np.float32)
+        return to_pcm16(self._resampler.process(samples))
+
+
+class _UlawDecoder:
+    def __init__(self, rate: int) -> None:
+        self._resampler = Resampler(rate) if rate != TARGET_RATE else None
+
+    def decode(self, data: bytes) -> bytes:
+        samples = ULAW_TABLE[np.frombuffer(data, dtype=np.uint8)]
+        if self._resampler is not None:
+            samples = self._resampler.process(samples)
+        return to_pcm16(samples)
+
+
+class _OpusDecoder:
+    def __init__(self) -> None:
+        self._codec = av.CodecContext.create("libopus", "r")
+        self._codec.layout = "mono"
+        self._resampler = av.AudioResampler(format="s16", layout="mono", rate=TARGET_RATE)
+
+    def decode(self, data: bytes) -> bytes:
+        out = []
+        try:
+            for frame in self._codec.decode(av.Packet(data)):
+                for resampled in self._resampler.resample(frame):
+                    out.append(resampled.to_ndarray().tobytes())
+        except av.FFmpegError as e:
+            raise AudioDecodeError(f"Opus packet: {e}") from e
+        return b"".join(out)
+
+
+def create_decoder(mime_type: str) -> _PcmDecoder | _UlawDecoder | _OpusDecoder | None:
+    """A stateful decoder for `mime_type`, or None if it is not a supported ingest format."""
+    base, rate = parse_mime(mime_type)
+    if base in ("audio/pcm", "audio/pcmu", "audio/basic") and rate is not None:
+        if not INGEST_MIN_RATE <= rate <= INGEST_MAX_RATE:
+            raise AudioDecodeError(f"unsupported rate {rate} (accepted: {INGEST_MIN_RATE}-{INGEST_MAX_RATE} Hz)")
+    if base == "audio/pcm" and rate:
+        return _PcmDecoder(rate)
+    if base in ("audio/pcmu", "audio/basic"):
+        return _UlawDecoder(rate or 8000)
+    if base == "audio/opus":
+        if not OPUS_AVAILABLE:
+            raise AudioDecodeError("audio/opus needs PyAV (pip install 'backend[opus]')")
+        return _OpusDecoder()
+    return None
+
+
+class AudioIngest:
+    """Per-session decoder of compressed / non-16 kHz upstream audio."""
+
+    def __init__(self) -> None:
+        self._decoders: dict[str, _PcmDecoder | _UlawDecoder | _OpusDecoder | None] = {}
+        # format → [chunks, wire bytes, PCM bytes, decode CPU seconds]
+        self.formats: dict[str, list[float]] = {}
+        self.dropped = 0
+        self._failed: set[str] = set()
+
+    def _decode(self, decoder: _PcmDecoder | _UlawDecoder | _OpusDecoder, data: bytes) -> tuple[bytes, float]:
+        started = time.thread_time()
+        pcm = decoder.decode(data)
+        return pcm, time.thread_time() - started
+
+    async def decode(self, mime_type: str, data: bytes) -> tuple[str, bytes] | None:
+        """(mime_type, data) to forward, with every supported ingest format as 16 kHz PCM; None to drop."""
+        if mime_type in PASSTHROUGH_MIME_TYPES:
+            return mime_type, data
+        try:
+            if mime_type not in self._decoders:
+                if len(self._decoders) >= INGEST_MAX_DECODERS:
+                    # Evict the oldest: a client switching formats keeps working, one cycling them can't grow this
+                    del self._decoders[next(iter(self._decoders))]
+                self._decoders[mime_type] = create_decoder(mime_type)
+            decoder = self._decoders[mime_type]
+            if decoder is None:
+                return mime_type, data
+            pcm, cpu = await asyncio.get_running_loop().run_in_executor(_executor, self._decode, decoder, data)
+        except Exception as e:
+            # Any decoder / resampler failure drops this chunk, never the session
+            self.dropped += 1
+            fmt = parse_mime(mime_type)[0]
+            if fmt not in self._failed and len(self._failed) < INGEST_MAX_DECODERS:
+                self._failed.add(fmt)
+                logger.warning(f"Dropping undecodable {mime_type[:64]} audio: {e}")
+            return None
+        totals = self.formats.setdefault(parse_mime(mime_type)[0], [0, 0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += len(data)
+        totals[2] += len(pcm)
+        totals[3] += cpu
+        return TARGET_MIME, pcm
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            fmt: {
+                "chunks": int(chunks),
+                "wire_bytes": int(wire),
+                "pcm_bytes": int(pcm),
+                "saved_ratio": round(1 - wire / pcm, 3) if pcm else 0.0,
+                "decode_cpu_ms": round(cpu * 1000, 1),
+            }
+            for fmt, (chunks, wire, pcm, cpu) in self.formats.items()
+        }
@@ -0,0 +1,91 @@
+"""
+Benchmark: upstream audio coalescing (audio_coalescer.py) at high session counts.
+
+Runs bench_relay_load.py once per AUDIO_COALESCE_MS setting, with clients
+sending small audio chunks (20 ms by default, what many capture pipelines
+emit), and compares per step:
+
+  model msgs/s      realtime messages the fake model received
+  cpu/session       relay CPU per session (% of a core)
+  up p50/p99        client send → model receive; coalescing adds up to one
+                    target's worth of waiting to the first chunk of each blob
+  cpu saved         relative to the first setting (coalescing off)
+
+Usage (from backend/):
+  uv run python benchmarks/bench_audio_coalescer.py [--sessions 10,25,50] [--targets 0,60,100]
+      [--audio-chunk-ms 20] [--duration 15] [--fps 0]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def run_load(args: argparse.Namespace, target_ms: str, output: Path) -> dict:
+    subprocess.run(
+        [
+            sys.executable,
+            str(BENCH_DIR / "bench_relay_load.py"),
+            "--sessions",
+            args.sessions,
+            "--duration",
+            str(args.duration),
+            "--warmup",
+            str(args.warmup),
+            "--audio-chunk-ms",
+            str(args.audio_chunk_ms),
+            "--fps",
+            str(args.fps),
+            "--output",
+            str(output),
+            "--relay-env",
+            f"AUDIO_COALESCE_MS={target_ms}",
+        ],
+        cwd=BENCH_DIR.parent,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    (result_file,) = output.glob("relay_load-*.json")
+    return json.loads(result_file.read_text())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="10,25,50")
+    parser.add_argument("--targets", default="0,60,100", help="AUDIO_COALESCE_MS values; the first is the baseline")
+    parser.add_argument("--audio-chunk-ms", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=4.0)
+    parser.add_argument("--fps", type=float, default=0.0)
+    args = parser.parse_args()
+
+    runs: dict[str, list[dict]] = {}
+    for target in args.targets.split(","):
+        with tempfile.TemporaryDirectory(prefix="coalesce-") as tmp:
+            runs[target] = run_load(args, target, Path(tmp))["steps"]
+
+    baseline = runs[args.targets.split(",")[0]]
+    print(f"client chunks {args.audio_chunk_ms:.0f} ms, fps {args.fps}, {os.cpu_count()} CPUs")
+    header = ("target", "N", "msgs/s", "cpu/sess", "saved", "up p50", "up p99", "errors")
+    print(" ".join(f"{name:>{width}}" for name, width in zip(header, (7, 4, 9, 9, 7, 8, 8, 6), strict=True)))
+    for target, steps in runs.items():
+        for step, base in zip(steps, baseline, strict=True):
+            cpu = (step["relay_cpu"] or {}).get("per_session_percent")
+            base_cpu = (base["relay_cpu"] or {}).get("per_session_percent")
+            saved = f"{1 - cpu / base_cpu:6.1%}" if cpu is not None and base_cpu else "    n/a"
+            up = step["upstream_latency"]
+            print(
+                f"{target + ' ms':>7} {step['sessions']:>4} {step['model_realtime_messages_per_s']:>9} "
+                f"{cpu if cpu is not None else 'n/a':>8}% {saved:>7} {up.get('p50_ms', 'n/a'):>8} "
+                f"{up.get('p99_ms', 'n/a'):>8} {step['errors']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Benchmark: compressed / higher-rate upstream audio (audio_ingest.py).
+
+Encodes a synthetic voice signal in each ingest format, then streams it
+through N concurrent AudioIngest sessions (sharing the decode pool, as in the
+relay) in --chunk-ms messages and reports per format:
+
+  kbit/s        uplink bitrate the client needs
+  saved         bytes saved relative to raw 16 kHz PCM
+  cpu/session   decode + resample CPU per real-time session (% of one core),
+                summed over the worker threads
+  loop/session  event-loop CPU per session for the executor hand-off
+  added p50/p99 wall time a chunk spends in decode() under that load
+  SNR           decoded output vs. the same signal rendered directly at
+                16 kHz (out-of-band content must be filtered, not aliased);
+                not meaningful for Opus, which is a perceptual codec
+
+Usage (from backend/):
+  uv run python benchmarks/bench_audio_ingest.py [--sessions 50] [--seconds 20] [--chunk-ms 20]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from audio_ingest import OPUS_AVAILABLE, RESAMPLE_TAPS, TARGET_RATE, AudioIngest
+
+if OPUS_AVAILABLE:
+    import av
+
+VOICE = [(f0 * k, 0.6 / k) for f0 in (140.0, 210.0) for k in range(1, 8)] + [(3100.0, 0.05), (5200.0, 0.03)]
+OUT_OF_BAND = [(11000.0, 0.1), (15500.0, 0.05)]  # above 8 kHz: must not alias into the 16 kHz output
+
+
+def render(rate: int, seconds: float, delay: float = 0.0, out_of_band: bool = False) -> np.ndarray:
+    """Float samples (int16 scale) of the test signal at `rate`, shifted by `delay` seconds."""
+    t = np.arange(int(rate * seconds)) / rate - delay
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 3.7 * t)
+    signal = sum(a * np.sin(2 * np.pi * f * t + f) for f, a in VOICE) * envelope
+    if out_of_band:
+        signal = signal + sum(a * np.sin(2 * np.pi * f * t) for f, a in OUT_OF_BAND)
+    return signal * 6000
+
+
+def ulaw_encode(samples: np.ndarray) -> bytes:
+    x = np.clip(samples, -32635, 32635).astype(np.int32)
+    sign = np.where(x < 0, 0x80, 0)
+    magnitude = np.abs(x) + 0x84
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def opus_packets(samples: np.ndarray, bitrate: int) -> list[bytes]:
+    codec = av.CodecContext.create("libopus", "w")
+    codec.sample_rate, codec.layout, codec.format, codec.bit_rate = 48000, "mono", "s16", bitrate
+    codec.open()
+    pcm = np.clip(samples, -32768, 32767).astype("<i2")
+    packets = []
+    for offset in range(0, pcm.size - 960 + 1, 960):
+        frame = av.AudioFrame.from_ndarray(pcm[None, offset : offset + 960], format="s16", layout="mono")
+        frame.sample_rate, frame.pts = 48000, offset
+        packets += [bytes(packet) for packet in codec.encode(frame)]
+    return packets
+
+
+def chunked(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data) - size + 1, size)]
+
+
+def formats(seconds: float, chunk_ms: float) -> dict[str, tuple[str, list[bytes], int]]:
+    """name → (mime type, messages, source rate)."""
+    n16 = int(TARGET_RATE * chunk_ms / 1000)
+    out = {
+        "pcm 16k (baseline)": (
+            "audio/pcm;rate=16000",
+            chunked(np.rint(render(16000, seconds)).astype("<i2").tobytes(), n16 * 2),
+            16000,
+        ),
+    }
+    for rate in (48000, 44100):
+        pcm = np.rint(render(rate, seconds, out_of_band=True)).astype("<i2").tobytes()
+        out[f"pcm {rate / 1000:g}k"] = (f"audio/pcm;rate={rate}", chunked(pcm, int(rate * chunk_ms / 1000) * 2), rate)
+    out["pcmu 16k"] = ("audio/pcmu;rate=16000", chunked(ulaw_encode(render(16000, seconds)), n16), 16000)
+    out["pcmu 8k"] = ("audio/pcmu;rate=8000", chunked(ulaw_encode(render(8000, seconds)), n16 // 2), 8000)
+    if OPUS_AVAILABLE:
+        source = render(48000, seconds, out_of_band=True)
+        for bitrate in (32000, 16000):
+            out[f"opus {bitrate // 1000}k"] = ("audio/opus", opus_packets(source, bitrate), 48000)
+    return out
+
+
+def snr_db(decoded: np.ndarray, rate: int, seconds: float) -> float:
+    # The FIR adds (taps - 1) / 2 input samples of delay when downsampling.
+    delay = (RESAMPLE_TAPS - 1) / 2 / rate if rate > TARGET_RATE else 0.0
+    reference = render(TARGET_RATE, seconds, delay=delay)
+    skip = TARGET_RATE // 10  # filter warm-up
+    n = min(decoded.size, reference.size)
+    if rate == 8000:
+        # 8 kHz keeps only content below 4 kHz; compare against that band.
+        reference = render(TARGET_RATE, seconds, delay=delay) - sum(
+            a
+            * np.sin(2 * np.pi * f * (np.arange(reference.size) / TARGET_RATE) + f)
+            * (0.55 + 0.45 * np.sin(2 * np.pi * 3.7 * np.arange(reference.size) / TARGET_RATE))
+            * 6000
+            for f, a in VOICE
+            if f >= 4000
+        )
+    error = decoded[skip:n] - reference[skip:n]
+    return float(10 * np.log10(np.sum(reference[skip:n] ** 2) / max(np.sum(error**2), 1e-9)))
+
+
+async def run_format(
+    mime_type: str, messages: list[bytes], sessions: int
+) -> tuple[list[AudioIngest], list[float], bytes]:
+    ingests = [AudioIngest() for _ in range(sessions)]
+    waits: list[float] = []
+    first_output = bytearray()
+
+    async def session(index: int) -> None:
+        for message in messages:
+            started = time.perf_counter()
+            result = await ingests[index].decode(mime_type, message)
+            waits.append(time.perf_counter() - started)
+            if index == 0 and result is not None:
+                first_output.extend(result[1])
+
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    return ingests, waits, bytes(first_output)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--chunk-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    audio_seconds = args.sessions * args.seconds
+    print(f"{args.sessions} sessions x {args.seconds:.0f} s, {args.chunk_ms:.0f} ms messages, {os.cpu_count()} CPUs")
+    print(
+        f"{'format':>18} {'kbit/s':>7} {'saved':>6} {'cpu/session':>12} {'loop/session':>13} "
+        f"{'added p50/p99 ms':>17} {'SNR dB':>7}"
+    )
+    for name, (mime_type, messages, rate) in formats(args.seconds, args.chunk_ms).items():
+        loop_started = time.process_time()
+        ingests, waits, output = await run_format(mime_type, messages, args.sessions)
+        process_cpu = time.process_time() - loop_started
+
+        wire = sum(len(message) for message in messages)
+        decode_cpu = sum(totals[3] for ingest in ingests for totals in ingest.formats.values())
+        decoded = np.frombuffer(output, dtype="<i2").astype(np.float64)
+        snr = "n/a" if mime_type == "audio/opus" else f"{snr_db(decoded, rate, args.seconds):.1f}"
+        p50, p99 = np.percentile(np.array(waits) * 1000, [50, 99])
+        print(
+            f"{name:>18} {wire * 8 / args.seconds / 1000:7.1f} {1 - wire / (TARGET_RATE * 2 * args.seconds):6.1%} "
+            f"{decode_cpu / audio_seconds * 100:11.3f}% {(process_cpu - decode_cpu) / audio_seconds * 100:12.3f}% "
+            f"{p50:8.3f}/{p99:<8.3f} {snr:>7}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+"""
+Benchmark: ID-token verification latency against a local stand-in key server.
+
+Starts an HTTP server on localhost that serves a Google-style `{kid: PEM cert}`
+document with a Cache-Control max-age, signs Firebase-shaped ID tokens with a
+throwaway RSA key, and verifies them through firebase_auth. No network access.
+
+Reports p50/p99 for offline verification (one distinct token per call, so the
+verified-token cache never helps) and for verify_token_async with repeated
+tokens, then rotates to a new key id and checks that the rotation costs exactly
+one blocking fetch.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_auth_latency.py [--tokens 2000]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+import firebase_auth
+from signing_keys import SigningKeyCache
+
+PROJECT_ID = "spatial-eye-bench"
+
+
+def make_signing_key(kid: str) -> tuple[rsa.RSAPrivateKey, str]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+    now = datetime.datetime.now(datetime.UTC)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    return key, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class KeyServer:
+    """Stand-in for Google's securetoken certificate endpoint."""
+
+    def __init__(self) -> None:
+        self.certs: dict[str, str] = {}
+        self.hits = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                server.hits += 1
+                body = json.dumps(server.certs).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", "public, max-age=21600, must-revalidate")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/certs"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+
+
+def sign_token(key: rsa.RSAPrivateKey, kid: str, uid: str) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "auth_time": now - 60,
+        "sub": uid,
+        "iat": now - 5,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, key, algorithm="RS256", headers={"kid": kid})
+
+
+def percentiles(samples: list[float]) -> str:
+    cuts = statistics.quantiles(samples, n=100)
+    return f"p50 {cuts[49]:7.3f} ms  p99 {cuts[98]:7.3f} ms  max {max(samples):7.3f} ms"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["FIREBASE_ADMIN_PROJECT_ID"] = PROJECT_ID
+    server = KeyServer()
+    key_a, cert_a = make_signing_key("kid-a")
+    server.certs = {"kid-a": cert_a}
+    firebase_auth.signing_keys = SigningKeyCache(url=server.url, min_fetch_interval=0)
+    firebase_auth.signing_keys.start()
+
+    tokens = [sign_token(key_a, "kid-a", f"user-{i}") for i in range(args.tokens)]
+    assert firebase_auth.verify_token(tokens[0])["uid"] == "user-0"
+
+    samples = []
+    for token in tokens:
+        start = time.perf_counter()
+        assert firebase_auth.verify_token(token)
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"offline verify   : {percentiles(samples)}")
+
+    samples = []
+    for token in tokens * 2:
+        start = time.perf_counter()
+        assert await firebase_auth.verify_token_async(token)
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"async + cache    : {percentiles(samples)}  cache {firebase_auth.token_cache.stats()}")
+
+    impostor = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    forged = jwt.encode({"sub": "x"}, impostor, algorithm="RS256", headers={"kid": "kid-a"})
+    assert firebase_auth.verify_token(forged) is None
+
+    # Rotation: a token signed with a key the cache has not seen yet.
+    key_b, cert_b = make_signing_key("kid-b")
+    server.certs = {"kid-a": cert_a, "kid-b": cert_b}
+    hits_before = server.hits
+    rotated = [sign_token(key_b, "kid-b", f"rotated-{i}") for i in range(50)]
+    start = time.perf_counter()
+    assert all(firebase_auth.verify_token(token) for token in rotated)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"key rotation     : {len(rotated)} tokens in {elapsed:.1f} ms, {server.hits - hits_before} key fetch(es)")
+    print(f"signing keys     : {firebase_auth.signing_keys.stats()}")
+
+    firebase_auth.signing_keys.stop()
+    server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
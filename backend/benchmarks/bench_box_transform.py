@@ -0,0 +1,86 @@
+"""
+Benchmark: box_transform throughput.
+
+Maps random boxes from frames of random sizes (landscape, portrait and square,
+mixed in one batch) with the batch API and compares it with the per-box scalar
+math frame_diagnostics used to inline. The invariants (lossless round trips,
+clamping into the frame, letterbox padding) are checked by
+tests/test_box_transform.py over the same random batches.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_box_transform.py [--boxes 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from box_transform import normalized_to_pixel, padded_to_pixel
+
+
+def random_batch(rng: np.random.Generator, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    corners = rng.uniform(0, 1000, size=(n, 2, 2))
+    lo, hi = corners.min(axis=1), corners.max(axis=1)
+    boxes = np.stack([lo[:, 0], lo[:, 1], hi[:, 0], hi[:, 1]], axis=1)  # [ymin, xmin, ymax, xmax]
+    width = rng.integers(64, 4096, size=n).astype(np.float64)
+    height = rng.integers(64, 4096, size=n).astype(np.float64)
+    square = rng.random(n) < 0.1
+    height[square] = width[square]
+    return boxes, width, height
+
+
+def legacy_boxes(box_2d, img_w: float, img_h: float) -> tuple[list[float], list[float]]:
+    """The scalar direct/unpadded math formerly inlined in FrameDiagnostics."""
+    ymin, xmin, ymax, xmax = box_2d
+    direct = [xmin / 1000 * img_w, ymin / 1000 * img_h, xmax / 1000 * img_w, ymax / 1000 * img_h]
+    aspect = img_w / img_h
+    if aspect > 1:
+        pad_top = (1000 - 1000 / aspect) / 2
+        pad_bottom = 1000 - pad_top
+        unpad = [
+            (xmin / 1000) * img_w,
+            max(0, (ymin - pad_top) / (pad_bottom - pad_top)) * img_h,
+            (xmax / 1000) * img_w,
+            max(0, (ymax - pad_top) / (pad_bottom - pad_top)) * img_h,
+        ]
+    else:
+        pad_left = (1000 - 1000 * aspect) / 2
+        pad_right = 1000 - pad_left
+        unpad = [
+            max(0, (xmin - pad_left) / (pad_right - pad_left)) * img_w,
+            (ymin / 1000) * img_h,
+            max(0, (xmax - pad_left) / (pad_right - pad_left)) * img_w,
+            (ymax / 1000) * img_h,
+        ]
+    return direct, unpad
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boxes", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(14)
+    boxes, w, h = random_batch(rng, args.boxes)
+    for name, fn in (("direct", normalized_to_pixel), ("unpadded", padded_to_pixel)):
+        start = time.perf_counter()
+        fn(boxes, w, h)
+        elapsed = time.perf_counter() - start
+        print(f"batch {name:>8}: {args.boxes / elapsed / 1e6:7.2f} M boxes/s")
+
+    sample = min(args.boxes, 100_000)
+    rows = boxes[:sample].tolist()
+    start = time.perf_counter()
+    for box, img_w, img_h in zip(rows, w[:sample].tolist(), h[:sample].tolist(), strict=True):
+        legacy_boxes(box, img_w, img_h)
+    elapsed = time.perf_counter() - start
+    print(f"scalar loop (both): {sample / elapsed / 1e6:7.2f} M boxes/s")
+
+
+if __name__ == "__main__":
+    main()
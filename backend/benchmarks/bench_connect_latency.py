@@ -0,0 +1,97 @@
+"""
+Benchmark: per-connection session setup, from building the model to the Live
+API's setupComplete.
+
+Simulates a BYOK user reconnecting repeatedly against the local fake Live API
+(fake_live_server.py, over TLS like the real endpoint). Each connect builds the
+model, resolves `api_client` / `_live_api_client` the way the ADK does, then
+opens the Live session and waits for setupComplete. "fresh" builds new genai
+Clients every time (the old GeminiBeta behaviour); "pooled" goes through
+client_pool. Client construction and the dial are reported separately, so the
+pool's share of the whole setup is visible.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_connect_latency.py [--connects 30]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.genai import Client, types
+
+from fake_live_server import FakeLiveServer
+
+MODEL = "gemini-2.5-flash-native-audio-preview-12-2025"
+BYOK = "AIzaBenchmarkKeyNotReal"
+LIVE_CONFIG = types.LiveConnectConfig(response_modalities=["AUDIO"])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def measure(clients, connects: int) -> tuple[list[float], list[float]]:
+    """Client resolution and Live session setup times (ms) over `connects` reconnects."""
+    resolve, total = [], []
+    for _ in range(connects):
+        start = time.perf_counter()
+        client = clients()
+        resolved = time.perf_counter()
+        async with client.aio.live.connect(model=MODEL, config=LIVE_CONFIG):
+            pass
+        end = time.perf_counter()
+        resolve.append((resolved - start) * 1000)
+        total.append((end - start) * 1000)
+    return resolve, total
+
+
+def summary(samples: list[float]) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    return f"median {statistics.median(samples):7.2f} ms  p95 {p95:7.2f} ms  first {samples[0]:7.2f} ms"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connects", type=int, default=30)
+    args = parser.parse_args()
+
+    server = FakeLiveServer(port=free_port())
+    await server.start()
+    # client_pool reads these at import time
+    os.environ["GEMINI_BASE_URL"] = server.base_url
+    os.environ["GEMINI_CA_FILE"] = str(server.cert_file)
+    from client_pool import _http_options, client_pool
+    from gemini_beta import API_VERSION, GeminiBeta
+
+    def fresh() -> Client:
+        model = GeminiBeta(model=MODEL, custom_api_key=BYOK)
+        http_options = _http_options(API_VERSION, model._tracking_headers())
+        Client(api_key=BYOK, http_options=http_options)  # api_client
+        return Client(api_key=BYOK, http_options=http_options)  # _live_api_client
+
+    def pooled() -> Client:
+        model = GeminiBeta(model=MODEL, custom_api_key=BYOK)
+        model.api_client
+        return model._live_api_client
+
+    try:
+        for name, clients in (("fresh", fresh), ("pooled", pooled)):
+            resolve, total = await measure(clients, args.connects)
+            print(f"{name:>7} clients: {summary(resolve)}")
+            print(f"{name:>7} setup  : {summary(total)}")
+    finally:
+        await server.stop()
+    print(f"pool: {client_pool.stats()}  fake server sessions: {server.sessions}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Benchmark: relay-side cost of FrameDiagnostics, inline vs the background writer.
+
+Feeds 720p JPEG frames through capture_frame with a track_and_highlight
+annotation every few frames, and times each call on the caller's thread (what
+the event loop pays). "inline" runs every diagnostics job synchronously — the
+old behaviour, decoding/drawing/saving on the loop — while "queued" goes
+through DiagnosticsWriter. Output goes to a temporary directory under small
+quotas so eviction is exercised too.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_diagnostics.py [--frames 600] [--annotate-every 10]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["SPATIAL_DIAGNOSTICS"] = "true"
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from frame_diagnostics import DiagnosticsWriter, FrameDiagnostics  # noqa: E402
+
+
+class InlineWriter(DiagnosticsWriter):
+    def submit(self, job) -> None:
+        self.submitted += 1
+        job()
+        self.completed += 1
+
+
+def make_frames(count: int) -> list[bytes]:
+    rng = np.random.default_rng(0)
+    base = np.linspace(0, 255, 1280 * 720 * 3, dtype=np.float32).reshape(720, 1280, 3)
+    frames = []
+    for _ in range(count):
+        noisy = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(noisy).save(buf, "JPEG", quality=70)
+        frames.append(buf.getvalue())
+    return frames
+
+
+def run(writer: DiagnosticsWriter, frames: list[bytes], total: int, annotate_every: int) -> list[float]:
+    diag = FrameDiagnostics("bench-session", writer=writer)
+    args = {"box_2d": [250, 300, 700, 650], "label": "coffee mug"}
+    samples = []
+    for i in range(total):
+        start = time.perf_counter()
+        diag.capture_frame(frames[i % len(frames)], 1280, 720)
+        if i % annotate_every == 0:
+            diag.annotate_tool_call("track_and_highlight", args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--annotate-every", type=int, default=10)
+    args = parser.parse_args()
+
+    frames = make_frames(8)
+    for name, cls in (("inline", InlineWriter), ("queued", DiagnosticsWriter)):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = cls(root=Path(tmp), session_quota_mb=2, global_quota_mb=4)
+            samples = run(writer, frames, args.frames, args.annotate_every)
+            time.sleep(0.5)
+            cuts = statistics.quantiles(samples, n=100)
+            print(
+                f"{name:>6}: p50 {cuts[49]:7.3f} ms  p99 {cuts[98]:7.3f} ms  max {max(samples):7.3f} ms  "
+                f"{writer.stats()}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: model audio as base64 inside event JSON vs. audio_out=binary frames.
+
+Replays a synthetic but representative model turn (PCM chunks, output
+transcriptions, a tool call and turnComplete) through both downstream encodings
+and reports bytes on the wire and serialization CPU per event.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_downstream_audio.py [--turns 200] [--chunk-bytes 3840]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.events import Event
+
+from benchmarks.sample_events import build_turn
+from wire_protocol import encode_audio_frame, split_audio_parts
+
+
+def run_json(events: list[Event]) -> int:
+    sent = 0
+    for event in events:
+        sent += len(event.model_dump_json(exclude_none=True, by_alias=True))
+    return sent
+
+
+def run_binary(events: list[Event]) -> int:
+    sent = 0
+    seq = 0
+    for event in events:
+        audio_blobs, rest = split_audio_parts(event)
+        for blob in audio_blobs:
+            sent += len(encode_audio_frame(0, seq, blob.mime_type, blob.data))
+            seq += 1
+        if rest is not None:
+            sent += len(rest.model_dump_json(exclude_none=True, by_alias=True))
+    return sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--chunk-bytes", type=int, default=3840, help="PCM bytes per model audio chunk")
+    args = parser.parse_args()
+
+    events = build_turn(args.chunk_bytes)
+    results = {}
+    for name, fn in (("json", run_json), ("binary", run_binary)):
+        start = time.perf_counter()
+        for _ in range(args.turns):
+            sent = fn(events)
+        elapsed = time.perf_counter() - start
+        results[name] = (sent, elapsed / (args.turns * len(events)) * 1e6)
+
+    json_bytes, json_us = results["json"]
+    bin_bytes, bin_us = results["binary"]
+    print(f"events per turn: {len(events)}  chunk: {args.chunk_bytes} B")
+    print(f"json   : {json_bytes:>9} B/turn  {json_us:7.1f} µs/event")
+    print(f"binary : {bin_bytes:>9} B/turn  {bin_us:7.1f} µs/event")
+    print(f"saved  : {1 - bin_bytes / json_bytes:.1%} bytes, {1 - bin_us / json_us:.1%} CPU")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark: downstream audio codecs (downstream_codec.py).
+
+Plays N concurrent sessions of synthetic model speech (24 kHz PCM) through a
+DownstreamEncoder each, paced in real time, with model chunks of random size
+around --chunk-ms. Turns last --turn-seconds; every third turn is interrupted
+halfway. Reports per codec:
+
+  binary kbit/s    audio bandwidth per speaking session, audio_out=binary
+                   (12-byte frame header per message)
+  json kbit/s      the same audio inline in the event JSON (base64)
+  saved            relative to raw PCM over the same transport
+  cpu/session      encoder CPU per real-time session (% of one core)
+  encode p50/p99   wall time of one encode() under that load; on a turn's
+                   first chunk this is all the codec adds to first audio
+  held avg/max     audio waiting for a full Opus frame after each chunk; it
+                   goes out with the next chunk or at turnComplete
+
+Usage (from backend/):
+  uv run python benchmarks/bench_downstream_codec.py [--sessions 50] [--seconds 10] [--chunk-ms 40]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from bench_audio_ingest import render
+from google.adk.events import Event
+from google.genai import types
+
+from downstream_codec import MODEL_RATE, OPUS_AVAILABLE, DownstreamEncoder, with_audio_parts
+from event_inspect import encode_event
+from wire_protocol import AUDIO_OUT_HEADER
+
+MODEL_MIME = "audio/pcm;rate=24000"
+
+
+def audio_event(blobs: list[types.Blob]) -> Event:
+    parts = [types.Part(inline_data=blob) for blob in blobs]
+    return Event(author="spatial_agent", content=types.Content(role="model", parts=parts))
+
+
+class Session:
+    def __init__(self, codec: str, pcm: bytes, args: argparse.Namespace, seed: int) -> None:
+        self.encoder = DownstreamEncoder(codec) if codec != "pcm" else None
+        self.pcm = pcm
+        self.args = args
+        self.rng = random.Random(seed)
+        self.pcm_bytes = 0
+        self.binary_bytes = 0
+        self.json_bytes = 0
+        self.encode_seconds: list[float] = []
+        self.first_chunk_seconds: list[float] = []
+        self.held_ms: list[float] = []
+
+    def _send(self, blobs: list[types.Blob]) -> None:
+        if not blobs:
+            return
+        self.binary_bytes += sum(AUDIO_OUT_HEADER.size + len(blob.data) for blob in blobs)
+        event = audio_event(blobs)
+        self.json_bytes += len(encode_event(with_audio_parts(event, None, blobs)))
+
+    async def run(self) -> None:
+        args = self.args
+        offset, turn = 0, 0
+        deadline = time.perf_counter() + args.seconds
+        while time.perf_counter() < deadline:
+            turn += 1
+            turn_bytes = int(args.turn_seconds * MODEL_RATE) * 2
+            if turn % 3 == 0:
+                turn_bytes //= 2
+            sent, first = 0, True
+            while sent < turn_bytes and time.perf_counter() < deadline:
+                ms = self.rng.uniform(0.5, 1.5) * args.chunk_ms
+                size = min(turn_bytes - sent, int(MODEL_RATE * ms / 1000) * 2)
+                if offset + size > len(self.pcm):
+                    offset = 0
+                blob = types.Blob(mime_type=MODEL_MIME, data=self.pcm[offset : offset + size])
+                offset += size
+                sent += size
+                self.pcm_bytes += size
+                started = time.perf_counter()
+                out = await self.encoder.encode([blob]) if self.encoder is not None else [blob]
+                elapsed = time.perf_counter() - started
+                self.encode_seconds.append(elapsed)
+                if first:
+                    self.first_chunk_seconds.append(elapsed)
+                    first = False
+                if self.encoder is not None:
+                    self.held_ms.append(self.encoder.pending_ms)
+                self._send(out)
+                await asyncio.sleep(max(0.0, size / 2 / MODEL_RATE - elapsed))
+            if self.encoder is not None:
+                if turn % 3 == 0:
+                    self.encoder.interrupt()
+                else:
+                    self._send(await self.encoder.encode([], end_turn=True))
+            await asyncio.sleep(0.2)  # the user's turn
+
+
+async def run_codec(codec: str, pcm: bytes, args: argparse.Namespace) -> list[Session]:
+    sessions = [Session(codec, pcm, args, seed) for seed in range(args.sessions)]
+    await asyncio.gather(*(session.run() for session in sessions))
+    return sessions
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--chunk-ms", type=float, default=40.0)
+    parser.add_argument("--turn-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    pcm = np.clip(np.rint(render(MODEL_RATE, 5.0)), -32768, 32767).astype("<i2").tobytes()
+    codecs = ["pcm", "pcmu"] + (["opus"] if OPUS_AVAILABLE else [])
+    print(
+        f"{args.sessions} sessions x {args.seconds:.0f} s, ~{args.chunk_ms:.0f} ms model chunks, {os.cpu_count()} CPUs"
+    )
+    print(
+        f"{'codec':>6} {'binary kbit/s':>14} {'saved':>6} {'json kbit/s':>12} {'saved':>6} {'cpu/session':>12} "
+        f"{'encode p50/p99 ms':>18} {'first p99 ms':>13} {'held avg/max ms':>16}"
+    )
+    baseline: tuple[float, float] | None = None
+    for codec in codecs:
+        sessions = await run_codec(codec, pcm, args)
+        # Bandwidth while the model speaks: bytes per second of model audio.
+        audio_seconds = sum(s.pcm_bytes for s in sessions) / (2 * MODEL_RATE)
+        binary = sum(s.binary_bytes for s in sessions) * 8 / audio_seconds / 1000
+        json_rate = sum(s.json_bytes for s in sessions) * 8 / audio_seconds / 1000
+        if baseline is None:
+            baseline = (binary, json_rate)
+        cpu = sum(s.encoder.encode_cpu for s in sessions if s.encoder) / (args.sessions * args.seconds) * 100
+        encode_ms = np.array([t for s in sessions for t in s.encode_seconds]) * 1000
+        first_ms = np.array([t for s in sessions for t in s.first_chunk_seconds]) * 1000
+        held = np.array([h for s in sessions for h in s.held_ms] or [0.0])
+        p50, p99 = np.percentile(encode_ms, [50, 99])
+        print(
+            f"{codec:>6} {binary:14.1f} {1 - binary / baseline[0]:6.1%} {json_rate:12.1f} "
+            f"{1 - json_rate / baseline[1]:6.1%} {cpu:11.3f}% {p50:8.3f}/{p99:<9.3f} "
+            f"{np.percentile(first_ms, 99):13.3f} {held.mean():7.1f}/{held.max():<8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
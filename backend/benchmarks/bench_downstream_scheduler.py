@@ -0,0 +1,144 @@
+"""
+Benchmark: downstream priority scheduler (downstream_scheduler.py).
+
+Replays model turns against a simulated client link of --link-kbps: the
+model streams --turn-seconds of audio per turn in --chunk-ms chunks, faster
+than real time (--burst x), with output transcripts alongside and a
+`track_and_highlight` call arriving partway through. Each turn ends with
+turnComplete; every third turn is interrupted halfway instead.
+
+Two writers over the same link:
+
+  fifo       every event written in arrival order (the relay before the
+             scheduler: each event awaited onto the socket as it came)
+  scheduler  control / audio / transcript queues, audio paced to
+             DOWNSTREAM_AUDIO_LEAD_MS ahead of playback
+
+Reports enqueue → written latency per class (p50/p99/max), audio written
+after an interruption (bytes the client throws away) and transcripts dropped.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_downstream_scheduler.py [--link-kbps 1500] [--turns 12] [--audio-out json]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from downstream_scheduler import AUDIO, CLASSES, CONTROL, DOWNSTREAM_AUDIO_LEAD_MS, TRANSCRIPT, DownstreamScheduler
+from wire_protocol import AUDIO_OUT_HEADER
+
+MODEL_RATE = 24000
+
+
+class Link:
+    """A socket whose sends take as long as the bytes need on the simulated link."""
+
+    def __init__(self, kbps: float) -> None:
+        self.bytes_per_s = kbps * 1000 / 8
+        self.written = 0
+        self.stale = 0  # audio bytes of a turn written after its interruption
+        self.stale_turn = -1
+
+    async def write(self, data: str | bytes) -> None:
+        await asyncio.sleep(len(data) / self.bytes_per_s)
+        self.written += len(data)
+
+
+def audio_payload(size: int, binary: bool) -> str | bytes:
+    if binary:
+        return bytes(AUDIO_OUT_HEADER.size + size)
+    data = base64.b64encode(bytes(size)).decode()
+    return json.dumps({"content": {"parts": [{"inlineData": {"mimeType": "audio/pcm;rate=24000", "data": data}}]}})
+
+
+async def run(fifo: bool, args: argparse.Namespace) -> tuple[dict[str, list[float]], Link, DownstreamScheduler]:
+    link = Link(args.link_kbps)
+    scheduler = DownstreamScheduler(link.write, "bench")
+    latency: dict[str, list[float]] = {cls: [] for cls in CLASSES}
+    rng = random.Random(1)
+    binary = args.audio_out == "binary"
+    writer = asyncio.create_task(scheduler.run())
+
+    async def put(cls: str, payloads: list[str | bytes], seconds: float = 0.0, turn: int = -1) -> None:
+        queued = time.perf_counter()
+
+        def on_sent() -> None:
+            latency[cls].append(time.perf_counter() - queued)
+            if cls == AUDIO and turn == link.stale_turn:
+                link.stale += sum(len(p) for p in payloads)
+
+        await scheduler.put(CONTROL if fifo else cls, payloads, seconds, on_sent)
+
+    for turn in range(args.turns):
+        interrupted = turn % 3 == 2
+        total = args.turn_seconds / 2 if interrupted else args.turn_seconds
+        call_at = rng.uniform(0.2, 0.8) * total
+        played = 0.0
+        called = False
+        while played < total:
+            seconds = min(total - played, rng.uniform(0.5, 1.5) * args.chunk_ms / 1000)
+            size = int(seconds * MODEL_RATE) * 2
+            await put(AUDIO, [audio_payload(size, binary)], seconds, turn)
+            played += seconds
+            if rng.random() < 0.3:
+                await put(TRANSCRIPT, [json.dumps({"outputTranscription": {"text": "x" * rng.randint(8, 40)}})])
+            if not called and played >= call_at:
+                call = {"functionCall": {"name": "track_and_highlight", "args": {"box_2d": [100, 200, 300, 400]}}}
+                await put(CONTROL, [json.dumps({"content": {"parts": [call]}})])
+                called = True
+            await asyncio.sleep(seconds / args.burst)
+        if interrupted:
+            link.stale_turn = turn
+            if not fifo:
+                scheduler.interrupt()
+            await put(CONTROL, [json.dumps({"interrupted": True})])
+        else:
+            await put(AUDIO, [json.dumps({"turnComplete": True})], turn=turn)
+        await asyncio.sleep(args.pause)
+    async with asyncio.timeout(120):
+        await scheduler.drain()
+    writer.cancel()
+    return latency, link, scheduler
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--link-kbps", type=float, default=1500.0)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--turn-seconds", type=float, default=4.0)
+    parser.add_argument("--chunk-ms", type=float, default=40.0)
+    parser.add_argument("--burst", type=float, default=4.0, help="model audio speed vs. real time")
+    parser.add_argument("--pause", type=float, default=1.0, help="seconds between turns")
+    parser.add_argument("--audio-out", choices=("json", "binary"), default="json")
+    args = parser.parse_args()
+
+    print(
+        f"{args.turns} turns x {args.turn_seconds:.0f} s at {args.burst:g}x real time, "
+        f"{args.link_kbps:.0f} kbit/s link, "
+        f"audio_out={args.audio_out}, lead {DOWNSTREAM_AUDIO_LEAD_MS:.0f} ms"
+    )
+    print(f"{'writer':>10} {'class':>11} {'sent':>5} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, fifo in (("fifo", True), ("scheduler", False)):
+        latency, link, scheduler = await run(fifo, args)
+        for cls in CLASSES:
+            ms = np.array(latency[cls] or [0.0]) * 1000
+            p50, p99 = np.percentile(ms, [50, 99])
+            print(f"{name:>10} {cls:>11} {len(latency[cls]):5d} {p50:8.1f} {p99:8.1f} {ms.max():8.1f}")
+        print(
+            f"{'':>10} stale audio after interrupt: {link.stale / 1000:.0f} kB, "
+            f"transcripts dropped: {scheduler.dropped[TRANSCRIPT]}, producer waits: {scheduler.waits}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
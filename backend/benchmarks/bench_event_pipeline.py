@@ -0,0 +1,71 @@
+"""
+Benchmark: downstream event handling throughput, before and after event_inspect.
+
+"before" reproduces the old downstream_task body (model_dump_json, then
+json.loads to find functionCall / inlineData parts); "after" inspects the
+pydantic Event directly and serializes once with event_inspect.encode_event.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_event_pipeline.py [--events recorded.jsonl] [--rounds 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.events import Event
+
+import event_inspect
+from benchmarks.sample_events import build_turn, load_events
+
+
+def before(events: list[Event]) -> int:
+    processed_calls: set[str] = set()
+    audio = 0
+    for event in events:
+        payload = event.model_dump_json(exclude_none=True, by_alias=True)
+        p_dict = json.loads(payload)
+        for part in p_dict.get("content", {}).get("parts", []):
+            if "functionCall" in part:
+                processed_calls.add(part["functionCall"]["id"])
+            if "inlineData" in part:
+                audio += 1
+    return audio
+
+
+def after(events: list[Event]) -> int:
+    processed_calls: set[str] = set()
+    audio = 0
+    for event in events:
+        for call in event_inspect.function_calls(event):
+            processed_calls.add(call.id)
+        audio += len(event_inspect.audio_blobs(event))
+        event_inspect.encode_event(event)
+    return audio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", help="JSONL file of recorded events (one Event JSON per line)")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    events = load_events(args.events) if args.events else build_turn()
+    print(f"{len(events)} events per round, encoder: {'orjson' if event_inspect.orjson else 'pydantic'}")
+
+    rates = {}
+    for name, fn in (("before", before), ("after", after)):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            fn(events)
+        rates[name] = args.rounds * len(events) / (time.perf_counter() - start)
+        print(f"{name:>6}: {rates[name]:>10,.0f} events/s")
+    print(f"speedup: {rates['after'] / rates['before']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
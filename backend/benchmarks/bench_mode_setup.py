@@ -0,0 +1,86 @@
+"""
+Benchmark: per-connection agent setup, per-mode construction vs templates.
+
+"per-connection" rebuilds the mode's Agent, Runner and RunConfig from the raw
+tool functions (the old websocket_endpoint behaviour); "template" binds a model
+to the precompiled ModeTemplate from mode_registry. Both then resolve the tools
+and their declarations the way run_live does before opening the Live socket, so
+the numbers cover everything up to the first model request.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_mode_setup.py [--connects 200] [--mode it-architecture]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk import Agent, Runner
+from google.adk.sessions import InMemorySessionService
+
+import tools_config
+from gemini_beta import GeminiBeta
+from mode_registry import get_mode_template, live_run_config
+
+MODEL = "gemini-2.5-flash-native-audio-preview-12-2025"
+MODE_TOOLS = {
+    "spatial": (tools_config.SPATIAL_SYSTEM_INSTRUCTION, tools_config.SPATIAL_TOOLS),
+    "storyteller": (tools_config.STORYTELLER_SYSTEM_INSTRUCTION, tools_config.DIRECTOR_TOOLS),
+    "it-architecture": (tools_config.IT_ARCHITECTURE_SYSTEM_INSTRUCTION, tools_config.IT_ARCHITECTURE_TOOLS),
+}
+
+session_service = InMemorySessionService()
+
+
+async def resolve_declarations(agent: Agent) -> int:
+    tools = await agent.canonical_tools()
+    return sum(1 for tool in tools if tool._get_declaration() is not None)
+
+
+async def per_connection_setup(mode: str) -> None:
+    instruction, tools = MODE_TOOLS[mode]
+    mode_clean = mode.replace("-", "_")
+    agent = Agent(
+        name=f"SpatialEye_{mode_clean}",
+        model=GeminiBeta(model=MODEL),
+        instruction=instruction,
+        tools=tools,
+    )
+    Runner(app_name=f"SpatialEyeApp_{mode_clean}", agent=agent, session_service=session_service)
+    live_run_config()
+    await resolve_declarations(agent)
+
+
+async def template_setup(mode: str) -> None:
+    runner, _ = get_mode_template(mode).bind(MODEL, None, session_service)
+    await resolve_declarations(runner.agent)
+
+
+async def measure(fn, mode: str, connects: int) -> list[float]:
+    samples = []
+    for _ in range(connects):
+        start = time.perf_counter()
+        await fn(mode)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connects", type=int, default=200)
+    parser.add_argument("--mode", choices=sorted(MODE_TOOLS), default="it-architecture")
+    args = parser.parse_args()
+
+    for name, fn in (("per-connection", per_connection_setup), ("template", template_setup)):
+        samples = await measure(fn, args.mode, args.connects)
+        p95 = statistics.quantiles(samples, n=20)[-1]
+        print(f"{name:>15}: median {statistics.median(samples):6.3f} ms  p95 {p95:6.3f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,447 @@
+"""
+Benchmark: relay capacity under N concurrent synthetic clients.
+
+Runs the whole path locally: the relay (uvicorn main:app) in a subprocess,
+pointed at the fake Live API (fake_live_server.py) and at a stand-in Firebase
+key server (from bench_auth_latency.py), both hosted in this process. For each
+step in --sessions it opens N clients that stream 16 kHz PCM and JPEG frames
+over the binary wire protocol at the configured rates (answering the relay's
+clock-sync pings, see clock_sync.py), warms up, then measures
+for --duration seconds:
+
+  upstream latency     client send → fake model receive, through the relay
+  downstream latency   fake model send → client receive, through the relay
+  relay CPU / session  relay process CPU time over the window / N (% of a core)
+  relay RSS / session  peak RSS during the window minus idle RSS, / N
+  relay loop lag       from the relay's /api/runtime monitor
+  model messages / s   realtime (audio + video) messages the fake model received
+  harness loop lag     this process's own lag; clients and the fake model share
+                       it, so a high value means the harness, not the relay, is
+                       the bottleneck and latencies are inflated
+
+Both latencies use one clock: the fake model and the clients stamp
+time.monotonic() into the first 8 bytes of the audio they send (see
+FakeScript.stamp_audio). CPU and RSS are read from /proc, so they are Linux
+only (null elsewhere).
+
+Results go to <output>/relay_load-<timestamp>.json (config, environment and
+per-step metrics) and a matching .csv with one row per step.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_relay_load.py [--sessions 1,5,10,25] [--duration 20] [--warmup 5]
+      [--audio-chunk-ms 40] [--fps 1] [--output benchmarks/results] [--relay-env KEY=VALUE ...]
+"""
+
+import argparse
+import asyncio
+import csv
+import datetime
+import io
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import websockets
+from bench_auth_latency import PROJECT_ID, KeyServer, make_signing_key, sign_token
+from PIL import Image
+
+from fake_live_server import AUDIO_STAMP, FakeLiveServer, FakeScript
+from loop_monitor import LoopLagMonitor
+from wire_protocol import AUDIO_OUT_HEADER, KIND_AUDIO, KIND_VIDEO, encode_media_frame
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+INPUT_RATE = 16000
+FRAME_SIZE = (640, 480)
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def jpeg_frames(count: int, quality: int = 70) -> list[bytes]:
+    """Distinct noise frames, so the scene-change filter cannot drop them all."""
+    rng = np.random.default_rng(17)
+    frames = []
+    for _ in range(count):
+        pixels = rng.integers(0, 256, size=(FRAME_SIZE[1], FRAME_SIZE[0], 3), dtype=np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(pixels).save(buf, format="JPEG", quality=quality)
+        frames.append(buf.getvalue())
+    return frames
+
+
+def proc_usage(pid: int) -> tuple[float, int] | None:
+    """(CPU seconds, RSS bytes) of a process, from /proc."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    fields = stat.rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLK_TCK
+    rss_kb = next(int(line.split()[1]) for line in status.splitlines() if line.startswith("VmRSS:"))
+    return cpu, rss_kb * 1024
+
+
+def latency_summary(samples: list[float]) -> dict[str, float | int]:
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {
+        "count": int(ms.size),
+        "p50_ms": round(float(p50), 3),
+        "p90_ms": round(float(p90), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def http_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+class SyntheticClient:
+    """One simulated browser: framed PCM + JPEG upstream, binary audio downstream."""
+
+    def __init__(self, url: str, audio_chunk_ms: float, fps: float, frames: list[bytes]) -> None:
+        self.url = url
+        self.chunk_seconds = audio_chunk_ms / 1000
+        self.chunk_bytes = int(INPUT_RATE * self.chunk_seconds) * 2
+        self.frame_interval = 1 / fps if fps > 0 else 0.0
+        self.frames = frames
+        self.measuring = False
+        self.connect_ms: float | None = None
+        self.downstream_latencies: list[float] = []
+        self.counts = {"audio_sent": 0, "video_sent": 0, "audio_received": 0, "text_received": 0}
+        self.error: str | None = None
+
+    async def run(self, stop: asyncio.Event) -> None:
+        started = time.perf_counter()
+        try:
+            async with websockets.connect(self.url, max_size=None) as ws:
+                self.connect_ms = (time.perf_counter() - started) * 1000
+                tasks = [asyncio.create_task(self._send_audio(ws)), asyncio.create_task(self._receive(ws))]
+                if self.frame_interval:
+                    tasks.append(asyncio.create_task(self._send_video(ws)))
+                stopper = asyncio.create_task(stop.wait())
+                done, _ = await asyncio.wait([*tasks, stopper], return_when=asyncio.FIRST_COMPLETED)
+                for task in [*tasks, stopper]:
+                    task.cancel()
+                for task in done:
+                    if task is not stopper and task.exception() is not None:
+                        raise task.exception()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+
+    async def _send_audio(self, ws) -> None:
+        pcm = bytearray(self.chunk_bytes)
+        due = time.perf_counter()
+        while True:
+            AUDIO_STAMP.pack_into(pcm, 0, time.monotonic())
+            frame = encode_media_frame(KIND_AUDIO, "audio/pcm;rate=16000", bytes(pcm), client_ts=time.time() * 1000)
+            await ws.send(frame)
+            self.counts["audio_sent"] += 1
+            due += self.chunk_seconds
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+    async def _send_video(self, ws) -> None:
+        due = time.perf_counter()
+        i = 0
+        while True:
+            frame = self.frames[i % len(self.frames)]
+            await ws.send(
+                encode_media_frame(KIND_VIDEO, "image/jpeg", frame, *FRAME_SIZE, client_ts=time.time() * 1000)
+            )
+            self.counts["video_sent"] += 1
+            i += 1
+            due += self.frame_interval
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+    async def _receive(self, ws) -> None:
+        stamp_end = AUDIO_OUT_HEADER.size + AUDIO_STAMP.size
+        async for message in ws:
+            if isinstance(message, bytes):
+                self.counts["audio_received"] += 1
+                if self.measuring and len(message) >= stamp_end:
+                    sent = AUDIO_STAMP.unpack_from(message, AUDIO_OUT_HEADER.size)[0]
+                    self.downstream_latencies.append(time.monotonic() - sent)
+            else:
+                self.counts["text_received"] += 1
+                if message.startswith('{"clockPing"'):
+                    ping = json.loads(message)["clockPing"]
+                    await ws.send(json.dumps({"clockPong": {**ping, "clientTs": time.time() * 1000}}))
+
+
+class Relay:
+    """The relay under test, as a uvicorn subprocess."""
+
+    def __init__(self, env: dict[str, str], log_file: Path | None) -> None:
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._log = log_file.open("w") if log_file else subprocess.DEVNULL
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port)],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **env},
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+
+    async def wait_ready(self, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"relay exited with code {self.process.returncode}")
+            try:
+                await asyncio.to_thread(http_json, self.base_url + "/")
+                return
+            except OSError:
+                await asyncio.sleep(0.2)
+        raise TimeoutError("relay did not become ready")
+
+    async def runtime(self, reset: bool = False) -> dict:
+        return await asyncio.to_thread(http_json, f"{self.base_url}/api/runtime?reset={str(reset).lower()}")
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        if self._log is not subprocess.DEVNULL:
+            self._log.close()
+
+
+async def run_step(
+    n: int,
+    args: argparse.Namespace,
+    relay: Relay,
+    fake: FakeLiveServer,
+    harness_lag: LoopLagMonitor,
+    signing_key,
+    frames: list[bytes],
+) -> dict:
+    await asyncio.sleep(1.0)  # let the previous step's sessions tear down
+    idle = proc_usage(relay.process.pid)
+
+    clients = []
+    for i in range(n):
+        token = sign_token(signing_key, "load-kid", f"load-{n}-{i}")
+        params = {"mode": args.mode, "protocol": 1, "audio_out": "binary", "clock_sync": 1, "token": token}
+        url = f"ws://127.0.0.1:{relay.port}/ws/live?{urlencode(params)}"
+        clients.append(SyntheticClient(url, args.audio_chunk_ms, args.fps, frames))
+    stop = asyncio.Event()
+    runs = [asyncio.create_task(client.run(stop)) for client in clients]
+
+    await asyncio.sleep(args.warmup)
+    for client in clients:
+        client.measuring = True
+    fake.upstream_latencies.clear()
+    harness_lag.snapshot(reset=True)
+    await relay.runtime(reset=True)
+    turns_before = fake.turns
+    realtime_before = fake.received_count("realtimeInput")
+    start_usage = proc_usage(relay.process.pid)
+    window_start = time.perf_counter()
+
+    peak_rss = start_usage[1] if start_usage else 0
+    while time.perf_counter() - window_start < args.duration:
+        await asyncio.sleep(min(1.0, args.duration))
+        usage = proc_usage(relay.process.pid)
+        if usage:
+            peak_rss = max(peak_rss, usage[1])
+
+    elapsed = time.perf_counter() - window_start
+    end_usage = proc_usage(relay.process.pid)
+    relay_runtime = await relay.runtime()
+    upstream = list(fake.upstream_latencies)
+    downstream = [latency for client in clients for latency in client.downstream_latencies]
+    turns = fake.turns - turns_before
+    model_realtime = fake.received_count("realtimeInput") - realtime_before
+
+    stop.set()
+    await asyncio.gather(*runs)
+
+    cpu = rss = None
+    if idle and start_usage and end_usage:
+        cpu = {
+            "total_percent": round((end_usage[0] - start_usage[0]) / elapsed * 100, 2),
+            "per_session_percent": round((end_usage[0] - start_usage[0]) / elapsed * 100 / n, 3),
+        }
+        rss = {
+            "idle_mb": round(idle[1] / 2**20, 2),
+            "peak_mb": round(peak_rss / 2**20, 2),
+            "per_session_mb": round((peak_rss - idle[1]) / 2**20 / n, 3),
+        }
+    connect = [client.connect_ms / 1000 for client in clients if client.connect_ms is not None]
+    errors = [client.error for client in clients if client.error]
+    counts = {key: sum(client.counts[key] for client in clients) for key in clients[0].counts}
+    return {
+        "sessions": n,
+        "window_seconds": round(elapsed, 3),
+        "connected": len(connect),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "connect": latency_summary(connect),
+        "upstream_latency": latency_summary(upstream),
+        "downstream_latency": latency_summary(downstream),
+        "model_turns": turns,
+        "model_realtime_messages_per_s": round(model_realtime / elapsed, 1),
+        "messages": counts,
+        "relay_cpu": cpu,
+        "relay_rss": rss,
+        "relay_loop_lag": relay_runtime["loop_lag"],
+        "harness_loop_lag": harness_lag.snapshot(),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(output: Path, result: dict) -> Path:
+    output.mkdir(parents=True, exist_ok=True)
+    stem = output / f"relay_load-{datetime.datetime.now(datetime.UTC):%Y%m%dT%H%M%SZ}"
+    json_path = stem.with_suffix(".json")
+    json_path.write_text(json.dumps(result, indent=2) + "\n")
+
+    columns = {
+        "sessions": ("sessions",),
+        "errors": ("errors",),
+        "model_msgs_per_s": ("model_realtime_messages_per_s",),
+        "up_p50_ms": ("upstream_latency", "p50_ms"),
+        "up_p99_ms": ("upstream_latency", "p99_ms"),
+        "down_p50_ms": ("downstream_latency", "p50_ms"),
+        "down_p99_ms": ("downstream_latency", "p99_ms"),
+        "cpu_per_session_percent": ("relay_cpu", "per_session_percent"),
+        "rss_per_session_mb": ("relay_rss", "per_session_mb"),
+        "relay_lag_p99_ms": ("relay_loop_lag", "p99_ms"),
+        "harness_lag_p99_ms": ("harness_loop_lag", "p99_ms"),
+    }
+    with stem.with_suffix(".csv").open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for step in result["steps"]:
+            row = []
+            for path in columns.values():
+                value = step
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                row.append(value)
+            writer.writerow(row)
+    return json_path
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,5,10,25", help="comma-separated client counts, one step each")
+    parser.add_argument("--duration", type=float, default=20.0, help="measurement window per step (s)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds after connecting before measuring")
+    parser.add_argument("--audio-chunk-ms", type=float, default=40.0)
+    parser.add_argument("--fps", type=float, default=1.0, help="JPEG frames per second per client (0 = audio only)")
+    parser.add_argument("--mode", default="spatial")
+    parser.add_argument("--output", type=Path, default=BACKEND_DIR / "benchmarks" / "results")
+    parser.add_argument("--relay-log", type=Path, default=None, help="write the relay's stdout/stderr here")
+    parser.add_argument(
+        "--relay-env", action="append", default=[], metavar="KEY=VALUE", help="extra relay environment (repeatable)"
+    )
+    args = parser.parse_args()
+    steps = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    script = FakeScript(stamp_audio=True)
+    fake = FakeLiveServer(script)
+    await fake.start()
+    keys = KeyServer()
+    signing_key, cert = make_signing_key("load-kid")
+    keys.certs = {"load-kid": cert}
+
+    relay = Relay(
+        {
+            "GEMINI_BASE_URL": fake.base_url,
+            "GEMINI_CA_FILE": str(fake.cert_file),
+            "GEMINI_API_KEY": "fake",
+            "FIREBASE_ADMIN_PROJECT_ID": PROJECT_ID,
+            "FIREBASE_OFFLINE_VERIFY": "true",
+            "SIGNING_KEYS_URL": keys.url,
+            **dict(item.split("=", 1) for item in args.relay_env),
+        },
+        args.relay_log,
+    )
+    harness_lag = LoopLagMonitor()
+    harness_lag.start()
+    frames = jpeg_frames(8)
+
+    result = {
+        "benchmark": "relay_load",
+        "started_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        "commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "sessions": steps,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "audio_chunk_ms": args.audio_chunk_ms,
+            "fps": args.fps,
+            "frame_size": FRAME_SIZE,
+            "jpeg_bytes": int(np.mean([len(frame) for frame in frames])),
+            "mode": args.mode,
+            "relay_env": args.relay_env,
+            "fake_script": {
+                "first_response_ms": script.first_response_ms,
+                "chunk_ms": script.chunk_ms,
+                "audio_chunks": script.audio_chunks,
+                "turn_audio_seconds": script.turn_audio_seconds,
+            },
+        },
+        "steps": [],
+    }
+    try:
+        await relay.wait_ready()
+        for n in steps:
+            step = await run_step(n, args, relay, fake, harness_lag, signing_key, frames)
+            result["steps"].append(step)
+            up, down = step["upstream_latency"], step["downstream_latency"]
+            print(
+                f"N={n:4d}  up p50/p99 {up.get('p50_ms')}/{up.get('p99_ms')} ms  "
+                f"down p50/p99 {down.get('p50_ms')}/{down.get('p99_ms')} ms  "
+                f"model msgs/s {step['model_realtime_messages_per_s']}  "
+                f"cpu/session {(step['relay_cpu'] or {}).get('per_session_percent')}%  "
+                f"rss/session {(step['relay_rss'] or {}).get('per_session_mb')} MB  "
+                f"relay lag p99 {step['relay_loop_lag'].get('p99_ms')} ms  "
+                f"harness lag p99 {step['harness_loop_lag'].get('p99_ms')} ms  errors {step['errors']}"
+            )
+    finally:
+        relay.stop()
+        await harness_lag.stop()
+        await fake.stop()
+        keys.close()
+
+    print(f"results: {write_results(args.output, result)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
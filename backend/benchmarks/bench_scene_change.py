@@ -0,0 +1,67 @@
+"""
+Benchmark: near-duplicate frame suppression on a mostly static camera.
+
+Generates a synthetic 640x480 JPEG stream (static scene + sensor noise, with a
+moving object every few seconds), runs it through SceneChangeDetector and
+reports the suppression ratio and the latency the check adds per frame.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_scene_change.py [--frames 300] [--change-every 20]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from scene_change import SceneChangeDetector
+
+
+def make_stream(frames: int, change_every: int, seed: int = 7) -> list[bytes]:
+    rng = np.random.default_rng(seed)
+    base = rng.integers(40, 200, size=(480, 640, 3), dtype=np.uint8)
+    out: list[bytes] = []
+    x = 50
+    for i in range(frames):
+        if i and i % change_every == 0:
+            x = (x + 120) % 520
+        img = base.copy()
+        img[200:320, x : x + 100] = (230, 30, 30)
+        noise = rng.integers(-6, 7, size=img.shape, dtype=np.int16)
+        img = np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(img).save(buf, "JPEG", quality=65)
+        out.append(buf.getvalue())
+    return out
+
+
+async def run(frames: list[bytes]) -> dict:
+    detector = SceneChangeDetector()
+    forwarded = 0
+    for frame in frames:
+        forwarded += await detector.is_new_scene(frame)
+    return {"forwarded": forwarded, **detector.stats()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--change-every", type=int, default=20)
+    args = parser.parse_args()
+
+    stream = make_stream(args.frames, args.change_every)
+    expected = 1 + (args.frames - 1) // args.change_every
+    stats = asyncio.run(run(stream))
+    print(f"frames: {args.frames}  real scene changes: {expected}")
+    for key, value in stats.items():
+        print(f"  {key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: server-side voice gate (voice_activity.py) on synthetic speech.
+
+Builds a 16 kHz stream of utterances (voiced harmonics with syllable-rate
+amplitude modulation, plus quiet fricative bursts at word edges) separated by
+pauses, over background noise at several levels. It streams the audio through
+VoiceGate in browser-sized chunks and reports, per noise level:
+
+  suppressed        share of all audio not forwarded to the model
+  speech clipped    share of ground-truth speech samples that were dropped
+  onsets clipped    utterances whose first chunk was not forwarded
+  min trailing      shortest stretch of audio forwarded after an utterance
+                    ends (what the model's own end-of-speech detector hears)
+  cost              gate time per chunk, which is all it adds to turn latency:
+                    the pre-roll is flushed together with the onset chunk, so
+                    speech onsets are never held back
+
+Usage (from backend/):
+  uv run python benchmarks/bench_vad.py [--seconds 120] [--chunk-ms 40]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from voice_activity import SAMPLE_RATE, VAD_HANGOVER_MS, VoiceGate
+
+NOISE_LEVELS_DBFS = (-70.0, -55.0, -45.0)
+
+
+def db_to_amplitude(dbfs: float) -> float:
+    return 32768 * 10 ** (dbfs / 20)
+
+
+def synthetic_speech(rng: np.random.Generator, seconds: float, noise_dbfs: float) -> tuple[np.ndarray, np.ndarray]:
+    """int16 samples and a boolean ground-truth speech mask."""
+    n = int(seconds * SAMPLE_RATE)
+    audio = rng.normal(0, db_to_amplitude(noise_dbfs), n)
+    mask = np.zeros(n, dtype=bool)
+    t = 1.0 + rng.uniform(0, 1)
+    while t < seconds - 3:
+        length = rng.uniform(0.6, 2.5)
+        start, end = int(t * SAMPLE_RATE), int((t + length) * SAMPLE_RATE)
+        times = np.arange(end - start) / SAMPLE_RATE
+        f0 = rng.uniform(110, 220)
+        voiced = sum(np.sin(2 * np.pi * f0 * k * times + rng.uniform(0, 6.28)) / k for k in range(1, 6))
+        syllables = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3, 5) * times)
+        level = db_to_amplitude(rng.uniform(-30, -20))
+        segment = level * syllables * voiced / 2.3
+        # Quiet, noisy fricatives at both word edges.
+        edge = int(0.08 * SAMPLE_RATE)
+        hiss = np.diff(rng.normal(0, db_to_amplitude(-38), edge + 1))
+        segment[:edge] = hiss
+        segment[-edge:] = hiss
+        audio[start:end] += segment
+        mask[start:end] = True
+        t += length + rng.uniform(0.8, 4.0)
+    return np.clip(audio, -32768, 32767).astype("<i2"), mask
+
+
+def run_gate(samples: np.ndarray, mask: np.ndarray, chunk_ms: float) -> dict[str, float]:
+    gate = VoiceGate()
+    chunk = int(SAMPLE_RATE * chunk_ms / 1000)
+    forwarded = np.zeros(samples.size, dtype=bool)
+    offsets: dict[int, int] = {}
+    costs = []
+    for offset in range(0, samples.size - chunk + 1, chunk):
+        data = samples[offset : offset + chunk].tobytes()
+        offsets[id(data)] = offset
+        started = time.perf_counter()
+        out = gate.admit("audio/pcm;rate=16000", data)
+        costs.append(time.perf_counter() - started)
+        # The gate returns the original chunk objects, so their offsets are known.
+        for piece in out:
+            piece_offset = offsets[id(piece)]
+            forwarded[piece_offset : piece_offset + len(piece) // 2] = True
+    covered = mask[: forwarded.size]
+    starts = np.flatnonzero(np.diff(mask.astype(np.int8)) == 1) + 1
+    ends = np.flatnonzero(np.diff(mask.astype(np.int8)) == -1) + 1
+    trailing = []
+    for end in ends:
+        run = np.argmin(forwarded[end:]) if not forwarded[end:].all() else forwarded.size - end
+        trailing.append(run / SAMPLE_RATE * 1000)
+    stats = gate.stats()
+    return {
+        "suppressed": stats["suppressed_ratio"],
+        "speech_clipped": float(np.count_nonzero(covered & ~forwarded) / max(1, np.count_nonzero(covered))),
+        "onsets_clipped": int(np.count_nonzero(~forwarded[starts])),
+        "utterances": int(starts.size),
+        "min_trailing_ms": min(trailing) if trailing else 0.0,
+        "cost_us_p50": statistics.median(costs) * 1e6,
+        "cost_us_p99": float(np.percentile(costs, 99)) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=120.0)
+    parser.add_argument("--chunk-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    print(f"hang-over {VAD_HANGOVER_MS:.0f} ms, chunk {args.chunk_ms:.0f} ms, {args.seconds:.0f} s per run")
+    for noise in NOISE_LEVELS_DBFS:
+        samples, mask = synthetic_speech(np.random.default_rng(21), args.seconds, noise)
+        r = run_gate(samples, mask, args.chunk_ms)
+        print(
+            f"noise {noise:5.0f} dBFS: suppressed {r['suppressed']:6.1%}  "
+            f"speech clipped {r['speech_clipped']:6.2%}  onsets clipped {r['onsets_clipped']}/{r['utterances']}  "
+            f"min trailing {r['min_trailing_ms']:6.0f} ms  "
+            f"cost p50/p99 {r['cost_us_p50']:.1f}/{r['cost_us_p99']:.1f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
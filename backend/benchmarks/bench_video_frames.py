@@ -0,0 +1,82 @@
+"""
+Benchmark: legacy JSON/base64 video frames vs. protocol=1 binary frames.
+
+Measures what the relay's upstream task spends per frame before the Blob reaches
+LiveRequestQueue, and how many bytes each format puts on the wire.
+
+Usage (from backend/):
+  uv run python benchmarks/bench_video_frames.py [--iterations 2000]
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.genai import types
+
+from wire_protocol import KIND_VIDEO, decode_media_frame, encode_media_frame
+
+FRAME_SIZES = [30_000, 80_000, 250_000]
+
+
+def json_path(message: str) -> types.Blob:
+    parsed = json.loads(message)
+    video = parsed["realtimeInput"]["video"]
+    return types.Blob(mime_type=video.get("mimeType", "image/jpeg"), data=base64.b64decode(video["data"]))
+
+
+def binary_path(message: bytes) -> types.Blob:
+    frame = decode_media_frame(message)
+    return types.Blob(mime_type=frame.mime_type, data=frame.data)
+
+
+def time_per_call(fn, arg, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'frame':>9} | {'json bytes':>10} | {'bin bytes':>10} | {'saved':>6} | {'json µs':>8} | {'bin µs':>8}")
+    print("-" * 68)
+    for size in FRAME_SIZES:
+        # Random bytes behave like JPEG entropy-coded data (incompressible).
+        jpeg = os.urandom(size)
+        json_msg = json.dumps(
+            {
+                "realtimeInput": {
+                    "video": {
+                        "mimeType": "image/jpeg",
+                        "data": base64.b64encode(jpeg).decode("ascii"),
+                        "width": 640,
+                        "height": 480,
+                    }
+                }
+            }
+        )
+        bin_msg = encode_media_frame(KIND_VIDEO, "image/jpeg", jpeg, 640, 480, time.time() * 1000)
+
+        assert json_path(json_msg).data == binary_path(bin_msg).data
+
+        json_us = time_per_call(json_path, json_msg, args.iterations)
+        bin_us = time_per_call(binary_path, bin_msg, args.iterations)
+        json_bytes = len(json_msg.encode())
+        saved = 1 - len(bin_msg) / json_bytes
+        print(
+            f"{size // 1000:>7}KB | {json_bytes:>10} | {len(bin_msg):>10} | {saved:>6.1%} | "
+            f"{json_us:>8.1f} | {bin_us:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Representative ADK events for downstream benchmarks.
+
+`load_events` reads newline-delimited event JSON (as produced by
+`Event.model_dump_json`) when a recording is available; `build_turn` synthesizes
+a model turn with the same shape: PCM chunks, interleaved output transcriptions,
+a track_and_highlight call and turnComplete.
+"""
+
+import os
+from pathlib import Path
+
+from google.adk.events import Event
+from google.genai import types
+
+AUTHOR = "SpatialEye_spatial"
+
+
+def load_events(path: str | Path) -> list[Event]:
+    with open(path, encoding="utf-8") as f:
+        return [Event.model_validate_json(line) for line in f if line.strip()]
+
+
+def build_turn(chunk_bytes: int = 3840, audio_chunks: int = 40) -> list[Event]:
+    events: list[Event] = []
+    for i in range(audio_chunks):
+        pcm = types.Blob(mime_type="audio/pcm;rate=24000", data=os.urandom(chunk_bytes))
+        events.append(
+            Event(
+                author=AUTHOR,
+                invocation_id="e-bench",
+                partial=True,
+                content=types.Content(role="model", parts=[types.Part(inline_data=pcm)]),
+            )
+        )
+        if i % 8 == 0:
+            events.append(
+                Event(
+                    author=AUTHOR,
+                    invocation_id="e-bench",
+                    partial=True,
+                    output_transcription=types.Transcription(text="Sure thing, highlighting that "),
+                )
+            )
+    events.append(
+        Event(
+            author=AUTHOR,
+            invocation_id="e-bench",
+            content=types.Content(
+                role="model",
+                parts=[
+                    types.Part(
+                        function_call=types.FunctionCall(
+                            id="call-1",
+                            name="track_and_highlight",
+                            args={"label": "mug", "internal_context_check": "on desk", "box_2d": [100, 200, 400, 500]},
+                        )
+                    )
+                ],
+            ),
+        )
+    )
+    events.append(Event(author=AUTHOR, invocation_id="e-bench", turn_complete=True))
+    return events
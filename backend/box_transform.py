@@ -0,0 +1,116 @@
+"""
+Box Transforms
+
+Gemini's spatial tools return `box_2d = [ymin, xmin, ymax, xmax]` normalized to
+0-1000. Where that lands on a frame depends on which space the model meant, so
+this module maps whole arrays of boxes between three spaces:
+
+  normalized  0-1000 relative to the frame itself, [ymin, xmin, ymax, xmax]
+  padded      0-1000 relative to the frame letterboxed (centered) into a
+              square, [ymin, xmin, ymax, xmax]
+  pixel       frame pixels, [xmin, ymin, xmax, ymax]
+
+Every function takes an (N, 4) array (or a single box of shape (4,)) and frame
+sizes that are scalars or length-N arrays, so one call maps a batch of boxes
+from frames of mixed sizes.
+
+BOX_MAPPING picks how the relay turns a tool call's box_2d into the pixel box
+it attaches for clients: "direct" treats it as normalized, "unpadded" as padded.
+"""
+
+import math
+import os
+
+import numpy as np
+
+BOX_MAPPING = os.getenv("BOX_MAPPING", "direct")
+
+SCALE = 1000.0
+
+
+def _boxes(boxes) -> tuple[np.ndarray, bool]:
+    arr = np.asarray(boxes, dtype=np.float64)
+    return np.atleast_2d(arr), arr.ndim == 1
+
+
+def _sizes(width, height) -> tuple[np.ndarray, np.ndarray]:
+    return np.asarray(width, dtype=np.float64), np.asarray(height, dtype=np.float64)
+
+
+def _result(out: np.ndarray, single: bool) -> np.ndarray:
+    return out[0] if single else out
+
+
+def letterbox_padding(width, height) -> tuple[np.ndarray, np.ndarray]:
+    """Padding on the y and x axes (in 0-1000 units) of the square a frame is letterboxed into."""
+    w, h = _sizes(width, height)
+    aspect = w / h
+    pad_y = np.where(aspect > 1, (SCALE - SCALE / aspect) / 2, 0.0)
+    pad_x = np.where(aspect > 1, 0.0, (SCALE - SCALE * aspect) / 2)
+    return pad_y, pad_x
+
+
+def normalized_to_pixel(boxes, width, height) -> np.ndarray:
+    """[ymin, xmin, ymax, xmax] in 0-1000 → [xmin, ymin, xmax, ymax] in pixels."""
+    b, single = _boxes(boxes)
+    w, h = _sizes(width, height)
+    sx, sy = w / SCALE, h / SCALE
+    out = np.stack([b[:, 1] * sx, b[:, 0] * sy, b[:, 3] * sx, b[:, 2] * sy], axis=-1)
+    return _result(out, single)
+
+
+def pixel_to_normalized(boxes, width, height) -> np.ndarray:
+    """[xmin, ymin, xmax, ymax] in pixels → [ymin, xmin, ymax, xmax] in 0-1000."""
+    b, single = _boxes(boxes)
+    w, h = _sizes(width, height)
+    sx, sy = SCALE / w, SCALE / h
+    out = np.stack([b[:, 1] * sy, b[:, 0] * sx, b[:, 3] * sy, b[:, 2] * sx], axis=-1)
+    return _result(out, single)
+
+
+def padded_to_normalized(boxes, width, height, clip: bool = True) -> np.ndarray:
+    """Padded-square 0-1000 → frame 0-1000. Parts inside the padding are clipped away."""
+    b, single = _boxes(boxes)
+    pad_y, pad_x = letterbox_padding(width, height)
+    ky = SCALE / (SCALE - 2 * pad_y)
+    kx = SCALE / (SCALE - 2 * pad_x)
+    out = np.stack(
+        [(b[:, 0] - pad_y) * ky, (b[:, 1] - pad_x) * kx, (b[:, 2] - pad_y) * ky, (b[:, 3] - pad_x) * kx],
+        axis=-1,
+    )
+    if clip:
+        np.clip(out, 0.0, SCALE, out=out)
+    return _result(out, single)
+
+
+def normalized_to_padded(boxes, width, height) -> np.ndarray:
+    """Frame 0-1000 → padded-square 0-1000."""
+    b, single = _boxes(boxes)
+    pad_y, pad_x = letterbox_padding(width, height)
+    ky = (SCALE - 2 * pad_y) / SCALE
+    kx = (SCALE - 2 * pad_x) / SCALE
+    out = np.stack(
+        [b[:, 0] * ky + pad_y, b[:, 1] * kx + pad_x, b[:, 2] * ky + pad_y, b[:, 3] * kx + pad_x],
+        axis=-1,
+    )
+    return _result(out, single)
+
+
+def padded_to_pixel(boxes, width, height) -> np.ndarray:
+    return normalized_to_pixel(padded_to_normalized(boxes, width, height), width, height)
+
+
+def to_pixels(boxes, width, height, mapping: str = BOX_MAPPING) -> np.ndarray:
+    """Pixel boxes for model box_2d values under the given mapping ("direct" or "unpadded")."""
+    if mapping == "unpadded":
+        return padded_to_pixel(boxes, width, height)
+    return normalized_to_pixel(boxes, width, height)
+
+
+def parse_box_2d(value) -> list[float] | None:
+    """`value` as [ymin, xmin, ymax, xmax] floats if it is four finite numbers, else None."""
+    if not isinstance(value, list | tuple) or len(value) != 4:
+        return None
+    if not all(isinstance(v, int | float) and not isinstance(v, bool) and math.isfinite(v) for v in value):
+        return None
+    return [float(v) for v in value]
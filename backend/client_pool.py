@@ -0,0 +1,112 @@
+"""
+genai Client Pool
+
+Building a `google.genai.Client` is expensive (SSL contexts, httpx/aiohttp
+sessions, auth setup) — over 100 ms each on a warm container — and GeminiBeta
+used to build two of them for every WebSocket connection. BYOK users reconnect
+often, so this pool keeps one client per (API key, API version) for the whole
+process.
+
+Entries are keyed by a SHA-256 of the key, never the key itself, evicted after
+CLIENT_POOL_IDLE_TTL seconds without use, and capped at CLIENT_POOL_MAX with LRU
+eviction. Evicted clients are only dereferenced, not closed: a live session may
+still hold one, and genai closes its transports when the client is collected.
+
+GEMINI_BASE_URL / GEMINI_CA_FILE point every client at another endpoint, e.g.
+the local stand-in in fake_live_server.py (which serves TLS with its own CA).
+"""
+
+import hashlib
+import os
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from google.genai import Client, types
+
+CLIENT_POOL_MAX = int(os.getenv("CLIENT_POOL_MAX", "256"))
+CLIENT_POOL_IDLE_TTL = float(os.getenv("CLIENT_POOL_IDLE_TTL", "900"))
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+GEMINI_CA_FILE = os.getenv("GEMINI_CA_FILE")
+
+
+def _pool_key(api_key: str | None, api_version: str) -> str:
+    return hashlib.sha256(f"{api_version}\x00{api_key or ''}".encode()).hexdigest()
+
+
+def _http_options(api_version: str, headers: dict[str, str] | None) -> types.HttpOptions:
+    options = types.HttpOptions(api_version=api_version, headers=headers, base_url=GEMINI_BASE_URL)
+    if GEMINI_CA_FILE:
+        # The Live API websocket takes its SSL context from async_client_args["ssl"].
+        context = ssl.create_default_context(cafile=GEMINI_CA_FILE)
+        options.async_client_args = {"ssl": context, "verify": context}
+        options.client_args = {"verify": context}
+    return options
+
+
+class ClientPool:
+    """Process-wide LRU + idle-TTL cache of genai Clients."""
+
+    def __init__(
+        self,
+        max_size: int = CLIENT_POOL_MAX,
+        idle_ttl: float = CLIENT_POOL_IDLE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_size = max(1, max_size)
+        self._idle_ttl = idle_ttl
+        self._clock = clock
+        self._clients: OrderedDict[str, tuple[Client, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, api_key: str | None, api_version: str, headers: dict[str, str] | None = None) -> Client:
+        """Return a pooled client, creating it on first use. `api_key=None` uses the server env key."""
+        key = _pool_key(api_key, api_version)
+        now = self._clock()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients[key] = (entry[0], now)
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            http_options = _http_options(api_version, headers)
+            if api_key:
+                client = Client(api_key=api_key, http_options=http_options)
+            else:
+                client = Client(http_options=http_options)
+            self._clients[key] = (client, now)
+            while len(self._clients) > self._max_size:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+            return client
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._clients),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict_idle(self, now: float) -> None:
+        # Oldest-used entries sit at the front, so stop at the first fresh one.
+        while self._clients:
+            key, (_, last_used) = next(iter(self._clients.items()))
+            if now - last_used < self._idle_ttl:
+                break
+            del self._clients[key]
+            self.evictions += 1
+
+
+client_pool = ClientPool()
@@ -0,0 +1,137 @@
+"""
+Clock Sync & Glass-to-Glass Latency
+
+Splits media latency into three legs so a slow session can be blamed on the
+browser, the relay or the model side:
+
+  capture_to_relay   client capture timestamp → relay receive
+                     (browser encode + uplink; needs clock sync)
+  relay_to_model     relay receive → picked up by the ADK's model sender
+                     (backpressure waits + time in the IngestQueue)
+  model_to_client    model event reaches the relay → sent to the client, plus
+                     half the measured round trip as the downlink estimate
+
+Capture timestamps come from the client: `client_ts` in protocol=1 media
+frames (wire_protocol.py), or a `clientTs` field next to `data` in JSON
+realtimeInput media / video. Both are milliseconds on the client's wall clock
+(performance.timeOrigin + performance.now()).
+
+Clock sync is opt-in with the `clock_sync=1` query parameter. The relay then
+sends NTP-style pings:
+
+  relay → client   {"clockPing": {"id": 3, "serverTs": <relay ms>}}
+  client → relay   {"clockPong": {"id": 3, "serverTs": <echoed>, "clientTs": <client ms at receipt>}}
+
+and estimates the client's clock offset from the lowest-RTT sample of the
+last CLOCK_SYNC_SAMPLES. Pings go out in a quick burst after connect and every
+CLOCK_SYNC_INTERVAL seconds after that. Without sync only relay_to_model is
+reported.
+
+Every sample goes into relay_glass_latency_seconds{mode,leg,kind} (see
+relay_metrics.py); LatencyBreakdown.summary() gives per-session percentiles
+for the session-end log.
+"""
+
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from relay_metrics import GLASS_LATENCY  # type: ignore
+
+CLOCK_SYNC_INTERVAL = float(os.getenv("CLOCK_SYNC_INTERVAL", "10"))
+CLOCK_SYNC_BURST = int(os.getenv("CLOCK_SYNC_BURST", "5"))
+CLOCK_SYNC_SAMPLES = int(os.getenv("CLOCK_SYNC_SAMPLES", "16"))
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "2000"))
+
+LEGS = (
+    ("capture_to_relay", "audio"),
+    ("capture_to_relay", "video"),
+    ("relay_to_model", "audio"),
+    ("relay_to_model", "video"),
+    ("model_to_client", "event"),
+)
+
+
+def wall_ms() -> float:
+    return time.time() * 1000
+
+
+class ClockSync:
+    """Estimates `client clock - relay clock` from ping / pong round trips."""
+
+    def __init__(self, samples: int = CLOCK_SYNC_SAMPLES, clock: Callable[[], float] = wall_ms) -> None:
+        self._clock = clock
+        self._next_id = 0
+        self._pending: dict[int, float] = {}
+        self._samples: deque[tuple[float, float]] = deque(maxlen=samples)  # (rtt_ms, offset_ms)
+        self.offset_ms: float | None = None
+        self.rtt_ms: float | None = None
+
+    @property
+    def synced(self) -> bool:
+        return self.offset_ms is not None
+
+    def ping(self) -> dict[str, Any]:
+        self._next_id += 1
+        sent = self._clock()
+        self._pending[self._next_id] = sent
+        if len(self._pending) > CLOCK_SYNC_BURST * 4:
+            self._pending.pop(next(iter(self._pending)))
+        return {"clockPing": {"id": self._next_id, "serverTs": sent}}
+
+    def pong(self, message: dict[str, Any]) -> None:
+        received = self._clock()
+        sent = self._pending.pop(int(message.get("id", -1)), None)
+        client_ts = message.get("clientTs")
+        if sent is None or not isinstance(client_ts, int | float):
+            return
+        rtt = received - sent
+        self._samples.append((rtt, float(client_ts) - (sent + received) / 2))
+        self.rtt_ms, self.offset_ms = min(self._samples)
+
+    def to_relay_ms(self, client_ms: float) -> float:
+        return client_ms - (self.offset_ms or 0.0)
+
+
+class LatencyBreakdown:
+    """One session's per-leg latency samples."""
+
+    def __init__(self, mode: str, sync: ClockSync | None = None, window: int = LATENCY_WINDOW) -> None:
+        self.sync = sync
+        self._histograms = {leg: GLASS_LATENCY.labels(mode, *leg) for leg in LEGS}
+        self._samples: dict[tuple[str, str], deque[float]] = {leg: deque(maxlen=window) for leg in LEGS}
+
+    def _record(self, leg: tuple[str, str], seconds: float) -> None:
+        self._histograms[leg].observe(seconds)
+        self._samples[leg].append(seconds)
+
+    def captured(self, kind: str, client_ts_ms: float, received_ms: float) -> None:
+        """A media message with a client capture timestamp reached the relay at `received_ms` (wall clock)."""
+        if self.sync is None or not self.sync.synced or client_ts_ms <= 0:
+            return
+        self._record(("capture_to_relay", kind), max(0.0, received_ms - self.sync.to_relay_ms(client_ts_ms)) / 1000)
+
+    def model_sender(self, kind: str, seconds: float) -> None:
+        """IngestQueue callback: a realtime blob was handed to the model sender."""
+        self._record(("relay_to_model", kind), seconds)
+
+    def sent_to_client(self, relay_seconds: float) -> None:
+        if self.sync is None or self.sync.rtt_ms is None:
+            return
+        self._record(("model_to_client", "event"), relay_seconds + self.sync.rtt_ms / 2000)
+
+    def summary(self) -> dict[str, Any]:
+        legs: dict[str, dict[str, float]] = {}
+        for (leg, kind), samples in self._samples.items():
+            if not samples:
+                continue
+            ms = np.fromiter(samples, dtype=np.float64) * 1000
+            p50, p99 = np.percentile(ms, [50, 99])
+            legs[f"{leg}.{kind}"] = {"n": int(ms.size), "p50_ms": round(float(p50), 1), "p99_ms": round(float(p99), 1)}
+        if self.sync is not None and self.sync.synced:
+            legs["clock"] = {"offset_ms": round(self.sync.offset_ms, 1), "rtt_ms": round(self.sync.rtt_ms, 1)}
+        return legs
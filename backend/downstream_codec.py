@@ -0,0 +1,238 @@
+"""
+Downstream Audio Codec
+
+Model audio (24 kHz PCM, 384 kbit/s before base64) is the largest stream the
+relay sends. With the `audio_codec` query parameter a connection gets it
+encoded instead:
+
+  pcm     unchanged (default)
+  pcmu    G.711 µ-law at 24 kHz, 8 bits per sample (192 kbit/s); every model
+          chunk is encoded on its own, so nothing is held back
+  opus    Opus at AUDIO_OUT_OPUS_BITRATE (default 32 kbit/s), one 20 ms packet
+          per message / part, for a WebCodecs AudioDecoder. Needs PyAV (the
+          `opus` extra).
+
+Encoded audio goes out wherever the PCM would have: binary frames for
+`audio_out=binary` (wire_protocol.py, the mime code tells the client the
+format) or inline_data parts of the event JSON, with the new mime type.
+
+Opus works on whole 20 ms frames, so up to one frame of a model chunk waits
+for the next chunk. Encoder state lives for one model turn:
+
+  turnComplete   the tail is zero-padded to a frame, the encoder is drained
+                 and its last packets go out before the event
+  interrupted    the tail is dropped and the encoder reset at once, since the
+                 client discards the rest of the interrupted turn anyway
+
+Encoding runs in a small shared thread pool (libopus and numpy release the
+GIL), so the event loop only waits on a future.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+from google.genai import types
+
+from audio_ingest import parse_mime  # type: ignore
+
+try:
+    import av
+except ImportError:  # optional: pip install 'backend[opus]'
+    av = None
+
+AUDIO_OUT_OPUS_BITRATE = int(os.getenv("AUDIO_OUT_OPUS_BITRATE", "32000"))
+# libopus complexity 0-10; 5 costs about half of the default 10 for speech at the same bitrate.
+AUDIO_OUT_OPUS_COMPLEXITY = int(os.getenv("AUDIO_OUT_OPUS_COMPLEXITY", "5"))
+AUDIO_ENCODE_WORKERS = int(os.getenv("AUDIO_ENCODE_WORKERS", "2"))
+
+MODEL_RATE = 24000
+OPUS_FRAME_SECONDS = 0.02  # libopus default frame size, one packet each
+PCM_MIME_TYPES = frozenset({"audio/pcm;rate=24000", "audio/pcm"})
+AUDIO_CODECS = ("pcm", "pcmu", "opus")
+OPUS_AVAILABLE = av is not None
+
+_executor = ThreadPoolExecutor(max_workers=AUDIO_ENCODE_WORKERS, thread_name_prefix="audio-encode")
+
+
+def _ulaw_encode_table() -> np.ndarray:
+    """µ-law byte for every int16 value, indexed by the value's uint16 bit pattern."""
+    x = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    sign = np.where(x < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(x), 32635) + 0x84
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+class _UlawEncoder:
+    mime_type = "audio/pcmu;rate=24000"
+    # Every chunk is encoded on its own: nothing is ever held back.
+    active = False
+    pending_samples = 0
+
+    _table: np.ndarray | None = None
+
+    def __init__(self) -> None:
+        if _UlawEncoder._table is None:
+            _UlawEncoder._table = _ulaw_encode_table()
+
+    def encode(self, pcm: bytes) -> list[bytes]:
+        samples = np.frombuffer(pcm, dtype="<u2", count=len(pcm) // 2)
+        return [self._table[samples].tobytes()]
+
+    def flush(self) -> list[bytes]:
+        return []
+
+    def reset(self) -> None:
+        pass
+
+
+class _OpusEncoder:
+    mime_type = "audio/opus"
+
+    def __init__(self, bitrate: int = AUDIO_OUT_OPUS_BITRATE) -> None:
+        self._bitrate = bitrate
+        self._codec = None
+        self._pending = bytearray()
+        self._pts = 0
+
+    def _open(self):
+        codec = av.CodecContext.create("libopus", "w")
+        codec.sample_rate, codec.layout, codec.format, codec.bit_rate = MODEL_RATE, "mono", "s16", self._bitrate
+        codec.options = {"compression_level": str(AUDIO_OUT_OPUS_COMPLEXITY)}
+        codec.open()
+        return codec
+
+    def _encode_frames(self, pcm: bytes) -> list[bytes]:
+        if self._codec is None:
+            self._codec = self._open()
+        frame_bytes = self._codec.frame_size * 2
+        self._pending += pcm
+        packets = []
+        whole = len(self._pending) - len(self._pending) % frame_bytes
+        frames = np.frombuffer(bytes(self._pending[:whole]), dtype="<i2").reshape(-1, self._codec.frame_size)
+        del self._pending[:whole]
+        for samples in frames:
+            frame = av.AudioFrame.from_ndarray(samples[None, :], format="s16", layout="mono")
+            frame.sample_rate, frame.pts = MODEL_RATE, self._pts
+            self._pts += self._codec.frame_size
+            packets += [bytes(packet) for packet in self._codec.encode(frame)]
+        return packets
+
+    def encode(self, pcm: bytes) -> list[bytes]:
+        return self._encode_frames(pcm)
+
+    def flush(self) -> list[bytes]:
+        if self._codec is None:
+            return []
+        packets = []
+        if self._pending:
+            padding = self._codec.frame_size * 2 - len(self._pending)
+            packets += self._encode_frames(bytes(padding))
+        packets += [bytes(packet) for packet in self._codec.encode(None)]
+        self.reset()
+        return packets
+
+    def reset(self) -> None:
+        self._codec = None
+        self._pending.clear()
+        self._pts = 0
+
+    @property
+    def active(self) -> bool:
+        """A stream is open (the encoder may hold look-ahead even with no pending samples)."""
+        return self._codec is not None
+
+    @property
+    def pending_samples(self) -> int:
+        return len(self._pending) // 2
+
+
+class DownstreamEncoder:
+    """One connection's model-audio encoder; state is kept per model turn."""
+
+    def __init__(self, codec: str) -> None:
+        if codec == "opus":
+            if not OPUS_AVAILABLE:
+                raise ValueError("audio_codec=opus needs PyAV (pip install 'backend[opus]')")
+            self._encoder: _UlawEncoder | _OpusEncoder = _OpusEncoder()
+        elif codec == "pcmu":
+            self._encoder = _UlawEncoder()
+        else:
+            raise ValueError(f"Unsupported audio_codec: {codec}")
+        self.codec = codec
+        self.mime_type = self._encoder.mime_type
+
+        self.pcm_bytes = 0
+        self.encoded_bytes = 0
+        self.encode_cpu = 0.0
+        self.interrupted = 0
+
+    def _encode(self, blobs: list[types.Blob], end_turn: bool) -> tuple[list[types.Blob], float]:
+        started = time.thread_time()
+        out: list[types.Blob] = []
+        for blob in blobs:
+            if blob.mime_type not in PCM_MIME_TYPES or not blob.data:
+                out.append(blob)
+                continue
+            self.pcm_bytes += len(blob.data)
+            out += [types.Blob(mime_type=self.mime_type, data=packet) for packet in self._encoder.encode(blob.data)]
+        if end_turn:
+            out += [types.Blob(mime_type=self.mime_type, data=packet) for packet in self._encoder.flush()]
+        return out, time.thread_time() - started
+
+    async def encode(self, blobs: list[types.Blob], end_turn: bool = False) -> list[types.Blob]:
+        """Model audio blobs → encoded blobs (fewer or none while an Opus frame fills).
+
+        `end_turn` also emits the rest of the turn; the next chunk starts a fresh stream.
+        """
+        if not blobs and not (end_turn and self._encoder.active):
+            return blobs
+        out, cpu = await asyncio.get_running_loop().run_in_executor(_executor, self._encode, blobs, end_turn)
+        self.encode_cpu += cpu
+        self.encoded_bytes += sum(len(blob.data) for blob in out if blob.mime_type == self.mime_type)
+        return out
+
+    def interrupt(self) -> None:
+        """Drop the turn's unsent tail and reset the encoder immediately."""
+        if self._encoder.pending_samples:
+            self.interrupted += 1
+        self._encoder.reset()
+
+    @property
+    def pending_ms(self) -> float:
+        return self._encoder.pending_samples / MODEL_RATE * 1000
+
+    def stats(self) -> dict[str, float | int | str]:
+        return {
+            "codec": self.codec,
+            "pcm_bytes": self.pcm_bytes,
+            "encoded_bytes": self.encoded_bytes,
+            "saved_ratio": round(1 - self.encoded_bytes / self.pcm_bytes, 3) if self.pcm_bytes else 0.0,
+            "encode_cpu_ms": round(self.encode_cpu * 1000, 1),
+            "interrupted_tails": self.interrupted,
+        }
+
+
+def blob_seconds(blob: types.Blob) -> float:
+    """Playback duration of a model audio blob: PCM, µ-law, or one Opus packet."""
+    base, rate = parse_mime(blob.mime_type or "")
+    if base == "audio/opus":
+        return OPUS_FRAME_SECONDS
+    bytes_per_sample = 1 if base == "audio/pcmu" else 2
+    return len(blob.data or b"") / bytes_per_sample / (rate or MODEL_RATE)
+
+
+def with_audio_parts(event: Any, stripped: Any | None, blobs: list[types.Blob]) -> Any:
+    """The event to send for the JSON path: `stripped` (from split_audio_parts) with `blobs` as leading parts."""
+    base = stripped if stripped is not None else event
+    rest = list(stripped.content.parts) if stripped is not None and stripped.content and stripped.content.parts else []
+    parts = [types.Part(inline_data=blob) for blob in blobs] + rest
+    content = (
+        event.content.model_copy(update={"parts": parts}) if event.content else types.Content(role="model", parts=parts)
+    )
+    return base.model_copy(update={"content": content})
@@ -0,0 +1,256 @@
+"""
+Downstream Scheduler
+
+Everything the relay sends to the client goes through one writer task fed by
+three queues, instead of each event being awaited onto the socket in arrival
+order (where a `track_and_highlight` call could sit behind seconds of model
+audio that the model produced faster than real time):
+
+  control     tool calls, interruptions, errors, videoRate, clock pings and
+              anything unclassified — always sent first
+  audio       model audio (and turnComplete, which must follow its audio) —
+              paced to at most DOWNSTREAM_AUDIO_LEAD_MS ahead of real-time
+              playback, so the socket stays free for control messages
+  transcript  transcription-only events — best effort: sent when nothing
+              else is due
+
+Every lane is bounded, so a client that reads slower than the model talks
+cannot grow the relay's memory:
+
+  control     DOWNSTREAM_CONTROL_MAX items: `put` waits for the writer;
+              `put_nowait` (pings, videoRate, errors) drops the new message
+  audio       DOWNSTREAM_AUDIO_MAX_SECONDS of queued audio: `put` waits, which
+              in turn stops reading from the model
+  transcript  DOWNSTREAM_TRANSCRIPT_MAX items: the oldest is dropped
+
+An item is one or more payloads written back to back (an event's binary audio
+frames plus its JSON). `interrupt()` drops queued audio: the client throws the
+rest of an interrupted turn away anyway. An audio item that also carries
+something the client needs (a transcript, turnComplete) is queued with `keep`:
+on interruption it is cut down to those payloads instead of being dropped.
+Zero-duration audio-lane items are barriers: transcripts queued before them
+are sent first.
+
+Per-class enqueue → written time goes into
+relay_downstream_send_seconds{mode,class}; dropped items into
+relay_downstream_dropped_total{mode,class} (see relay_metrics.py).
+"""
+
+import asyncio
+import itertools
+import os
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from loguru import logger
+
+from relay_metrics import DOWNSTREAM_DROPPED, DOWNSTREAM_SEND  # type: ignore
+
+DOWNSTREAM_AUDIO_LEAD_MS = float(os.getenv("DOWNSTREAM_AUDIO_LEAD_MS", "400"))
+DOWNSTREAM_TRANSCRIPT_MAX = int(os.getenv("DOWNSTREAM_TRANSCRIPT_MAX", "200"))
+DOWNSTREAM_CONTROL_MAX = int(os.getenv("DOWNSTREAM_CONTROL_MAX", "256"))
+DOWNSTREAM_AUDIO_MAX_SECONDS = float(os.getenv("DOWNSTREAM_AUDIO_MAX_SECONDS", "30"))
+
+CONTROL = "control"
+AUDIO = "audio"
+TRANSCRIPT = "transcript"
+CLASSES = (CONTROL, AUDIO, TRANSCRIPT)
+
+
+@dataclass(slots=True)
+class _Item:
+    seq: int
+    payloads: list[str | bytes]
+    audio_seconds: float
+    enqueued: float
+    on_sent: Callable[[], None] | None
+    keep: list[str | bytes] | None
+
+
+class DownstreamScheduler:
+    """Per-connection priority queues in front of a single socket writer."""
+
+    def __init__(
+        self,
+        write: Callable[[str | bytes], Awaitable[None]],
+        mode: str,
+        lead_ms: float = DOWNSTREAM_AUDIO_LEAD_MS,
+        transcript_max: int = DOWNSTREAM_TRANSCRIPT_MAX,
+        control_max: int = DOWNSTREAM_CONTROL_MAX,
+        audio_max_seconds: float = DOWNSTREAM_AUDIO_MAX_SECONDS,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._write = write
+        self._lead = lead_ms / 1000
+        self._transcript_max = max(1, transcript_max)
+        self._control_max = max(1, control_max)
+        self._audio_max = audio_max_seconds
+        self._clock = clock
+        self._queues: dict[str, deque[_Item]] = {cls: deque() for cls in CLASSES}
+        self._audio_queued = 0.0
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._room = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # Wall-clock time at which the client finishes playing the audio sent so far.
+        self._audio_until = 0.0
+        self._stopped = False
+
+        self._send_latency = {cls: DOWNSTREAM_SEND.labels(mode, cls) for cls in CLASSES}
+        self._dropped = {cls: DOWNSTREAM_DROPPED.labels(mode, cls) for cls in CLASSES}
+        self.sent = dict.fromkeys(CLASSES, 0)
+        self.dropped = dict.fromkeys(CLASSES, 0)
+        self.waits = 0
+        self.bytes_written = 0
+
+    # -- producer side -----------------------------------------------------
+
+    async def put(
+        self,
+        cls: str,
+        payloads: list[str | bytes],
+        audio_seconds: float = 0.0,
+        on_sent: Callable[[], None] | None = None,
+        keep: list[str | bytes] | None = None,
+    ) -> None:
+        """Queue payloads to be written together, first waiting while a control / audio lane is full."""
+        if self._full(cls):
+            self.waits += 1
+            while self._full(cls) and not self._stopped:
+                self._room.clear()
+                await self._room.wait()
+        self.put_nowait(cls, payloads, audio_seconds, on_sent, keep)
+
+    def put_nowait(
+        self,
+        cls: str,
+        payloads: list[str | bytes],
+        audio_seconds: float = 0.0,
+        on_sent: Callable[[], None] | None = None,
+        keep: list[str | bytes] | None = None,
+    ) -> None:
+        """Queue payloads without waiting; `on_sent` runs once they are on the socket.
+
+        A full lane drops the new item (transcripts: the oldest one).
+        """
+        if self._stopped:
+            return
+        queue = self._queues[cls]
+        if cls == TRANSCRIPT:
+            if len(queue) >= self._transcript_max:
+                queue.popleft()
+                self._drop(TRANSCRIPT)
+        elif self._full(cls):
+            self._drop(cls)
+            logger.debug(f"Downstream {cls} lane full, message dropped")
+            return
+        queue.append(_Item(next(self._seq), payloads, audio_seconds, self._clock(), on_sent, keep))
+        if cls == AUDIO:
+            self._audio_queued += audio_seconds
+        self._idle.clear()
+        self._wake.set()
+
+    def _full(self, cls: str) -> bool:
+        if cls == CONTROL:
+            return len(self._queues[CONTROL]) >= self._control_max
+        if cls == AUDIO:
+            return self._audio_queued >= self._audio_max
+        return False
+
+    def interrupt(self) -> None:
+        """Drop queued audio (barriers and `keep` payloads stay) and restart pacing from now."""
+        audio = self._queues[AUDIO]
+        kept = []
+        for item in audio:
+            if item.audio_seconds == 0:
+                kept.append(item)
+            elif item.keep:
+                item.payloads, item.audio_seconds = item.keep, 0.0
+                kept.append(item)
+            else:
+                self._drop(AUDIO)
+        audio.clear()
+        audio.extend(kept)
+        self._audio_queued = 0.0
+        self._audio_until = 0.0
+        self._room.set()
+
+    def _drop(self, cls: str) -> None:
+        self.dropped[cls] += 1
+        self._dropped[cls].inc()
+
+    async def drain(self) -> None:
+        """Wait until everything queued so far has been written."""
+        await self._idle.wait()
+
+    # -- writer --------------------------------------------------------------
+
+    def _next(self, now: float) -> tuple[str, _Item] | float | None:
+        """The item to write now, else the time the next paced audio item is due (None: nothing queued)."""
+        control, audio, transcript = (self._queues[cls] for cls in CLASSES)
+        if control:
+            return CONTROL, control.popleft()
+        if audio:
+            head = audio[0]
+            if head.audio_seconds == 0:
+                if transcript and transcript[0].seq < head.seq:
+                    return TRANSCRIPT, transcript.popleft()
+                return AUDIO, audio.popleft()
+            due = self._audio_until - self._lead
+            if now >= due:
+                return AUDIO, audio.popleft()
+            if not transcript:
+                return due
+        if transcript:
+            return TRANSCRIPT, transcript.popleft()
+        return None
+
+    async def run(self) -> None:
+        """Write queued items until the socket fails or the task is cancelled."""
+        while True:
+            now = self._clock()
+            nxt = self._next(now)
+            if nxt is None or isinstance(nxt, float):
+                if nxt is None:
+                    self._idle.set()
+                self._wake.clear()
+                try:
+                    async with asyncio.timeout(None if nxt is None else nxt - now):
+                        await self._wake.wait()
+                except TimeoutError:
+                    pass
+                continue
+
+            cls, item = nxt
+            if item.audio_seconds:
+                self._audio_until = max(self._audio_until, now) + item.audio_seconds
+                self._audio_queued = max(0.0, self._audio_queued - item.audio_seconds)
+            self._room.set()
+            try:
+                for payload in item.payloads:
+                    await self._write(payload)
+                    self.bytes_written += len(payload)
+            except Exception as e:
+                logger.debug(f"Downstream writer stopped: {e}")
+                self._stopped = True
+                self._idle.set()
+                self._room.set()
+                return
+            self.sent[cls] += 1
+            self._send_latency[cls].observe(self._clock() - item.enqueued)
+            if item.on_sent is not None:
+                item.on_sent()
+
+    # -- observability -------------------------------------------------------
+
+    def stats(self) -> dict[str, int | dict[str, int]]:
+        return {
+            "bytes_written": self.bytes_written,
+            "sent": dict(self.sent),
+            "dropped": {cls: n for cls, n in self.dropped.items() if n},
+            "waits": self.waits,
+            "queued": {cls: len(queue) for cls, queue in self._queues.items() if queue},
+        }
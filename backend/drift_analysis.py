@@ -0,0 +1,184 @@
+"""
+Drift Analysis
+
+Batch analyzer for the diagnostics directory written by frame_diagnostics.py.
+Instead of eyeballing annotated frames, it reads every session's
+annotations.jsonl, recomputes both box mappings from the raw `box_2d` and frame
+size, and reports how far apart they land:
+
+  direct    0-1000 coordinates scaled straight to frame pixels (GREEN boxes)
+  unpadded  coordinates treated as relative to a square-padded frame (RED boxes)
+
+With `--ground-truth`, each mapping is also scored by IoU against hand-labeled
+boxes, which shows which mapping the model's coordinates actually follow.
+Ground truth is a JSON object keyed by "<session_id>/<annotated file name>"
+with pixel boxes `[xmin, ymin, xmax, ymax]`:
+
+  {"0b6f.../tool_003_coffee_mug.jpg": [412, 188, 655, 470]}
+
+Sessions are parsed in parallel across processes; the mappings come from
+box_transform.py and all math runs on NumPy arrays.
+
+Usage (from backend/):
+  uv run python drift_analysis.py [--diag-dir diagnostics] [--ground-truth labels.json]
+                                  [--output drift_report.json] [--workers 8]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from box_transform import normalized_to_pixel, padded_to_pixel  # type: ignore
+from frame_diagnostics import DIAG_DIR, RECORDS_FILE  # type: ignore
+
+IOU_MATCH = 0.5
+
+
+def load_session(session_dir: Path) -> list[dict]:
+    """All usable annotation records of one session (malformed lines are skipped)."""
+    records = []
+    try:
+        with (session_dir / RECORDS_FILE).open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                size = record.get("frame_size", ())
+                if len(record.get("box_2d", ())) == 4 and len(size) == 2 and min(size) > 0:
+                    record["session_id"] = session_dir.name
+                    records.append(record)
+    except OSError:
+        pass
+    return records
+
+
+def load_records(diag_dir: Path, workers: int) -> tuple[list[dict], int]:
+    """Records from every session directory, and how many sessions had none."""
+    session_dirs = sorted(path for path in diag_dir.iterdir() if path.is_dir())
+    if workers > 1 and len(session_dirs) > workers:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            per_session = list(pool.map(load_session, session_dirs, chunksize=32))
+    else:
+        per_session = [load_session(path) for path in session_dirs]
+    records = [record for session in per_session for record in session]
+    return records, sum(1 for session in per_session if not session)
+
+
+# -- box math ------------------------------------------------------------------------
+
+
+def iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise intersection-over-union of two (N, 4) pixel box arrays."""
+    ix = np.clip(np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0]), 0, None)
+    iy = np.clip(np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1]), 0, None)
+    inter = ix * iy
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a + area_b - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def describe(values: np.ndarray) -> dict[str, float]:
+    if values.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(values.size),
+        "mean": round(float(values.mean()), 4),
+        "median": round(float(np.median(values)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "max": round(float(values.max()), 4),
+    }
+
+
+# -- report --------------------------------------------------------------------------
+
+
+def analyze(records: list[dict], ground_truth: dict[str, list[float]] | None = None) -> dict:
+    box_2d = np.array([r["box_2d"] for r in records], dtype=np.float64).reshape(-1, 4)
+    sizes = np.array([r["frame_size"] for r in records], dtype=np.float64).reshape(-1, 2)
+    direct = normalized_to_pixel(box_2d, sizes[:, 0], sizes[:, 1])
+    unpadded = padded_to_pixel(box_2d, sizes[:, 0], sizes[:, 1])
+
+    diagonal = np.hypot(sizes[:, 0], sizes[:, 1])
+    centers_direct = (direct[:, :2] + direct[:, 2:]) / 2
+    centers_unpadded = (unpadded[:, :2] + unpadded[:, 2:]) / 2
+    center_shift = np.hypot(*(centers_unpadded - centers_direct).T)
+    area_direct = np.prod(direct[:, 2:] - direct[:, :2], axis=1)
+    area_unpadded = np.prod(unpadded[:, 2:] - unpadded[:, :2], axis=1)
+
+    report: dict = {
+        "annotations": len(records),
+        "sessions": len({r["session_id"] for r in records}),
+        "mapping_disagreement": {
+            "center_shift_px": describe(center_shift),
+            "center_shift_frac_of_diagonal": describe(center_shift / diagonal),
+            "area_ratio_unpadded_to_direct": describe(
+                np.divide(area_unpadded, area_direct, out=np.zeros_like(area_direct), where=area_direct > 0)
+            ),
+            "unpadded_clamped_frac": round(float(np.mean(unpadded[:, :2] == 0)), 4) if records else 0.0,
+        },
+        "frame_sizes": {
+            f"{w:.0f}x{h:.0f}": int(n) for (w, h), n in zip(*np.unique(sizes, axis=0, return_counts=True), strict=True)
+        },
+    }
+
+    ages = np.array([r["frame_age_ms"] for r in records if "frame_age_ms" in r], dtype=np.float64)
+    lag = np.array(
+        [r["latest_seq"] - r["frame_seq"] for r in records if "frame_seq" in r and "latest_seq" in r],
+        dtype=np.float64,
+    )
+    report["frame_pairing"] = {"frame_age_ms": describe(ages), "frames_behind_latest": describe(lag)}
+
+    if ground_truth:
+        keys = [f"{r['session_id']}/{r.get('file', '')}" for r in records]
+        labeled = np.array([key in ground_truth for key in keys], dtype=bool)
+        truth = np.array([ground_truth[key] for key in keys if key in ground_truth], dtype=np.float64).reshape(-1, 4)
+        iou_direct = iou(direct[labeled], truth)
+        iou_unpadded = iou(unpadded[labeled], truth)
+        report["ground_truth"] = {
+            "labeled": int(labeled.sum()),
+            "iou_direct": describe(iou_direct),
+            "iou_unpadded": describe(iou_unpadded),
+            f"match_rate_direct@{IOU_MATCH}": round(float(np.mean(iou_direct >= IOU_MATCH)), 4) if truth.size else 0.0,
+            f"match_rate_unpadded@{IOU_MATCH}": (
+                round(float(np.mean(iou_unpadded >= IOU_MATCH)), 4) if truth.size else 0.0
+            ),
+            "direct_better": int(np.sum(iou_direct > iou_unpadded)),
+            "unpadded_better": int(np.sum(iou_unpadded > iou_direct)),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--diag-dir", type=Path, default=DIAG_DIR)
+    parser.add_argument("--ground-truth", type=Path, default=None)
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON report here")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if not args.diag_dir.is_dir():
+        sys.exit(f"No diagnostics directory at {args.diag_dir}")
+
+    started = time.perf_counter()
+    records, empty_sessions = load_records(args.diag_dir, args.workers)
+    ground_truth = json.loads(args.ground_truth.read_text()) if args.ground_truth else None
+    report = analyze(records, ground_truth)
+    report["sessions_without_records"] = empty_sessions
+    report["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
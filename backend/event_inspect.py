@@ -0,0 +1,82 @@
+"""
+Event Inspection
+
+Reads what the relay cares about (tool calls, audio parts) directly from ADK
+`Event` objects, so the downstream task never has to serialize an event and
+parse it back. Each event is then serialized exactly once by `encode_event`.
+
+If `orjson` is installed it is used for the final encode (measurably faster on
+audio-heavy events); otherwise pydantic's own JSON serializer is used. Both
+produce identical output.
+
+`tool_call_boxes` converts the `box_2d` arguments of an event's tool calls to
+pixel boxes in one batch, so the relay can attach them and clients no longer
+redo the coordinate math.
+"""
+
+import json
+from typing import Any
+
+from google.adk.events import Event
+from google.genai import types
+from loguru import logger
+
+from box_transform import BOX_MAPPING, parse_box_2d, to_pixels  # type: ignore
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def function_calls(event: Event) -> list[types.FunctionCall]:
+    """Tool calls carried by the event, in part order."""
+    return event.get_function_calls()
+
+
+def audio_blobs(event: Event) -> list[types.Blob]:
+    """Inline audio payloads carried by the event."""
+    content = event.content
+    if not content or not content.parts:
+        return []
+    return [
+        part.inline_data
+        for part in content.parts
+        if part.inline_data is not None and (part.inline_data.mime_type or "").startswith("audio/")
+    ]
+
+
+def _box_2d(call: types.FunctionCall) -> list[float] | None:
+    """The call's `box_2d`, or None if it has none or it is not four finite numbers (logged)."""
+    value = (call.args or {}).get("box_2d")
+    if value is None:
+        return None
+    box = parse_box_2d(value)
+    if box is None:
+        logger.warning(f"Ignoring malformed box_2d on tool call {call.name}: {str(value)[:80]}")
+    return box
+
+
+def tool_call_boxes(calls: list[types.FunctionCall], width: int, height: int) -> list[dict[str, Any]]:
+    """Pixel-space boxes for the calls that carry a valid `box_2d` (empty if the frame size is unknown)."""
+    if not (width and height):
+        return []
+    boxed = [(call, box) for call in calls if (box := _box_2d(call)) is not None]
+    if not boxed:
+        return []
+    pixels = to_pixels([box for _, box in boxed], width, height).round(1)
+    return [
+        {"id": call.id, "name": call.name, "box": box.tolist(), "frameSize": [width, height], "mapping": BOX_MAPPING}
+        for (call, _), box in zip(boxed, pixels, strict=True)
+    ]
+
+
+def encode_event(event: Event, extra: dict[str, Any] | None = None) -> str:
+    """Serialize an event for the client (camelCase aliases, no nulls), merging `extra` top-level fields."""
+    if extra:
+        data = event.model_dump(mode="json", exclude_none=True, by_alias=True)
+        data.update(extra)
+        return orjson.dumps(data).decode() if orjson is not None else json.dumps(data, separators=(",", ":"))
+    if orjson is not None:
+        return orjson.dumps(event.model_dump(mode="json", exclude_none=True, by_alias=True)).decode()
+    return event.model_dump_json(exclude_none=True, by_alias=True)
@@ -0,0 +1,357 @@
+"""
+Fake Gemini Live Server
+
+A local stand-in for the Live API's BidiGenerateContent websocket, so the relay
+can be load-tested and exercised in CI without an API key or network. It
+speaks the same JSON messages the genai SDK does:
+
+  client → setup, realtimeInput, clientContent, toolResponse
+  server → setupComplete, serverContent (input/output transcription, model
+           audio, turnComplete, interrupted), toolCall
+
+A model turn starts after `turn_audio_seconds` of input audio or a
+clientContent with turnComplete. It follows a FakeScript: input transcription,
+the scripted function calls, audio chunks (24 kHz PCM) interleaved with output
+transcription, then turnComplete. The first response and every chunk are
+delayed by configurable latency with seeded jitter, so runs are repeatable.
+A clientContent that arrives while a turn is still playing interrupts it
+(serverContent.interrupted) and starts the next one, like typing over the
+model does.
+
+Every received message is counted by type in `stats()`; the most recent
+`keep_received` of them (type, size, arrival time, body) are kept in `received`.
+
+With `stamp_audio` set, the first 8 bytes of every outgoing audio chunk carry
+the server's time.monotonic() as a little-endian double, and incoming audio is
+expected to carry the sender's stamp the same way; the upstream transit time is
+appended to `upstream_latencies` (also capped at `keep_received`). A load
+generator running in the same process (benchmarks/bench_relay_load.py) uses
+this to time both directions through the relay on one clock.
+
+The genai SDK always dials `wss://` when using an API key, so the server runs
+TLS with a throwaway self-signed certificate. Point the relay at it with:
+
+  GEMINI_BASE_URL=https://127.0.0.1:<port> GEMINI_CA_FILE=<cert.pem> GEMINI_API_KEY=fake
+
+Usage (from backend/):
+  uv run python fake_live_server.py [--port 9443] [--script script.json] [--record received.jsonl]
+"""
+
+import argparse
+import asyncio
+import base64
+import datetime
+import ipaddress
+import json
+import math
+import random
+import ssl
+import struct
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from loguru import logger
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+OUTPUT_RATE = 24000
+INPUT_BYTES_PER_SECOND = 16000 * 2
+
+
+@dataclass
+class FakeScript:
+    """What the fake model says and does in each turn, and how fast."""
+
+    input_transcript: str = "where is my coffee mug"
+    output_transcript: str = "Your mug is on the left side of the desk."
+    function_calls: list[dict[str, Any]] = field(
+        default_factory=lambda: [
+            {
+                "name": "track_and_highlight",
+                "args": {
+                    "label": "coffee mug",
+                    "internal_context_check": "The mug is next to the keyboard.",
+                    "box_2d": [420, 180, 640, 330],
+                },
+            }
+        ]
+    )
+    audio_chunks: int = 50
+    chunk_ms: float = 40.0
+    transcript_every: int = 10
+    first_response_ms: float = 300.0
+    jitter_ms: float = 10.0
+    turn_audio_seconds: float = 2.0
+    seed: int = 0
+    stamp_audio: bool = False
+
+    @classmethod
+    def from_file(cls, path: Path) -> "FakeScript":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in json.loads(path.read_text()).items() if k in known})
+
+
+AUDIO_STAMP = struct.Struct("<d")
+
+
+def _audio_chunk(ms: float) -> bytes:
+    samples = int(OUTPUT_RATE * ms / 1000)
+    return struct.pack(
+        f"<{samples}h", *(int(8000 * math.sin(2 * math.pi * 220 * i / OUTPUT_RATE)) for i in range(samples))
+    )
+
+
+def self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    """Write a localhost certificate and key (also used as the client's CA file)."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "fake-gemini-live")])
+    now = datetime.datetime.now(datetime.UTC)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=7))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = directory / "fake-live-cert.pem"
+    key_path = directory / "fake-live-key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+    )
+    return cert_path, key_path
+
+
+class FakeLiveServer:
+    """In-process fake Live API endpoint. `await start()`, then point GeminiBeta at `base_url`."""
+
+    def __init__(
+        self,
+        script: FakeScript | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        keep_received: int = 10_000,
+    ) -> None:
+        self.script = script or FakeScript()
+        self.host = host
+        self.port = port
+        self.received: deque[dict[str, Any]] = deque(maxlen=keep_received)
+        self.received_by_type: dict[str, dict[str, int]] = {}
+        self.sessions = 0
+        self.turns = 0
+        self.interruptions = 0
+        self.upstream_latencies: deque[float] = deque(maxlen=keep_received)
+        self._rng = random.Random(self.script.seed)
+        self._pcm = _audio_chunk(self.script.chunk_ms)
+        self._chunk = base64.b64encode(self._pcm).decode()
+        self._server = None
+        self._tmp = tempfile.TemporaryDirectory(prefix="fake-live-")
+        self.cert_file, self._key_file = self_signed_cert(Path(self._tmp.name))
+
+    @property
+    def base_url(self) -> str:
+        return f"https://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert_file, self._key_file)
+        self._server = await serve(self._handle, self.host, self.port, ssl=context, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._tmp.cleanup()
+
+    def stats(self) -> dict[str, Any]:
+        by_type = {kind: dict(entry) for kind, entry in self.received_by_type.items()}
+        return {
+            "sessions": self.sessions,
+            "turns": self.turns,
+            "interruptions": self.interruptions,
+            "received": by_type,
+        }
+
+    def received_count(self, prefix: str = "") -> int:
+        """Messages received so far whose type starts with `prefix`."""
+        return sum(entry["count"] for kind, entry in self.received_by_type.items() if kind.startswith(prefix))
+
+    # -- protocol ----------------------------------------------------------------
+
+    def _delay(self, ms: float) -> float:
+        return max(0.0, ms + self._rng.uniform(-self.script.jitter_ms, self.script.jitter_ms)) / 1000
+
+    async def _handle(self, ws: ServerConnection) -> None:
+        self.sessions += 1
+        session = self.sessions
+        audio_bytes = 0
+        turn: asyncio.Task | None = None
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                if not message:
+                    continue
+                key = next(iter(message))
+                # The SDK sends snake_case top-level keys (realtime_input); the API accepts both.
+                kind = _camel(key)
+                message[kind] = message.pop(key)
+                record = {"session": session, "type": kind, "bytes": len(raw), "t": time.monotonic()}
+                if kind == "realtimeInput":
+                    for key in message[kind]:
+                        record["type"] = f"realtimeInput.{key}"
+                elif kind != "setup":
+                    record["body"] = message[kind]
+                self.received.append(record)
+                entry = self.received_by_type.setdefault(record["type"], {"count": 0, "bytes": 0})
+                entry["count"] += 1
+                entry["bytes"] += record["bytes"]
+
+                if kind == "setup":
+                    await ws.send(json.dumps({"setupComplete": {}}))
+                    continue
+
+                start_turn = False
+                if kind == "realtimeInput":
+                    for blob in _realtime_blobs(message[kind]):
+                        if blob.get("mimeType", "").startswith("audio/"):
+                            audio_bytes += len(blob.get("data", "")) * 3 // 4
+                            if self.script.stamp_audio:
+                                self._record_upstream_stamp(blob.get("data", ""))
+                    if audio_bytes >= self.script.turn_audio_seconds * INPUT_BYTES_PER_SECOND:
+                        audio_bytes = 0
+                        start_turn = True
+                elif kind == "clientContent" and (
+                    message[kind].get("turnComplete") or message[kind].get("turn_complete")
+                ):
+                    start_turn = True
+
+                if start_turn and turn is not None and not turn.done() and kind == "clientContent":
+                    turn.cancel()
+                    self.interruptions += 1
+                    await ws.send(json.dumps({"serverContent": {"interrupted": True}}))
+                if start_turn and (turn is None or turn.done()):
+                    turn = asyncio.create_task(self._model_turn(ws))
+        except ConnectionClosed:
+            pass
+        finally:
+            if turn is not None:
+                turn.cancel()
+
+    def _record_upstream_stamp(self, data: str) -> None:
+        # The SDK serializes bytes as URL-safe base64.
+        head = base64.urlsafe_b64decode(data[:12].replace("+", "-").replace("/", "_"))
+        if len(head) >= AUDIO_STAMP.size:
+            self.upstream_latencies.append(time.monotonic() - AUDIO_STAMP.unpack_from(head)[0])
+
+    def _audio_data(self) -> str:
+        if not self.script.stamp_audio:
+            return self._chunk
+        pcm = bytearray(self._pcm)
+        AUDIO_STAMP.pack_into(pcm, 0, time.monotonic())
+        return base64.b64encode(pcm).decode()
+
+    async def _model_turn(self, ws: ServerConnection) -> None:
+        script = self.script
+        self.turns += 1
+        await asyncio.sleep(self._delay(script.first_response_ms))
+        await ws.send(json.dumps({"serverContent": {"inputTranscription": {"text": script.input_transcript}}}))
+
+        if script.function_calls:
+            calls = [
+                {"id": f"fake-{self.turns}-{i}", "name": call["name"], "args": call.get("args", {})}
+                for i, call in enumerate(script.function_calls)
+            ]
+            await ws.send(json.dumps({"toolCall": {"functionCalls": calls}}))
+
+        words = script.output_transcript.split()
+        pieces = max(1, script.audio_chunks // max(1, script.transcript_every))
+        per_piece = max(1, math.ceil(len(words) / pieces))
+        for i in range(script.audio_chunks):
+            await ws.send(
+                json.dumps(
+                    {
+                        "serverContent": {
+                            "modelTurn": {
+                                "parts": [
+                                    {"inlineData": {"mimeType": "audio/pcm;rate=24000", "data": self._audio_data()}}
+                                ]
+                            }
+                        }
+                    }
+                )
+            )
+            if i % script.transcript_every == 0:
+                piece = " ".join(words[(i // script.transcript_every) * per_piece :][:per_piece])
+                if piece:
+                    await ws.send(json.dumps({"serverContent": {"outputTranscription": {"text": piece + " "}}}))
+            await asyncio.sleep(self._delay(script.chunk_ms))
+
+        await ws.send(json.dumps({"serverContent": {"turnComplete": True}}))
+
+
+def _camel(name: str) -> str:
+    first, *rest = name.split("_")
+    return first + "".join(part.title() for part in rest)
+
+
+def _realtime_blobs(realtime_input: dict[str, Any]) -> list[dict[str, Any]]:
+    blobs = list(realtime_input.get("mediaChunks") or [])
+    for key in ("audio", "video"):
+        if isinstance(realtime_input.get(key), dict):
+            blobs.append(realtime_input[key])
+    return blobs
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--script", type=Path, default=None, help="JSON file with FakeScript fields")
+    parser.add_argument("--record", type=Path, default=None, help="write received messages here on exit (JSONL)")
+    args = parser.parse_args()
+
+    script = FakeScript.from_file(args.script) if args.script else FakeScript()
+    server = FakeLiveServer(script, args.host, args.port)
+    await server.start()
+    ca_file = Path(f"fake-live-ca-{server.port}.pem").resolve()
+    ca_file.write_bytes(server.cert_file.read_bytes())
+    logger.info(f"Fake Live API on {server.base_url}")
+    logger.info(f"Relay env: GEMINI_BASE_URL={server.base_url} GEMINI_CA_FILE={ca_file} GEMINI_API_KEY=fake")
+    try:
+        await asyncio.Future()
+    finally:
+        logger.info(f"Fake Live API stats: {server.stats()}")
+        if args.record:
+            with args.record.open("w") as f:
+                for record in server.received:
+                    f.write(json.dumps(record) + "\n")
+        await server.stop()
+        ca_file.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
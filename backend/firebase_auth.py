@@ -1,9 +1,46 @@
+"""
+Firebase Authentication
+
+`verify_id_token` is synchronous and may fetch Google's signing certificates, so
+the WebSocket handler goes through `verify_token_async`: verification runs in a
+small thread pool, successful results are cached by token hash until the
+token's `exp` claim (LRU-capped), and concurrent checks of the same token share
+a single verification. A reconnect storm after a deploy then costs one
+verification per token and never blocks the event loop.
+
+Verification itself is done offline: signatures and claims are checked locally
+(the same checks `verify_id_token` makes) against the background-refreshed key
+set in signing_keys.py, so a verification only waits on the network when a
+token names a signing key we have not seen yet. Set FIREBASE_OFFLINE_VERIFY=false
+(or use the Auth emulator) to go through firebase_admin instead.
+"""
+
+import asyncio
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 import firebase_admin
+import jwt
 from firebase_admin import auth, credentials
 from loguru import logger
 
+from signing_keys import SigningKeyCache  # type: ignore
+
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", "4"))
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", "4096"))
+# Stop serving a cached token this many seconds before its `exp`.
+AUTH_CACHE_EXPIRY_MARGIN = float(os.getenv("AUTH_CACHE_EXPIRY_MARGIN", "30"))
+FIREBASE_OFFLINE_VERIFY = os.getenv("FIREBASE_OFFLINE_VERIFY", "true").lower() == "true"
+AUTH_CLOCK_SKEW_SECONDS = int(os.getenv("AUTH_CLOCK_SKEW_SECONDS", "0"))
+
+_executor = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="firebase-auth")
+signing_keys = SigningKeyCache()
+
 
 def initialize_firebase():
     """
@@ -17,6 +54,10 @@ def initialize_firebase():
         client_email = os.getenv("FIREBASE_ADMIN_CLIENT_EMAIL")
         private_key = os.getenv("FIREBASE_ADMIN_PRIVATE_KEY")
 
+        # Offline verification only needs the project ID, not the service account
+        if _offline_verification(project_id):
+            signing_keys.start()
+
         if not all([project_id, client_email, private_key]):
             logger.warning(
                 "Firebase Admin environment variables missing. Auth verification may fail."
@@ -48,8 +89,134 @@ def verify_token(token: str):
     Returns None if verification fails.
     """
     try:
+        project_id = os.getenv("FIREBASE_ADMIN_PROJECT_ID")
+        if _offline_verification(project_id):
+            return verify_token_offline(token, project_id)
         decoded_token = auth.verify_id_token(token)
         return decoded_token
     except Exception as e:
         logger.error(f"Firebase Token Verification Failed: {e}")
         return None
+
+
+def _offline_verification(project_id: str | None) -> bool:
+    return (
+        FIREBASE_OFFLINE_VERIFY
+        and bool(project_id)
+        and not os.getenv("FIREBASE_AUTH_EMULATOR_HOST")
+    )
+
+
+def verify_token_offline(token: str, project_id: str) -> dict:
+    """
+    Checks an ID token's signature and claims against the cached signing keys.
+    Raises jwt.InvalidTokenError if the token is not valid for `project_id`.
+    """
+    header = jwt.get_unverified_header(token)
+    if header.get("alg") != "RS256":
+        raise jwt.InvalidAlgorithmError(f"Unexpected token algorithm: {header.get('alg')}")
+    kid = header.get("kid")
+    key = signing_keys.get_key(kid) if kid else None
+    if key is None:
+        raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=["RS256"],
+        audience=project_id,
+        issuer=f"https://securetoken.google.com/{project_id}",
+        leeway=AUTH_CLOCK_SKEW_SECONDS,
+        options={"require": ["exp", "iat", "aud", "iss", "sub"]},
+    )
+    sub = claims["sub"]
+    if not isinstance(sub, str) or not sub or len(sub) > 128:
+        raise jwt.InvalidTokenError("Token has an invalid subject")
+    now = time.time() + AUTH_CLOCK_SKEW_SECONDS
+    # Older PyJWT releases do not reject an `iat` in the future themselves
+    if claims["iat"] > now:
+        raise jwt.ImmatureSignatureError("Token iat is in the future")
+    if claims.get("auth_time", 0) > now:
+        raise jwt.InvalidTokenError("Token auth_time is in the future")
+    claims["uid"] = sub
+    return claims
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """LRU cache of decoded claims for tokens that already passed verification."""
+
+    def __init__(
+        self,
+        max_size: int = AUTH_CACHE_MAX,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_size = max(1, max_size)
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, key: str, claims: dict) -> None:
+        expires_at = float(claims.get("exp", 0)) - AUTH_CACHE_EXPIRY_MARGIN
+        if expires_at <= self._clock():
+            return
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = VerifiedTokenCache()
+_inflight: dict[str, asyncio.Future] = {}
+
+
+async def verify_token_async(token: str):
+    """
+    Non-blocking verify_token: cached claims when the token was already
+    verified, otherwise one pooled verification shared by concurrent callers.
+    Returns None if verification fails.
+    """
+    key = _token_key(token)
+    claims = token_cache.get(key)
+    if claims is not None:
+        return claims
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().run_in_executor(_executor, verify_token, token)
+    _inflight[key] = future
+    try:
+        claims = await asyncio.shield(future)
+    finally:
+        _inflight.pop(key, None)
+    if claims:
+        token_cache.put(key, claims)
+    return claims
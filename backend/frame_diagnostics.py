@@ -11,188 +11,445 @@ Usage:
   2. Start the backend: bun run backend:dev
   3. Run a spatial session — frames will be saved to backend/diagnostics/
   4. Check the annotated images to see if Gemini's boxes match the actual objects.
+
+All decoding, drawing and disk I/O happens on the DiagnosticsWriter's worker
+threads; the relay only hands over frame bytes. The job queue is bounded and
+drops the oldest job when full, annotated frames are written as JPEG (with
+each box recorded in the session's annotations.jsonl), and files are evicted
+oldest-first to keep each session and the whole directory under its quota.
+
+Recent frames are kept in a per-session ring buffer (bounded by frame count and
+bytes) with sequence ids and arrival times. A tool call's box is drawn on the
+last frame that had arrived when the user finished asking (the last user input
+before the model's turn: end of speech, an input transcription or a text
+message), i.e. the frame the user was pointing the camera at, rather than
+whatever frame came in last. Turns without fresh user input fall back to the
+model's first output.
 """
 
 import io
+import json
 import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 from loguru import logger
 
+from box_transform import normalized_to_pixel, padded_to_pixel, parse_box_2d  # type: ignore
+
 # Only import PIL when diagnostics are enabled
 DIAGNOSTICS_ENABLED = os.getenv("SPATIAL_DIAGNOSTICS", "false").lower() == "true"
 
 if DIAGNOSTICS_ENABLED:
     from PIL import Image, ImageDraw
 
+DIAG_WORKERS = int(os.getenv("DIAG_WORKERS", "1"))
+DIAG_QUEUE_MAX = int(os.getenv("DIAG_QUEUE_MAX", "32"))
+DIAG_JPEG_QUALITY = int(os.getenv("DIAG_JPEG_QUALITY", "80"))
+DIAG_SESSION_QUOTA_MB = float(os.getenv("DIAG_SESSION_QUOTA_MB", "50"))
+DIAG_GLOBAL_QUOTA_MB = float(os.getenv("DIAG_GLOBAL_QUOTA_MB", "500"))
+DIAG_FRAME_BUFFER = int(os.getenv("DIAG_FRAME_BUFFER", "16"))
+DIAG_FRAME_BUFFER_MB = float(os.getenv("DIAG_FRAME_BUFFER_MB", "4"))
+
+# Save every Nth raw frame as a reference
+RAW_FRAME_INTERVAL = 20
+RECORDS_FILE = "annotations.jsonl"
 
 # Diagnostics output directory
 DIAG_DIR = Path(__file__).resolve().parent / "diagnostics"
 
 
+@dataclass(slots=True, frozen=True)
+class BufferedFrame:
+    seq: int
+    arrived_at: float
+    data: bytes
+    width: int
+    height: int
+
+
+class FrameRing:
+    """Recent frames, oldest first, capped by count and total bytes."""
+
+    def __init__(self, max_frames: int = DIAG_FRAME_BUFFER, max_mb: float = DIAG_FRAME_BUFFER_MB) -> None:
+        self._frames: deque[BufferedFrame] = deque()
+        self._max_frames = max(1, max_frames)
+        self._max_bytes = int(max_mb * 1024 * 1024)
+        self._bytes = 0
+
+    def append(self, frame: BufferedFrame) -> None:
+        self._frames.append(frame)
+        self._bytes += len(frame.data)
+        # Always keep the newest frame, even if it alone exceeds the byte cap.
+        while len(self._frames) > 1 and (
+            len(self._frames) > self._max_frames or self._bytes > self._max_bytes
+        ):
+            self._bytes -= len(self._frames.popleft().data)
+
+    def latest(self) -> BufferedFrame | None:
+        return self._frames[-1] if self._frames else None
+
+    def at(self, reference: float) -> BufferedFrame | None:
+        """The newest frame that had arrived by `reference` (the oldest kept, if none had)."""
+        chosen = self._frames[0] if self._frames else None
+        for frame in reversed(self._frames):
+            if frame.arrived_at <= reference:
+                return frame
+        return chosen
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+class DiagnosticsWriter:
+    """Bounded, drop-oldest job queue drained by worker threads, with disk quotas."""
+
+    def __init__(
+        self,
+        root: Path = DIAG_DIR,
+        workers: int = DIAG_WORKERS,
+        queue_max: int = DIAG_QUEUE_MAX,
+        session_quota_mb: float = DIAG_SESSION_QUOTA_MB,
+        global_quota_mb: float = DIAG_GLOBAL_QUOTA_MB,
+    ) -> None:
+        self.root = root
+        self._workers = max(1, workers)
+        self._queue_max = max(1, queue_max)
+        self._session_quota = int(session_quota_mb * 1024 * 1024)
+        self._global_quota = int(global_quota_mb * 1024 * 1024)
+
+        self._jobs: deque[Callable[[], None]] = deque()
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+
+        # Written files, oldest first: path -> (session_id, size)
+        self._files: OrderedDict[Path, tuple[str, int]] = OrderedDict()
+        self._session_bytes: defaultdict[str, int] = defaultdict(int)
+        self._total_bytes = 0
+        self._disk_lock = threading.Lock()
+        self._scanned = False
+
+        self.submitted = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+        self.evicted = 0
+
+    # -- queue -----------------------------------------------------------------
+
+    def submit(self, job: Callable[[], None]) -> None:
+        """Queue a job without blocking; the oldest queued job is dropped if full."""
+        with self._cond:
+            if not self._threads:
+                self._start()
+            if len(self._jobs) >= self._queue_max:
+                self._jobs.popleft()
+                self.dropped += 1
+            self._jobs.append(job)
+            self.submitted += 1
+            self._cond.notify()
+
+    def _start(self) -> None:
+        for i in range(self._workers):
+            thread = threading.Thread(target=self._run, name=f"diagnostics-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._jobs:
+                    self._cond.wait()
+                job = self._jobs.popleft()
+            try:
+                job()
+                ok = True
+            except Exception as e:
+                ok = False
+                logger.error(f"Diagnostics job failed: {e}")
+            with self._cond:
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    # -- disk ------------------------------------------------------------------
+
+    def store(self, session_id: str, filename: str, data: bytes) -> Path:
+        """Write a file into the session's directory and enforce the quotas."""
+        path = self.root / session_id / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        with self._disk_lock:
+            if not self._scanned:
+                self._scan_existing()
+            previous = self._files.pop(path, None)
+            if previous is not None:
+                self._forget(previous)
+            self._files[path] = (session_id, len(data))
+            self._session_bytes[session_id] += len(data)
+            self._total_bytes += len(data)
+            self._enforce_quotas(session_id)
+        return path
+
+    def append_record(self, session_id: str, record: dict[str, Any]) -> None:
+        path = self.root / session_id / RECORDS_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._disk_lock, path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _scan_existing(self) -> None:
+        # Files left by earlier runs count toward the global quota (oldest evicted first).
+        self._scanned = True
+        if not self.root.exists():
+            return
+        existing = [
+            (path.stat().st_mtime, path)
+            for path in self.root.glob("*/*")
+            if path.is_file() and path.name != RECORDS_FILE
+        ]
+        for _, path in sorted(existing):
+            size = path.stat().st_size
+            session_id = path.parent.name
+            self._files[path] = (session_id, size)
+            self._session_bytes[session_id] += size
+            self._total_bytes += size
+
+    def _enforce_quotas(self, session_id: str) -> None:
+        while self._session_bytes[session_id] > self._session_quota:
+            oldest = next(path for path, (owner, _) in self._files.items() if owner == session_id)
+            self._evict(oldest)
+        while self._total_bytes > self._global_quota and self._files:
+            self._evict(next(iter(self._files)))
+
+    def _evict(self, path: Path) -> None:
+        self._forget(self._files.pop(path))
+        path.unlink(missing_ok=True)
+        self.evicted += 1
+
+    def _forget(self, entry: tuple[str, int]) -> None:
+        session_id, size = entry
+        self._session_bytes[session_id] -= size
+        self._total_bytes -= size
+
+    # -- observability -----------------------------------------------------------
+
+    def stats(self) -> dict[str, float]:
+        with self._cond:
+            stats = {
+                "queue_depth": len(self._jobs),
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+        with self._disk_lock:
+            stats["evicted_files"] = self.evicted
+            stats["disk_mb"] = round(self._total_bytes / (1024 * 1024), 2)
+        return stats
+
+
+diagnostics_writer = DiagnosticsWriter()
+
+
 class FrameDiagnostics:
-    """Stores the latest video frame and annotates it with tool call bounding boxes."""
+    """Buffers recent video frames and annotates them with tool call bounding boxes."""
 
-    def __init__(self, session_id: str) -> None:
+    def __init__(
+        self,
+        session_id: str,
+        writer: DiagnosticsWriter = diagnostics_writer,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         self.session_id = session_id
-        self._latest_frame_bytes: bytes | None = None
-        self._latest_frame_dims: tuple[int, int] = (0, 0)
+        self._writer = writer
+        self._clock = clock
+        self._frames = FrameRing()
+        self._user_input_at: float | None = None
+        self._turn_reference: float | None = None
         self._frame_counter = 0
         self._tool_counter = 0
 
         if DIAGNOSTICS_ENABLED:
-            self._session_dir = DIAG_DIR / session_id
-            self._session_dir.mkdir(parents=True, exist_ok=True)
             logger.info(
-                f"[{session_id}] 🔬 Frame Diagnostics ENABLED → {self._session_dir}"
+                f"[{session_id}] 🔬 Frame Diagnostics ENABLED → {writer.root / session_id}"
             )
 
     def capture_frame(
         self, raw_jpeg_bytes: bytes, width: int = 0, height: int = 0
     ) -> None:
-        """Store the most recently received video frame."""
+        """Buffer a video frame that was forwarded to the model (no decoding on the caller's thread)."""
         if not DIAGNOSTICS_ENABLED:
             return
 
-        self._latest_frame_bytes = raw_jpeg_bytes
         self._frame_counter += 1
+        self._frames.append(
+            BufferedFrame(self._frame_counter, self._clock(), raw_jpeg_bytes, width, height)
+        )
+
+        if self._frame_counter % RAW_FRAME_INTERVAL == 0:
+            self._writer.submit(
+                partial(
+                    self._writer.store,
+                    self.session_id,
+                    f"raw_{self._frame_counter:04d}.jpg",
+                    raw_jpeg_bytes,
+                )
+            )
 
-        # Decode dimensions from JPEG if not provided
-        if width == 0 or height == 0:
-            try:
-                img = Image.open(io.BytesIO(raw_jpeg_bytes))
-                width, height = img.size
-            except Exception:
-                pass
-
-        self._latest_frame_dims = (width, height)
+    def note_user_input(self) -> None:
+        """The user spoke or typed: the latest such moment before a model turn is its reference time."""
+        if not DIAGNOSTICS_ENABLED:
+            return
+        self._user_input_at = self._clock()
 
-        # Save every 20th raw frame as a reference
-        if self._frame_counter % 20 == 0:
-            self._save_raw_frame()
+    def mark_model_turn(self) -> None:
+        """The model started producing output: fix the turn's reference time."""
+        if not DIAGNOSTICS_ENABLED:
+            return
+        user_input_at, self._user_input_at = self._user_input_at, None
+        # A tool call can be the turn's first output, so "now" is only the fallback.
+        self._turn_reference = user_input_at if user_input_at is not None else self._clock()
 
     def annotate_tool_call(self, tool_name: str, tool_args: dict[str, Any]) -> None:
-        """When a track_and_highlight call is received, draw its box on the latest frame."""
+        """When a track_and_highlight call is received, queue its box for drawing on the frame the model saw."""
         if not DIAGNOSTICS_ENABLED:
             return
 
         if tool_name != "track_and_highlight":
             return
 
-        if not self._latest_frame_bytes:
+        latest = self._frames.latest()
+        if latest is None:
             logger.warning(
                 f"[{self.session_id}] Diagnostics: No frame available for annotation."
             )
             return
 
-        box_2d = tool_args.get("box_2d", [])
+        box_2d = parse_box_2d(tool_args.get("box_2d"))
         label = tool_args.get("label", "unknown")
 
-        if len(box_2d) != 4:
+        if box_2d is None:
             return
 
         self._tool_counter += 1
-
-        try:
-            img = Image.open(io.BytesIO(self._latest_frame_bytes))
-            img_w, img_h = img.size
-            draw = ImageDraw.Draw(img)
-
-            ymin, xmin, ymax, xmax = box_2d
-
-            # Method A: Direct mapping (0-1000 → frame pixels)
-            px_xmin_direct = (xmin / 1000) * img_w
-            px_xmax_direct = (xmax / 1000) * img_w
-            px_ymin_direct = (ymin / 1000) * img_h
-            px_ymax_direct = (ymax / 1000) * img_h
-
-            # Method B: Square-padded mapping (if Gemini uses 1024x1024 internal processing)
-            aspect = img_w / img_h
-            if aspect > 1:  # Landscape
-                pad_top = (1000 - 1000 / aspect) / 2
-                pad_bottom = 1000 - pad_top
-                unpad_y_min = max(0, (ymin - pad_top) / (pad_bottom - pad_top)) * img_h
-                unpad_y_max = max(0, (ymax - pad_top) / (pad_bottom - pad_top)) * img_h
-                unpad_x_min = (xmin / 1000) * img_w
-                unpad_x_max = (xmax / 1000) * img_w
-            else:  # Portrait
-                pad_left = (1000 - 1000 * aspect) / 2
-                pad_right = 1000 - pad_left
-                unpad_x_min = max(0, (xmin - pad_left) / (pad_right - pad_left)) * img_w
-                unpad_x_max = max(0, (xmax - pad_left) / (pad_right - pad_left)) * img_w
-                unpad_y_min = (ymin / 1000) * img_h
-                unpad_y_max = (ymax / 1000) * img_h
-
-            # Draw Method A: GREEN (Direct mapping)
-            draw.rectangle(
-                [px_xmin_direct, px_ymin_direct, px_xmax_direct, px_ymax_direct],
-                outline="lime",
-                width=5,
-            )
-            draw.text(
-                (px_xmin_direct, px_ymin_direct - 25),
-                f"DIRECT: {label}",
-                fill="lime",
-            )
-
-            # Draw Method B: RED (Square-padded mapping)
-            draw.rectangle(
-                [
-                    unpad_x_min,
-                    unpad_y_min,
-                    unpad_x_min + 1,
-                    unpad_y_min + 1,
-                ],  # Small marker at corner
-                outline="red",
-                width=8,
-            )
-            draw.rectangle(
-                [unpad_x_min, unpad_y_min, unpad_x_max, unpad_y_max],
-                outline="red",
-                width=5,
-            )
-            draw.text(
-                (unpad_x_min, unpad_y_max + 10),
-                f"UNPAD: {label}",
-                fill="red",
-            )
-
-            # Add metadata text
-            draw.text(
-                (10, 10),
-                f"Frame: {img_w}x{img_h} | RAW: [{ymin},{xmin},{ymax},{xmax}]",
-                fill="yellow",
-            )
-            draw.text(
-                (10, 40),
-                f"GREEN=direct(0-1000→{img_w}x{img_h})  RED=unpadded(square→rect)",
-                fill="yellow",
-            )
-
-            # Save annotated frame
-            filename = f"tool_{self._tool_counter:03d}_{label.replace(' ', '_')}.png"
-            filepath = self._session_dir / filename
-            img.save(filepath, "PNG")
-
-            logger.info(
-                f"[{self.session_id}] 🔬 Saved annotated frame → {filepath.name} "
-                f"(GREEN=direct [{px_xmin_direct:.0f},{px_ymin_direct:.0f},"
-                f"{px_xmax_direct:.0f},{px_ymax_direct:.0f}] "
-                f"RED=unpad [{unpad_x_min:.0f},{unpad_y_min:.0f},"
-                f"{unpad_x_max:.0f},{unpad_y_max:.0f}])"
-            )
-
-        except Exception as e:
-            logger.error(f"[{self.session_id}] Diagnostics annotation error: {e}")
-
-    def _save_raw_frame(self) -> None:
-        """Save a raw frame without annotations for reference."""
-        if not self._latest_frame_bytes:
-            return
-        try:
-            filename = f"raw_{self._frame_counter:04d}.jpg"
-            filepath = self._session_dir / filename
-            filepath.write_bytes(self._latest_frame_bytes)
-        except Exception as e:
-            logger.error(f"[{self.session_id}] Diagnostics raw save error: {e}")
+        now = self._clock()
+        reference = self._turn_reference if self._turn_reference is not None else now
+        frame = self._frames.at(reference)
+        timing = {
+            "frame_seq": frame.seq,
+            "latest_seq": latest.seq,
+            "frame_age_ms": round((now - frame.arrived_at) * 1000, 1),
+            "reference_ms_ago": round((now - reference) * 1000, 1),
+        }
+        self._writer.submit(
+            partial(self._render_annotation, frame, self._tool_counter, label, box_2d, timing)
+        )
+
+    def _render_annotation(
+        self,
+        frame: BufferedFrame,
+        tool_index: int,
+        label: str,
+        box_2d: list[float],
+        timing: dict[str, float],
+    ) -> None:
+        """Draw both box mappings on the frame and save it (runs on a writer thread)."""
+        img = Image.open(io.BytesIO(frame.data)).convert("RGB")
+        img_w, img_h = img.size
+        draw = ImageDraw.Draw(img)
+
+        ymin, xmin, ymax, xmax = box_2d
+
+        # Method A: Direct mapping (0-1000 → frame pixels)
+        direct = normalized_to_pixel(box_2d, img_w, img_h).tolist()
+        px_xmin_direct, px_ymin_direct, px_xmax_direct, px_ymax_direct = direct
+
+        # Method B: Square-padded mapping (if Gemini uses 1024x1024 internal processing)
+        unpadded = padded_to_pixel(box_2d, img_w, img_h).tolist()
+        unpad_x_min, unpad_y_min, unpad_x_max, unpad_y_max = unpadded
+
+        # Draw Method A: GREEN (Direct mapping)
+        draw.rectangle(
+            [px_xmin_direct, px_ymin_direct, px_xmax_direct, px_ymax_direct],
+            outline="lime",
+            width=5,
+        )
+        draw.text(
+            (px_xmin_direct, px_ymin_direct - 25),
+            f"DIRECT: {label}",
+            fill="lime",
+        )
+
+        # Draw Method B: RED (Square-padded mapping)
+        draw.rectangle(
+            [
+                unpad_x_min,
+                unpad_y_min,
+                unpad_x_min + 1,
+                unpad_y_min + 1,
+            ],  # Small marker at corner
+            outline="red",
+            width=8,
+        )
+        draw.rectangle(
+            [unpad_x_min, unpad_y_min, unpad_x_max, unpad_y_max],
+            outline="red",
+            width=5,
+        )
+        draw.text(
+            (unpad_x_min, unpad_y_max + 10),
+            f"UNPAD: {label}",
+            fill="red",
+        )
+
+        # Add metadata text
+        draw.text(
+            (10, 10),
+            f"Frame #{frame.seq}: {img_w}x{img_h} | RAW: [{ymin},{xmin},{ymax},{xmax}]",
+            fill="yellow",
+        )
+        draw.text(
+            (10, 40),
+            f"GREEN=direct(0-1000→{img_w}x{img_h})  RED=unpadded(square→rect)",
+            fill="yellow",
+        )
+
+        # Save annotated frame (JPEG: a fraction of the PNG size and encode time)
+        encoded = io.BytesIO()
+        img.save(encoded, "JPEG", quality=DIAG_JPEG_QUALITY)
+        filename = f"tool_{tool_index:03d}_{label.replace(' ', '_')}.jpg"
+        filepath = self._writer.store(self.session_id, filename, encoded.getvalue())
+
+        self._writer.append_record(
+            self.session_id,
+            {
+                "tool_index": tool_index,
+                "file": filename,
+                "label": label,
+                "box_2d": box_2d,
+                "frame_size": [img_w, img_h],
+                "reported_size": [frame.width, frame.height],
+                **timing,
+                "direct": [round(v, 1) for v in direct],
+                "unpadded": [round(v, 1) for v in unpadded],
+            },
+        )
+
+        logger.info(
+            f"[{self.session_id}] 🔬 Saved annotated frame → {filepath.name} "
+            f"(GREEN=direct [{px_xmin_direct:.0f},{px_ymin_direct:.0f},"
+            f"{px_xmax_direct:.0f},{px_ymax_direct:.0f}] "
+            f"RED=unpad [{unpad_x_min:.0f},{unpad_y_min:.0f},"
+            f"{unpad_x_max:.0f},{unpad_y_max:.0f}])"
+        )
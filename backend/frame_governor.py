@@ -0,0 +1,148 @@
+"""
+Adaptive Video Frame-Rate Governor
+
+Clients push frames at whatever rate the browser worker produces, but every
+forwarded frame costs model tokens (~258/s of video) and context window. The
+governor decides, per session, which frames reach the ingest queue:
+
+  idle     a slow trickle so the model's picture of the scene stays fresh
+  active   the user is talking or typing (input transcription / text command)
+  burst    right after a spatial tool call, so follow-up requests
+           ("now the other one") are grounded on current frames
+
+The chosen rate is then scaled down while the model leg is backed up (a frame
+still waiting in the ingest video lane, or audio piling up) and recovers
+gradually once it drains. Rate changes are announced to the client so it can
+stop encoding frames that would be thrown away.
+
+Frames that pass the rate check can additionally be run through a
+SceneChangeDetector, which suppresses near-duplicates of the last forwarded
+frame. User activity and spatial tool calls bypass that check, and a frame is
+always forwarded after VIDEO_MAX_STALE_SECONDS (past both the rate and the
+scene check) so the model never goes blind.
+
+VIDEO_GOVERNOR=false turns the rate limit off: every frame passes the rate
+check (the scene filter still applies if enabled) and no rate is announced.
+"""
+
+import math
+import os
+import time
+from collections.abc import Callable
+
+from ingest_queue import IngestQueue  # type: ignore
+from scene_change import SceneChangeDetector  # type: ignore
+
+VIDEO_GOVERNOR = os.getenv("VIDEO_GOVERNOR", "true").lower() == "true"
+VIDEO_FPS_IDLE = float(os.getenv("VIDEO_FPS_IDLE", "0.25"))
+VIDEO_FPS_ACTIVE = float(os.getenv("VIDEO_FPS_ACTIVE", "1.0"))
+VIDEO_FPS_BURST = float(os.getenv("VIDEO_FPS_BURST", "2.0"))
+VIDEO_ACTIVE_SECONDS = float(os.getenv("VIDEO_ACTIVE_SECONDS", "4.0"))
+VIDEO_BURST_SECONDS = float(os.getenv("VIDEO_BURST_SECONDS", "3.0"))
+VIDEO_MAX_STALE_SECONDS = float(os.getenv("VIDEO_MAX_STALE_SECONDS", "10.0"))
+
+# Tool calls that mean the user is about to ask about what is on camera.
+BURST_TOOLS = frozenset({"track_and_highlight"})
+
+# Audio chunks waiting in the ingest queue before we treat the model leg as slow.
+AUDIO_PRESSURE_DEPTH = 25
+MIN_PRESSURE_SCALE = 0.125
+
+
+class FrameGovernor:
+    """Per-session frame admission and target-rate bookkeeping."""
+
+    def __init__(
+        self,
+        ingest: IngestQueue,
+        scene: SceneChangeDetector | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        enabled: bool = VIDEO_GOVERNOR,
+    ) -> None:
+        self._ingest = ingest
+        self._enabled = enabled
+        self._scene = scene
+        self._clock = clock
+        self._last_forward = -math.inf
+        self._active_until = 0.0
+        self._burst_until = 0.0
+        self._pressure_scale = 1.0
+        self._force_next = False
+        self._announced_fps: float | None = None
+
+        self.forwarded = 0
+        self.skipped = 0
+
+    # -- signals -------------------------------------------------------------
+
+    def note_user_activity(self) -> None:
+        """User speech or text arrived: raise the rate and let the next frame through."""
+        self._active_until = self._clock() + VIDEO_ACTIVE_SECONDS
+        self._force_next = True
+
+    def note_tool_call(self, tool_name: str) -> None:
+        if tool_name in BURST_TOOLS:
+            self._burst_until = self._clock() + VIDEO_BURST_SECONDS
+            self._force_next = True
+
+    # -- decisions -----------------------------------------------------------
+
+    def target_fps(self) -> float:
+        now = self._clock()
+        if now < self._burst_until:
+            base = VIDEO_FPS_BURST
+        elif now < self._active_until:
+            base = VIDEO_FPS_ACTIVE
+        else:
+            base = VIDEO_FPS_IDLE
+        return base * self._pressure_scale
+
+    async def admit(self, frame: bytes) -> bool:
+        """Return True if the frame arriving now should be forwarded to the model."""
+        now = self._clock()
+        fps = self.target_fps()
+        forced = self._force_next
+        stale = now - self._last_forward >= VIDEO_MAX_STALE_SECONDS
+        due = not self._enabled or forced or stale
+        if not due and (fps <= 0 or now - self._last_forward < 1.0 / fps):
+            self.skipped += 1
+            return False
+        self._force_next = False
+
+        if self._scene is not None:
+            if not await self._scene.is_new_scene(frame, force=forced or stale):
+                return False
+
+        self._update_pressure()
+        self._last_forward = now
+        self.forwarded += 1
+        return True
+
+    def rate_update(self) -> float | None:
+        """The new target rate if it moved enough to be worth telling the client."""
+        if not self._enabled:
+            return None
+        fps = round(self.target_fps(), 2)
+        previous = self._announced_fps
+        if previous is not None and abs(fps - previous) < 0.25 * max(previous, 0.01):
+            return None
+        self._announced_fps = fps
+        return fps
+
+    def stats(self) -> dict[str, float]:
+        stats = {
+            "forwarded": self.forwarded,
+            "skipped": self.skipped,
+            "target_fps": round(self.target_fps(), 2),
+        }
+        if self._scene is not None:
+            stats.update({f"scene_{key}": value for key, value in self._scene.stats().items()})
+        return stats
+
+    def _update_pressure(self) -> None:
+        # The previous forwarded frame still waiting for the model means the
+        # model leg is slower than our rate: back off multiplicatively.
+        if self._ingest.video_depth > 0 or self._ingest.audio_depth > AUDIO_PRESSURE_DEPTH:
+            self._pressure_scale = max(MIN_PRESSURE_SCALE, self._pressure_scale / 2)
+        else:
+            self._pressure_scale = min(1.0, self._pressure_scale + 0.125)
@@ -0,0 +1,37 @@
+"""
+GeminiBeta: Forces the v1beta API version (required for native-audio tools)
+
+The stock ADK Gemini class creates a genai.Client WITHOUT api_version,
+which defaults to an endpoint that rejects tool calls with 1008.
+The AI Studio sandbox uses v1beta — we match that here.
+
+Clients come from the process-wide pool in client_pool.py, so reconnects (and
+every session on the server key) reuse an existing client instead of paying for
+a new one per WebSocket.
+"""
+
+from google.adk.models.google_llm import Gemini
+from google.genai import Client
+from pydantic import Field
+
+from client_pool import client_pool  # type: ignore
+
+API_VERSION = "v1beta"
+
+
+class GeminiBeta(Gemini):
+    """Gemini model wrapper that forces api_version='v1beta'."""
+
+    custom_api_key: str | None = Field(default=None, exclude=True)
+
+    @property
+    def api_client(self) -> Client:
+        # custom_api_key is the user's Bring-Your-Own-Key from the frontend;
+        # None falls back to the server's GEMINI_API_KEY / GOOGLE_API_KEY.
+        return client_pool.get(self.custom_api_key, API_VERSION, self._tracking_headers())
+
+    @property
+    def _live_api_client(self) -> Client:
+        # The ADK internally calls `_live_api_client.aio.live.connect`
+        # We must override this property too so it gets the injected custom key!
+        return client_pool.get(self.custom_api_key, API_VERSION, self._tracking_headers())
@@ -0,0 +1,144 @@
+"""
+Bounded Ingest Queue
+
+A drop-in `LiveRequestQueue` that sits between the WebSocket and the ADK's
+model sender. The stock queue is a single unbounded FIFO, so when the model leg
+stalls every audio chunk and video frame piles up behind it and the model later
+receives minutes of stale video. This queue keeps two lanes instead:
+
+  ordered  content / activity / close and realtime audio blobs, in the order
+           they were sent — never dropped, always served before video. Text
+           sent after flushed audio, or a turn marker after speech, must not
+           overtake it. Audio is bounded: `put_realtime` waits for room, which
+           pushes back on the WebSocket reader (TCP backpressure)
+  video    realtime image blobs — latest-frame-wins, older frames are dropped
+
+The ADK only ever calls `get()`, `close()` and the `send_*` helpers, so the
+lanes are invisible to it.
+
+Each entry carries the time it entered the relay (`put_realtime` accepts the
+WebSocket receive time, so backpressure waits count); when the model sender
+picks a realtime blob up, `on_dequeue(kind, seconds)` is called with the total.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+
+from google.adk.agents.live_request_queue import LiveRequest, LiveRequestQueue
+from google.genai import types
+
+INGEST_AUDIO_MAX = int(os.getenv("INGEST_AUDIO_MAX", "250"))
+INGEST_VIDEO_MAX = int(os.getenv("INGEST_VIDEO_MAX", "1"))
+
+
+class IngestQueue(LiveRequestQueue):
+    """Order-preserving, bounded replacement for LiveRequestQueue with a latest-wins video lane."""
+
+    def __init__(self, audio_max: int = INGEST_AUDIO_MAX, video_max: int = INGEST_VIDEO_MAX) -> None:
+        super().__init__()
+        self._audio_max = max(1, audio_max)
+        self._video_max = max(1, video_max)
+        # (entered, request); `entered` is None for control requests, which are not timed
+        self._ordered: deque[tuple[float | None, LiveRequest]] = deque()
+        self._audio_count = 0
+        self._video: deque[tuple[float, LiveRequest]] = deque()
+        self._ready = asyncio.Event()
+        self._audio_space = asyncio.Event()
+        self._audio_space.set()
+
+        self.video_dropped = 0
+        self.audio_waits = 0
+        self.audio_high_water = 0
+        self.on_dequeue: Callable[[str, float], None] | None = None
+
+    # -- producer side -----------------------------------------------------
+
+    def send(self, req: LiveRequest, received_at: float | None = None) -> None:
+        if req.blob is not None and not (req.close or req.activity_start or req.activity_end):
+            entry = (received_at or time.perf_counter(), req)
+            if (req.blob.mime_type or "").startswith("image/"):
+                if len(self._video) >= self._video_max:
+                    self._video.popleft()
+                    self.video_dropped += 1
+                self._video.append(entry)
+            else:
+                self._ordered.append(entry)
+                self._audio_count += 1
+                if self._audio_count > self.audio_high_water:
+                    self.audio_high_water = self._audio_count
+        else:
+            self._ordered.append((None, req))
+        self._ready.set()
+
+    def close(self) -> None:
+        self.send(LiveRequest(close=True))
+
+    def send_content(self, content: types.Content) -> None:
+        self.send(LiveRequest(content=content))
+
+    def send_realtime(self, blob: types.Blob) -> None:
+        self.send(LiveRequest(blob=blob))
+
+    def send_activity_start(self) -> None:
+        self.send(LiveRequest(activity_start=types.ActivityStart()))
+
+    def send_activity_end(self) -> None:
+        self.send(LiveRequest(activity_end=types.ActivityEnd()))
+
+    async def put_realtime(self, blob: types.Blob, received_at: float | None = None) -> None:
+        """Like send_realtime, but waits for room in the audio lane instead of growing it.
+
+        `received_at` (time.perf_counter()) is when the blob reached the relay.
+        """
+        if not (blob.mime_type or "").startswith("image/") and self._audio_count >= self._audio_max:
+            self.audio_waits += 1
+            while self._audio_count >= self._audio_max:
+                self._audio_space.clear()
+                await self._audio_space.wait()
+        self.send(LiveRequest(blob=blob), received_at)
+
+    # -- consumer side (ADK model sender) -------------------------------------
+
+    async def get(self) -> LiveRequest:
+        while True:
+            if self._ordered:
+                entered, req = self._ordered.popleft()
+                if entered is None:
+                    return req
+                self._audio_count -= 1
+                if self._audio_count < self._audio_max:
+                    self._audio_space.set()
+                if self.on_dequeue is not None:
+                    self.on_dequeue("audio", time.perf_counter() - entered)
+                return req
+            if self._video:
+                entered, req = self._video.popleft()
+                if self.on_dequeue is not None:
+                    self.on_dequeue("video", time.perf_counter() - entered)
+                return req
+            self._ready.clear()
+            await self._ready.wait()
+
+    # -- observability -------------------------------------------------------
+
+    @property
+    def audio_depth(self) -> int:
+        return self._audio_count
+
+    @property
+    def video_depth(self) -> int:
+        return len(self._video)
+
+    def stats(self) -> dict[str, int]:
+        """Current lane depths and cumulative drop / backpressure counters."""
+        return {
+            "control_depth": len(self._ordered) - self._audio_count,
+            "audio_depth": self.audio_depth,
+            "video_depth": self.video_depth,
+            "audio_high_water": self.audio_high_water,
+            "audio_waits": self.audio_waits,
+            "video_dropped": self.video_dropped,
+        }
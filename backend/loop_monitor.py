@@ -0,0 +1,63 @@
+"""
+Event-Loop Lag Monitor
+
+Every session in the process shares one asyncio loop, so anything that blocks
+it delays all of them. This monitor runs a background task that sleeps for a
+fixed interval and records how late it wakes up; the overshoot is the time the
+loop was busy with other work. Percentiles over the recent window are served
+by `/api/runtime` (pass `reset=true` to start a new window, as the load
+benchmark does between steps). The sample window is not locked: call
+`snapshot()` from the event-loop thread only.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.05"))
+LOOP_MONITOR_WINDOW = int(os.getenv("LOOP_MONITOR_WINDOW", "6000"))
+
+
+class LoopLagMonitor:
+    """Samples event-loop wake-up lag at a fixed interval."""
+
+    def __init__(self, interval: float = LOOP_MONITOR_INTERVAL, window: int = LOOP_MONITOR_WINDOW) -> None:
+        self.interval = interval
+        self._samples: deque[float] = deque(maxlen=window)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def snapshot(self, reset: bool = False) -> dict[str, float]:
+        """Lag percentiles in milliseconds over the current window."""
+        samples = np.fromiter(self._samples, dtype=np.float64) * 1000
+        if reset:
+            self._samples.clear()
+        if samples.size == 0:
+            return {"samples": 0}
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {
+            "samples": int(samples.size),
+            "p50_ms": round(float(p50), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(samples.max()), 3),
+        }
+
+
+loop_monitor = LoopLagMonitor()
@@ -11,30 +11,60 @@ import base64
 import json
 import os
 import sys
+import time
 import uuid
 import warnings
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from google.adk import Agent, Runner
-from google.adk.agents.live_request_queue import LiveRequestQueue
-from google.adk.agents.run_config import RunConfig, StreamingMode
-from google.adk.models.google_llm import Gemini
 from google.adk.sessions import InMemorySessionService
-from google.genai import Client, types
+from google.genai import types
 from loguru import logger
-from pydantic import Field
 
 # Resolve the path to the root .env.local file (load BEFORE local imports that read env)
 ENV_PATH = Path(__file__).resolve().parent.parent / ".env.local"
 load_dotenv(ENV_PATH)
 
-import tools_config  # type: ignore # noqa: E402, I001
-from firebase_auth import initialize_firebase, verify_token  # type: ignore # noqa: E402, I001
-from frame_diagnostics import FrameDiagnostics  # type: ignore # noqa: E402, I001
+from firebase_auth import initialize_firebase, token_cache, verify_token_async  # type: ignore # noqa: E402, I001
+from downstream_codec import DownstreamEncoder, blob_seconds, with_audio_parts  # type: ignore # noqa: E402, I001
+from downstream_scheduler import AUDIO, CONTROL, TRANSCRIPT, DownstreamScheduler  # type: ignore # noqa: E402, I001
+from event_inspect import audio_blobs, encode_event, function_calls, tool_call_boxes  # type: ignore # noqa: E402, I001
+from frame_diagnostics import DIAGNOSTICS_ENABLED, FrameDiagnostics, diagnostics_writer  # type: ignore # noqa: E402, I001
+from frame_governor import FrameGovernor  # type: ignore # noqa: E402, I001
+from client_pool import client_pool  # type: ignore # noqa: E402, I001
+from audio_coalescer import AudioCoalescer  # type: ignore # noqa: E402, I001
+from audio_ingest import AudioIngest  # type: ignore # noqa: E402, I001
+from clock_sync import CLOCK_SYNC_BURST, CLOCK_SYNC_INTERVAL, ClockSync, LatencyBreakdown, wall_ms  # type: ignore # noqa: E402, I001
+from ingest_queue import IngestQueue  # type: ignore # noqa: E402, I001
+from loop_monitor import loop_monitor  # type: ignore # noqa: E402, I001
+from mode_registry import get_mode_template  # type: ignore # noqa: E402, I001
+from relay_metrics import (  # type: ignore # noqa: E402, I001
+    AUDIO_DECODE_SECONDS,
+    AUDIO_INGEST_BYTES,
+    AUTH_SECONDS,
+    CONTENT_TYPE,
+    MODEL_AUDIO_MESSAGES,
+    VAD_AUDIO,
+    SessionMetrics,
+    render_metrics,
+    set_client_pool,
+)
+from session_recording import BINARY, DOWN, TEXT, SessionRecorder  # type: ignore # noqa: E402, I001
+from scene_change import SCENE_CHANGE_FILTER, SceneChangeDetector, image_size  # type: ignore # noqa: E402, I001
+from turn_tracing import TurnTracer  # type: ignore # noqa: E402, I001
+from voice_activity import SERVER_VAD, VoiceGate  # type: ignore # noqa: E402, I001
+from wire_protocol import (  # type: ignore # noqa: E402, I001
+    KIND_VIDEO,
+    WireProtocolError,
+    decode_media_frame,
+    encode_audio_frame,
+    split_audio_parts,
+)
 
 DEBUG_MODE: bool = os.getenv("DEBUG", "false").lower() == "true"
 
@@ -52,7 +82,16 @@ logger.add(
     ),
 )
 
-app = FastAPI(title="The Spatial Eye - Gemini Relay Backend")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the event-loop lag monitor for the lifetime of the app."""
+    loop_monitor.start()
+    yield
+    await loop_monitor.stop()
+
+
+app = FastAPI(title="The Spatial Eye - Gemini Relay Backend", lifespan=lifespan)
 
 # Configure CORS
 # In production, this should include your Cloud Run service URL.
@@ -77,57 +116,6 @@ agent_model: str = os.getenv(
 initialize_firebase()
 
 
-# ---------------------------------------------------------------------------
-# GeminiBeta: Forces the v1beta API version (required for native-audio tools)
-# ---------------------------------------------------------------------------
-# The stock ADK Gemini class creates a genai.Client WITHOUT api_version,
-# which defaults to an endpoint that rejects tool calls with 1008.
-# The AI Studio sandbox uses v1beta — we match that here.
-# ---------------------------------------------------------------------------
-
-
-
-class GeminiBeta(Gemini):
-    """Gemini model wrapper that forces api_version='v1beta'."""
-
-    custom_api_key: str | None = Field(default=None, exclude=True)
-
-    @property
-    def api_client(self) -> Client:
-        if not hasattr(self, "_beta_client"):
-            http_options = types.HttpOptions(
-                api_version="v1beta",
-                headers=self._tracking_headers(),
-            )
-
-            if self.custom_api_key:
-                # User provided a Bring-Your-Own-Key via the frontend
-                self._beta_client = Client(
-                    api_key=self.custom_api_key, http_options=http_options
-                )
-            else:
-                self._beta_client = Client(http_options=http_options)
-
-        return self._beta_client
-
-    @property
-    def _live_api_client(self) -> Client:
-        # The ADK internally calls `_live_api_client.aio.live.connect`
-        # We must override this property too so it gets the injected custom key!
-        if not hasattr(self, "_beta_live_client"):
-            http_options = types.HttpOptions(
-                api_version="v1beta",
-                headers=self._tracking_headers(),
-            )
-            if self.custom_api_key:
-                self._beta_live_client = Client(
-                    api_key=self.custom_api_key, http_options=http_options
-                )
-            else:
-                self._beta_live_client = Client(http_options=http_options)
-        return self._beta_live_client
-
-
 @app.get("/")
 def read_root() -> dict[str, str]:
     """Health check endpoint."""
@@ -145,15 +133,49 @@ def api_status() -> dict:
     return {"has_server_key": has_key, "live_model": agent_model}
 
 
+@app.get("/api/runtime")
+async def api_runtime(reset: bool = False) -> dict:
+    """Event-loop lag over the current window; `reset=true` starts a new one.
+
+    Async so it runs on the event loop, like the monitor task that appends samples.
+    """
+    return {"loop_lag": loop_monitor.snapshot(reset)}
+
+
+@app.get("/metrics")
+async def metrics_endpoint() -> Response:
+    """Prometheus scrape endpoint (see relay_metrics.py).
+
+    Async so rendering runs on the event loop: the metrics are not locked.
+    """
+    set_client_pool(client_pool.stats())
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
 @app.websocket("/ws/live")
 async def websocket_endpoint(
-    websocket: WebSocket, mode: str = "spatial", token: str = None, api_key: str = None
+    websocket: WebSocket,
+    mode: str = "spatial",
+    token: str = None,
+    api_key: str = None,
+    protocol: int = 0,
+    audio_out: str = "json",
+    clock_sync: int = 0,
+    audio_codec: str = "pcm",
 ) -> None:
     """
     Main WebSocket endpoint for real-time interaction with Gemini.
     Requires a valid Firebase ID token for connection.
+
+    `protocol=1` switches binary messages to the framed format in wire_protocol.py
+    (audio and JPEG video without base64); the default keeps binary = raw PCM.
+    `audio_out=binary` sends model audio as binary frames instead of base64 inside
+    the event JSON. `clock_sync=1` turns on the ping / pong exchange in
+    clock_sync.py, so capture timestamps can be turned into per-leg latencies.
+    `audio_codec=pcmu|opus` encodes model audio before sending it (downstream_codec.py).
     """
     await websocket.accept()
+    connect_started = time.perf_counter()
 
     # Verify API Key availability First
     if (
@@ -180,7 +202,10 @@ async def websocket_endpoint(
         await websocket.close(code=1008, reason="Token Missing")
         return
 
-    decoded = verify_token(token)
+    # Verified off the event loop; reconnects with the same token hit the cache
+    auth_started = time.perf_counter()
+    decoded = await verify_token_async(token)
+    AUTH_SECONDS.labels().observe(time.perf_counter() - auth_started)
     if not decoded:
         logger.warning("WebSocket Connection Attempt with invalid token.")
         await websocket.send_text(
@@ -191,77 +216,147 @@ async def websocket_endpoint(
         await websocket.close(code=1008, reason="Token Invalid")
         return
 
+    encoder = None
+    if audio_codec != "pcm":
+        try:
+            encoder = DownstreamEncoder(audio_codec)
+        except ValueError as e:
+            logger.warning(f"WebSocket Connection Attempt with unusable audio codec: {e}")
+            await websocket.send_text(json.dumps({"error": "UNSUPPORTED_CODEC", "message": str(e)}))
+            await websocket.close(code=1008, reason="Unsupported Audio Codec")
+            return
+
     user_id: str = decoded["uid"]
     session_id: str = str(uuid.uuid4())
-    mode_clean: str = mode.replace("-", "_")
+    template = get_mode_template(mode)
+    metrics = SessionMetrics(template.mode)
 
     logger.info(f"[{session_id}] New Session - User: {user_id} - Mode: {mode}")
 
     await session_service.create_session(
-        app_name=f"SpatialEyeApp_{mode_clean}", user_id=user_id, session_id=session_id
+        app_name=template.app_name, user_id=user_id, session_id=session_id
     )
 
-    # Resolve Mode Configuration
-    config_map = {
-        "storyteller": (
-            tools_config.STORYTELLER_SYSTEM_INSTRUCTION,
-            tools_config.DIRECTOR_TOOLS,
-        ),
-        "it-architecture": (
-            tools_config.IT_ARCHITECTURE_SYSTEM_INSTRUCTION,
-            tools_config.IT_ARCHITECTURE_TOOLS,
-        ),
-        "spatial": (
-            tools_config.SPATIAL_SYSTEM_INSTRUCTION,
-            tools_config.SPATIAL_TOOLS,
-        ),
-    }
-    system_instruction, active_tools = config_map.get(mode, config_map["spatial"])
-
-    agent = Agent(
-        name=f"SpatialEye_{mode_clean}",
-        model=GeminiBeta(model=agent_model, custom_api_key=api_key),
-        instruction=system_instruction,
-        tools=active_tools,
-    )
+    # Bind the connection's model (and BYOK key) to the precompiled mode template
+    runner, run_config = template.bind(agent_model, api_key, session_service)
 
-    runner = Runner(
-        app_name=f"SpatialEyeApp_{mode_clean}",
-        agent=agent,
-        session_service=session_service,
+    # Bounded, order-preserving stand-in for LiveRequestQueue with latest-wins video (see ingest_queue.py)
+    live_request_queue = IngestQueue()
+    clock = ClockSync() if clock_sync else None
+    breakdown = LatencyBreakdown(template.mode, clock)
+    live_request_queue.on_dequeue = breakdown.model_sender
+    diag = FrameDiagnostics(session_id)
+    tracer = TurnTracer(session_id, template.mode)
+    audio_ingest = AudioIngest()
+    voice_gate = VoiceGate() if SERVER_VAD else None
+    # Merges small audio chunks into fewer model messages (see audio_coalescer.py)
+    coalescer = AudioCoalescer(live_request_queue)
+    recorder = SessionRecorder(
+        session_id,
+        {
+            "mode": template.mode,
+            "protocol": protocol,
+            "audio_out": audio_out,
+            "clock_sync": clock_sync,
+            "audio_codec": audio_codec,
+        },
     )
-
-    run_config = RunConfig(
-        streaming_mode=StreamingMode.BIDI,
-        response_modalities=[types.Modality.AUDIO],
-        speech_config=types.SpeechConfig(
-            voice_config=types.VoiceConfig(
-                prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name="Puck")
-            )
-        ),
-        # Real-time grounding: Force model to consider ALL inputs for every turn
-        realtime_input_config=types.RealtimeInputConfig(
-            turn_coverage="TURN_INCLUDES_ALL_INPUT"
-        ),
-        # Context Management: Tighter window to prevent 'ghost' objects from minutes ago.
-        # Video is ~258 tokens/sec. 15k tokens = ~58 seconds of memory.
-        context_window_compression=types.ContextWindowCompressionConfig(
-            trigger_tokens=15000,
-            sliding_window=types.SlidingWindow(target_tokens=7500),
-        ),
-        input_audio_transcription=types.AudioTranscriptionConfig(),
-        output_audio_transcription=types.AudioTranscriptionConfig(),
+    governor = FrameGovernor(
+        live_request_queue,
+        scene=SceneChangeDetector() if SCENE_CHANGE_FILTER else None,
     )
 
-    live_request_queue = LiveRequestQueue()
-    diag = FrameDiagnostics(session_id)
+    # Size of the last forwarded frame, for pixel-space tool-call boxes
+    frame_size = [0, 0]
+
+    async def write(data: str | bytes) -> None:
+        """The scheduler's writer: the only place that sends on the socket once the relay runs."""
+        if isinstance(data, bytes):
+            recorder.record(DOWN, BINARY, data)
+            await websocket.send_bytes(data)
+        else:
+            recorder.record(DOWN, TEXT, data)
+            await websocket.send_text(data)
+        metrics.bytes_out.inc(len(data))
+
+    # Priority queues + single writer for everything sent downstream (see downstream_scheduler.py)
+    scheduler = DownstreamScheduler(write, template.mode)
+
+    def announce_video_rate() -> None:
+        """Tell the client the governor's target frame rate whenever it moves."""
+        fps = governor.rate_update()
+        if fps is not None:
+            scheduler.put_nowait(CONTROL, [json.dumps({"videoRate": {"fps": fps}})])
 
     async def upstream_task() -> None:
         """Handles incoming messages from the frontend."""
-        counts = {"audio": 0, "video": 0}
+        counts = {"audio": 0, "video": 0, "video_superseded": 0}
+        # Newest frame not yet through the governor. Scene detection decodes a thumbnail, so admission
+        # runs in its own task and never stalls audio behind this reader; a waiting frame is replaced.
+        video_slot: list[tuple[bytes, str, int, int, float] | None] = [None]
+        video_ready = asyncio.Event()
+
+        def offer_video(raw_video: bytes, mime_type: str, width: int, height: int, received_at: float) -> None:
+            if video_slot[0] is not None:
+                counts["video_superseded"] += 1
+            video_slot[0] = (raw_video, mime_type, width, height, received_at)
+            video_ready.set()
+
+        async def video_admission_task() -> None:
+            while True:
+                await video_ready.wait()
+                video_ready.clear()
+                frame, video_slot[0] = video_slot[0], None
+                if frame is not None:
+                    await forward_video(*frame)
+
+        async def forward_video(
+            raw_video: bytes, mime_type: str, width: int, height: int, received_at: float
+        ) -> None:
+            admitted = await governor.admit(raw_video)
+            announce_video_rate()
+            if not admitted:
+                return
+
+            if not (width and height):
+                width, height = image_size(raw_video)
+            frame_size[:] = (width, height)
+
+            counts["video"] += 1
+            if counts["video"] % 20 == 0:
+                logger.debug(
+                    f"[{session_id}] Upstream: {counts['video']} Frames ({width}x{height}), "
+                    f"{counts['video_superseded']} superseded before admission, "
+                    f"{live_request_queue.video_dropped} dropped by ingest"
+                )
+            # Capture frame for diagnostics
+            diag.capture_frame(raw_video, width=width, height=height)
+            await live_request_queue.put_realtime(types.Blob(mime_type=mime_type, data=raw_video), received_at)
+
+        async def forward_audio(raw_audio: bytes, mime_type: str, received_at: float) -> None:
+            # Compressed / non-16 kHz audio becomes 16 kHz PCM first (see audio_ingest.py)
+            decoded = await audio_ingest.decode(mime_type, raw_audio)
+            if decoded is None:
+                return
+            mime_type, raw_audio = decoded
+            was_open = voice_gate is not None and voice_gate.open
+            chunks = voice_gate.admit(mime_type, raw_audio) if voice_gate is not None else (raw_audio,)
+            if not was_open and voice_gate is not None and voice_gate.open:
+                # A turn starts at the speech onset (without the gate: at the first input transcription)
+                tracer.speech_start()
+            for chunk in chunks:
+                await coalescer.put(mime_type, chunk, received_at)
+            if was_open and not voice_gate.open:
+                # End of speech: don't hold the utterance's tail back for a full frame
+                coalescer.flush("speech_end")
+                diag.note_user_input()
+
+        video_task = asyncio.create_task(video_admission_task())
         try:
             while True:
                 msg: dict[str, Any] = await websocket.receive()
+                received_at = time.perf_counter()
+                recorder.record_upstream(msg)
 
                 # Handle ASGI disconnect message
                 if msg["type"] == "websocket.disconnect":
@@ -270,27 +365,54 @@ async def websocket_endpoint(
                     )
                     break
 
-                # 1. Handle Binary Audio (Direct bytes from FE)
+                # 1a. Handle Framed Binary Media (protocol=1 clients)
+                if "bytes" in msg and protocol >= 1:
+                    metrics.bytes_in.inc(len(msg["bytes"]))
+                    try:
+                        frame = decode_media_frame(msg["bytes"])
+                    except WireProtocolError as e:
+                        logger.warning(f"[{session_id}] Upstream: Dropped binary frame: {e}")
+                        continue
+                    if frame.kind == KIND_VIDEO:
+                        metrics.video_in.inc()
+                        breakdown.captured("video", frame.client_ts, wall_ms())
+                        offer_video(frame.data, frame.mime_type, frame.width, frame.height, received_at)
+                    else:
+                        counts["audio"] += 1
+                        metrics.audio_in.inc()
+                        breakdown.captured("audio", frame.client_ts, wall_ms())
+                        await forward_audio(frame.data, frame.mime_type, received_at)
+                    metrics.upstream_latency.observe(time.perf_counter() - received_at)
+                    continue
+
+                # 1b. Handle Binary Audio (Direct raw PCM bytes from legacy FE)
                 if "bytes" in msg:
+                    metrics.bytes_in.inc(len(msg["bytes"]))
+                    metrics.audio_in.inc()
                     counts["audio"] += 1
                     if counts["audio"] % 100 == 0:
                         logger.debug(
                             f"[{session_id}] Upstream: {counts['audio']} Binary Blocks"
                         )
-                    live_request_queue.send_realtime(
-                        types.Blob(mime_type="audio/pcm;rate=16000", data=msg["bytes"])
-                    )
+                    await forward_audio(msg["bytes"], "audio/pcm;rate=16000", received_at)
+                    metrics.upstream_latency.observe(time.perf_counter() - received_at)
                     continue
 
                 # 2. Handle Text (JSON payloads)
                 if "text" in msg:
                     text_data: str = msg["text"]
+                    metrics.bytes_in.inc(len(text_data))
                     if not text_data.strip():
                         continue
 
                     try:
                         parsed: dict[str, Any] = json.loads(text_data)
 
+                        if "clockPong" in parsed:
+                            if clock is not None:
+                                clock.pong(parsed["clockPong"])
+                            continue
+
                         # Process Multimodal Payload
                         if "realtimeInput" in parsed:
                             ri = parsed["realtimeInput"]
@@ -299,42 +421,35 @@ async def websocket_endpoint(
 
                             if media:
                                 counts["audio"] += 1
-                                raw_media = base64.b64decode(media["data"])
-                                live_request_queue.send_realtime(
-                                    types.Blob(
-                                        mime_type=media.get(
-                                            "mimeType", "audio/pcm;rate=16000"
-                                        ),
-                                        data=raw_media,
-                                    )
+                                metrics.audio_in.inc()
+                                breakdown.captured("audio", float(media.get("clientTs") or 0), wall_ms())
+                                await forward_audio(
+                                    base64.b64decode(media["data"]),
+                                    media.get("mimeType", "audio/pcm;rate=16000"),
+                                    received_at,
                                 )
 
                             if video:
-                                counts["video"] += 1
-                                if counts["video"] % 20 == 0:
-                                    w = video.get("width", "unknown")
-                                    h = video.get("height", "unknown")
-                                    logger.debug(
-                                        f"[{session_id}] Upstream: {counts['video']} Frames ({w}x{h})"
-                                    )
-                                raw_video = base64.b64decode(video["data"])
-                                # Capture frame for diagnostics
-                                diag.capture_frame(
-                                    raw_video,
-                                    width=int(video.get("width", 0)),
-                                    height=int(video.get("height", 0)),
-                                )
-                                live_request_queue.send_realtime(
-                                    types.Blob(
-                                        mime_type=video.get("mimeType", "image/jpeg"),
-                                        data=raw_video,
-                                    )
+                                metrics.video_in.inc()
+                                breakdown.captured("video", float(video.get("clientTs") or 0), wall_ms())
+                                offer_video(
+                                    base64.b64decode(video["data"]),
+                                    video.get("mimeType", "image/jpeg"),
+                                    int(video.get("width") or 0),
+                                    int(video.get("height") or 0),
+                                    received_at,
                                 )
+                            metrics.upstream_latency.observe(time.perf_counter() - received_at)
                             continue
 
                         # Process Explicit Text Input
                         input_text = parsed.get("text", "").lower()
                         if input_text:
+                            metrics.text_in.inc()
+                            tracer.user_text()
+                            governor.note_user_activity()
+                            diag.note_user_input()
+                            coalescer.flush("text")
                             # 3. Handle Manual Context Reset
                             if (
                                 "reset context" in input_text
@@ -371,6 +486,11 @@ async def websocket_endpoint(
 
                     except json.JSONDecodeError:
                         # Fallback for raw non-JSON text
+                        metrics.text_in.inc()
+                        tracer.user_text()
+                        governor.note_user_activity()
+                        diag.note_user_input()
+                        coalescer.flush("text")
                         logger.info(
                             f"[{session_id}] Upstream: Raw Text -> {text_data[:50]}"
                         )
@@ -384,11 +504,27 @@ async def websocket_endpoint(
             logger.info(f"[{session_id}] WebSocket Disconnected (Upstream)")
         except Exception as e:
             logger.error(f"[{session_id}] Upstream Fatal Error: {e}")
+        finally:
+            video_task.cancel()
 
     async def downstream_task() -> None:
         """Reads events from the Gemini Runner and pipes them to the frontend."""
         processed_calls: set[str] = set()
         audio_out_count = 0
+        binary_audio = audio_out == "binary"
+        turn_id = 0
+        audio_seq = 0
+        model_turn_open = False
+
+        def event_sent(
+            event_at: float, transcribed: bool, audio: bool, tool_names: list[str], ends_turn: bool, interrupted: bool
+        ) -> None:
+            """Runs once the scheduler has written the event."""
+            tracer.on_event(transcribed, audio, tool_names, ends_turn, interrupted)
+            relay_seconds = time.perf_counter() - event_at
+            metrics.downstream_latency.observe(relay_seconds)
+            breakdown.sent_to_client(relay_seconds)
+
         try:
             async for event in runner.run_live(
                 user_id=user_id,
@@ -396,54 +532,114 @@ async def websocket_endpoint(
                 live_request_queue=live_request_queue,
                 run_config=run_config,
             ):
-                # Optimization: model_dump_json is expensive; minimize calls
-                payload: str = event.model_dump_json(exclude_none=True, by_alias=True)
-
-                # Deduplication & Tracing
-                try:
-                    p_dict: dict[str, Any] = json.loads(payload)
-
-                    # 1. Filter duplicate tool calls
-                    if "content" in p_dict and "parts" in p_dict["content"]:
-                        is_duplicate = False
-                        for part in p_dict["content"]["parts"]:
-                            if "functionCall" in part:
-                                fc = part["functionCall"]
-                                call_id = fc["id"]
-                                call_name = fc["name"]
-                                call_args = fc.get("args", {})
-
-                                logger.success(
-                                    f"[{session_id}] Tool Call Sent -> {call_name}({call_args})"
-                                )
-                                # Annotate frame for diagnostics
-                                diag.annotate_tool_call(call_name, call_args)
-
-                                if call_id in processed_calls:
-                                    is_duplicate = True
-                                    break
-                                processed_calls.add(call_id)
-                        if is_duplicate:
-                            continue
-
-                    # 2. Progress Logging
-                    if (
-                        "serverContent" in p_dict
-                        and "modelTurn" in p_dict["serverContent"]
-                    ):
-                        parts = p_dict["serverContent"]["modelTurn"].get("parts", [])
-                        for part in parts:
-                            if "inlineData" in part:
-                                audio_out_count += 1
-                                if audio_out_count % 50 == 0:
-                                    logger.debug(
-                                        f"[{session_id}] Downstream: {audio_out_count} Audio Blocks"
-                                    )
-
-                except Exception:
-                    pass
+                event_at = time.perf_counter()
+                calls = function_calls(event)
+                pcm_blobs = audio_blobs(event)
+                if event.input_transcription and not model_turn_open:
+                    diag.note_user_input()
+                # The model's first output of a turn fixes which frames the user was asking about
+                if not model_turn_open and (calls or pcm_blobs or event.output_transcription):
+                    diag.mark_model_turn()
+                    model_turn_open = True
+
+                # 1. Filter duplicate tool calls
+                is_duplicate = False
+                for call in calls:
+                    call_args = call.args or {}
+                    logger.success(
+                        f"[{session_id}] Tool Call Sent -> {call.name}({call_args})"
+                    )
+                    # Annotate frame for diagnostics
+                    diag.annotate_tool_call(call.name, call_args)
+                    governor.note_tool_call(call.name)
+
+                    if call.id:
+                        if call.id in processed_calls:
+                            is_duplicate = True
+                            break
+                        processed_calls.add(call.id)
+                if is_duplicate:
+                    metrics.duplicate_calls.inc()
+                    continue
+                for call in calls:
+                    metrics.tool_call(call.name)
+                boxes = tool_call_boxes(calls, *frame_size) if calls else []
+
+                # 2. Frame-rate signals & progress logging
+                if event.input_transcription:
+                    governor.note_user_activity()
+                announce_video_rate()
+
+                for _ in pcm_blobs:
+                    audio_out_count += 1
+                    if audio_out_count % 50 == 0:
+                        logger.debug(
+                            f"[{session_id}] Downstream: {audio_out_count} Audio Blocks"
+                        )
 
-                await websocket.send_text(payload)
+                # 3. Binary audio mode: PCM goes out as framed bytes
+                transcribed = event.input_transcription is not None
+                interrupted = bool(event.interrupted)
+                ends_turn = bool(event.turn_complete or interrupted)
+                out_blobs: list[types.Blob] = []
+                source_event = event
+                if pcm_blobs and (binary_audio or encoder is not None):
+                    out_blobs, event = split_audio_parts(event)
+                if encoder is not None:
+                    # Optional codec: encoder state is per turn, dropped at once on interruption
+                    if interrupted:
+                        encoder.interrupt()
+                    out_blobs = await encoder.encode(out_blobs, end_turn=ends_turn and not interrupted)
+                    if out_blobs and not binary_audio:
+                        event = with_audio_parts(source_event, event, out_blobs)
+                payloads: list[str | bytes] = []
+                if binary_audio:
+                    for blob in out_blobs:
+                        payloads.append(encode_audio_frame(turn_id, audio_seq, blob.mime_type, blob.data))
+                        audio_seq += 1
+                if ends_turn:
+                    turn_id += 1
+                    audio_seq = 0
+                    model_turn_open = False
+                if event is not None:
+                    # Serialize exactly once, straight from the pydantic event
+                    payloads.append(encode_event(event, {"pixelBoxes": boxes} if boxes else None))
+                if not payloads:
+                    # Audio-only event whose audio the Opus encoder is still holding: nothing to send yet
+                    continue
+                metrics.events_out.inc()
+
+                # 4. Queue by class: tool calls / control first, audio paced, transcripts best-effort
+                sent_audio = out_blobs if (binary_audio or encoder is not None) else pcm_blobs
+                if calls or interrupted or event is not None and event.error_code:
+                    lane = CONTROL
+                elif sent_audio or ends_turn:
+                    lane = AUDIO
+                elif transcribed or event is not None and event.output_transcription:
+                    lane = TRANSCRIPT
+                else:
+                    lane = CONTROL
+                # Audio that also carries a transcript or turnComplete keeps its JSON if interrupted
+                keep = None
+                if lane == AUDIO and event is not None and (transcribed or event.output_transcription or ends_turn):
+                    keep = payloads[-1:]
+                if interrupted:
+                    scheduler.interrupt()
+                await scheduler.put(
+                    lane,
+                    payloads,
+                    sum(blob_seconds(blob) for blob in sent_audio),
+                    partial(
+                        event_sent,
+                        event_at,
+                        transcribed,
+                        bool(sent_audio),
+                        [call.name for call in calls],
+                        ends_turn,
+                        interrupted,
+                    ),
+                    keep,
+                )
 
         except WebSocketDisconnect:
             logger.info(f"[{session_id}] WebSocket Disconnected (Downstream)")
@@ -452,31 +648,81 @@ async def websocket_endpoint(
             if "Missing key inputs" in str(e) or "api_key" in str(e):
                 error_msg = "No API key available. Please use the key (🔑) icon to set your key."
                 try:
-                    await websocket.send_text(
-                        json.dumps({"error": "MISSING_API_KEY", "message": error_msg})
-                    )
+                    scheduler.put_nowait(CONTROL, [json.dumps({"error": "MISSING_API_KEY", "message": error_msg})])
+                    async with asyncio.timeout(2):
+                        await scheduler.drain()
                     await websocket.close(code=1008, reason="Missing API Key")
                 except Exception:
                     pass
+        finally:
+            logger.info(f"[{session_id}] Downstream (audio_out={audio_out}): {scheduler.stats()}")
+            if encoder is not None:
+                logger.info(f"[{session_id}] Downstream codec: {encoder.stats()}")
+
+    async def clock_sync_task() -> None:
+        """Ping the client in a quick burst, then every CLOCK_SYNC_INTERVAL seconds."""
+        sent = 0
+        while True:
+            scheduler.put_nowait(CONTROL, [json.dumps(clock.ping())])
+            sent += 1
+            await asyncio.sleep(0.2 if sent < CLOCK_SYNC_BURST else CLOCK_SYNC_INTERVAL)
 
     # Orchestration
-    logger.info(f"[{session_id}] Starting relay for mode: {mode}")
+    setup_seconds = time.perf_counter() - connect_started
+    metrics.connect.observe(setup_seconds)
+    setup_ms = setup_seconds * 1000
+    logger.info(f"[{session_id}] Starting relay for mode: {mode} (setup {setup_ms:.1f} ms)")
+    logger.debug(f"[{session_id}] genai client pool: {client_pool.stats()}")
+    logger.debug(f"[{session_id}] verified-token cache: {token_cache.stats()}")
+    metrics.active.inc()
     try:
         t1 = asyncio.create_task(upstream_task())
         t2 = asyncio.create_task(downstream_task())
+        t3 = asyncio.create_task(clock_sync_task()) if clock is not None else None
+        writer = asyncio.create_task(scheduler.run())
         # Wait for EITHER task to finish (usually due to disconnect/error).
         # Then cancel the other to prevent it from blocking cleanup.
-        _, pending = await asyncio.wait([t1, t2], return_when=asyncio.FIRST_COMPLETED)
+        done, pending = await asyncio.wait([t1, t2], return_when=asyncio.FIRST_COMPLETED)
         for task in pending:
             task.cancel()
+        if t3 is not None:
+            t3.cancel()
+        if t2 in done:
+            # The model side ended first: let the writer flush what is still queued.
+            try:
+                async with asyncio.timeout(2):
+                    await scheduler.drain()
+            except TimeoutError:
+                pass
+        writer.cancel()
     finally:
+        metrics.active.dec()
+        coalescer.close()
         live_request_queue.close()
+        recorder.close()
         try:
             await session_service.delete_session(
-                app_name=f"SpatialEyeApp_{mode_clean}",
+                app_name=template.app_name,
                 user_id=user_id,
                 session_id=session_id,
             )
         except Exception:
             pass
+        logger.info(f"[{session_id}] Ingest stats: {live_request_queue.stats()}")
+        logger.info(f"[{session_id}] Frame governor: {governor.stats()}")
+        logger.info(f"[{session_id}] Latency breakdown: {breakdown.summary()}")
+        MODEL_AUDIO_MESSAGES.labels(template.mode).inc(coalescer.blobs_out)
+        logger.info(f"[{session_id}] Audio coalescer: {coalescer.stats()}")
+        if audio_ingest.formats:
+            for fmt, (_, wire, pcm, cpu) in audio_ingest.formats.items():
+                AUDIO_INGEST_BYTES.labels(template.mode, fmt, "wire").inc(wire)
+                AUDIO_INGEST_BYTES.labels(template.mode, fmt, "pcm").inc(pcm)
+                AUDIO_DECODE_SECONDS.labels(template.mode, fmt).inc(cpu)
+            logger.info(f"[{session_id}] Audio ingest: {audio_ingest.stats()}")
+        if voice_gate is not None:
+            VAD_AUDIO.labels(template.mode, "forwarded").inc(voice_gate.forwarded_ms / 1000)
+            VAD_AUDIO.labels(template.mode, "suppressed").inc((voice_gate.audio_ms - voice_gate.forwarded_ms) / 1000)
+            logger.info(f"[{session_id}] Voice gate: {voice_gate.stats()}")
+        if DIAGNOSTICS_ENABLED:
+            logger.info(f"[{session_id}] Diagnostics writer: {diagnostics_writer.stats()}")
         logger.info(f"[{session_id}] Relay Terminated & Cleaned Up.")
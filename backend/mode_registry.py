@@ -0,0 +1,122 @@
+"""
+Mode Registry
+
+Every connection used to rebuild its mode's configuration from scratch: pick the
+instruction and tool list, wrap each tool function in a FunctionTool, and —
+once run_live started — introspect every function signature again to build the
+tool declarations sent to the model. None of that depends on the connection.
+
+This module does it once per mode at import time. Each `ModeTemplate` holds the
+instruction, tools whose declarations were built up front, and the shared
+RunConfig; at connect time `bind()` only attaches the per-connection model
+(which carries the user's BYOK key) to a fresh Agent and Runner.
+"""
+
+from dataclasses import dataclass
+
+from google.adk import Agent, Runner
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.sessions import BaseSessionService
+from google.adk.tools import FunctionTool
+from google.genai import types
+
+import tools_config  # type: ignore
+from gemini_beta import GeminiBeta  # type: ignore
+
+DEFAULT_MODE = "spatial"
+
+
+class PrecompiledTool(FunctionTool):
+    """FunctionTool whose declaration is built once instead of on every request."""
+
+    def __init__(self, func) -> None:
+        super().__init__(func)
+        self._declaration = super()._get_declaration()
+
+    def _get_declaration(self) -> types.FunctionDeclaration | None:
+        return self._declaration
+
+
+def live_run_config() -> RunConfig:
+    return RunConfig(
+        streaming_mode=StreamingMode.BIDI,
+        response_modalities=[types.Modality.AUDIO],
+        speech_config=types.SpeechConfig(
+            voice_config=types.VoiceConfig(
+                prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name="Puck")
+            )
+        ),
+        # Real-time grounding: Force model to consider ALL inputs for every turn
+        realtime_input_config=types.RealtimeInputConfig(
+            turn_coverage="TURN_INCLUDES_ALL_INPUT"
+        ),
+        # Context Management: Tighter window to prevent 'ghost' objects from minutes ago.
+        # Video is ~258 tokens/sec. 15k tokens = ~58 seconds of memory.
+        context_window_compression=types.ContextWindowCompressionConfig(
+            trigger_tokens=15000,
+            sliding_window=types.SlidingWindow(target_tokens=7500),
+        ),
+        input_audio_transcription=types.AudioTranscriptionConfig(),
+        output_audio_transcription=types.AudioTranscriptionConfig(),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class ModeTemplate:
+    """Everything about a mode that is the same for every connection."""
+
+    mode: str
+    app_name: str
+    agent_name: str
+    instruction: str
+    tools: tuple[PrecompiledTool, ...]
+    run_config: RunConfig
+
+    def bind(
+        self, model: str, api_key: str | None, session_service: BaseSessionService
+    ) -> tuple[Runner, RunConfig]:
+        """A Runner for one connection, plus its own (shallow) copy of the RunConfig."""
+        agent = Agent(
+            name=self.agent_name,
+            model=GeminiBeta(model=model, custom_api_key=api_key),
+            instruction=self.instruction,
+            tools=list(self.tools),
+        )
+        runner = Runner(app_name=self.app_name, agent=agent, session_service=session_service)
+        return runner, self.run_config.model_copy()
+
+
+def build_mode_template(mode: str, instruction: str, tools: list) -> ModeTemplate:
+    mode_clean = mode.replace("-", "_")
+    return ModeTemplate(
+        mode=mode,
+        app_name=f"SpatialEyeApp_{mode_clean}",
+        agent_name=f"SpatialEye_{mode_clean}",
+        instruction=instruction,
+        tools=tuple(PrecompiledTool(func) for func in tools),
+        run_config=live_run_config(),
+    )
+
+
+MODE_TEMPLATES: dict[str, ModeTemplate] = {
+    "storyteller": build_mode_template(
+        "storyteller",
+        tools_config.STORYTELLER_SYSTEM_INSTRUCTION,
+        tools_config.DIRECTOR_TOOLS,
+    ),
+    "it-architecture": build_mode_template(
+        "it-architecture",
+        tools_config.IT_ARCHITECTURE_SYSTEM_INSTRUCTION,
+        tools_config.IT_ARCHITECTURE_TOOLS,
+    ),
+    "spatial": build_mode_template(
+        "spatial",
+        tools_config.SPATIAL_SYSTEM_INSTRUCTION,
+        tools_config.SPATIAL_TOOLS,
+    ),
+}
+
+
+def get_mode_template(mode: str) -> ModeTemplate:
+    """The template for `mode`; unknown modes fall back to spatial."""
+    return MODE_TEMPLATES.get(mode, MODE_TEMPLATES[DEFAULT_MODE])
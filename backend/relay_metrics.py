@@ -0,0 +1,286 @@
+"""
+Relay Metrics
+
+Prometheus-style counters, gauges and histograms for the relay, served in the
+text exposition format by `GET /metrics`.
+
+Everything here is updated and rendered from the event-loop thread only (the
+/metrics endpoint is async for that reason), so an update is a plain attribute
+increment: no locks, no label formatting and no dict lookups in the hot loops.
+Each session resolves its labelled children once
+(`SessionMetrics`) and the upstream / downstream loops only call `inc()` /
+`observe()` on those. Labels are rendered when Prometheus scrapes.
+
+Exported series:
+
+  relay_active_sessions{mode}                     gauge
+  relay_upstream_messages_total{mode,kind}        audio / video / text messages received
+  relay_bytes_total{mode,direction}               WebSocket payload bytes in / out
+  relay_downstream_events_total{mode}             events sent to the client
+  relay_tool_calls_total{mode,tool}               function calls forwarded (names outside
+                                                  tools_config.py count as "other")
+  relay_duplicate_tool_calls_total{mode}          repeated call ids suppressed
+  relay_connect_seconds{mode}                     accept → relay running
+  relay_auth_seconds                              ID-token verification
+  relay_message_latency_seconds{direction}        time a message spends in the relay
+                                                  (upstream: received → queued,
+                                                  downstream: event → sent)
+  relay_turn_latency_seconds{mode,phase}          per-turn phases from turn_tracing.py
+  relay_glass_latency_seconds{mode,leg,kind}      media latency legs from clock_sync.py
+  relay_vad_audio_seconds_total{mode,decision}    upstream audio forwarded / suppressed
+                                                  by the voice gate (added at session end)
+  relay_model_audio_messages_total{mode}          audio blobs queued for the model after
+                                                  coalescing (added at session end)
+  relay_audio_ingest_bytes_total{mode,format,stage}
+                                                  compressed / resampled upstream audio,
+                                                  as received (wire) and decoded (pcm)
+  relay_audio_decode_seconds_total{mode,format}   decode + resample CPU time
+  relay_downstream_send_seconds{mode,class}       queued → written to the client, per
+                                                  scheduler class (downstream_scheduler.py)
+  relay_downstream_dropped_total{mode,class}      audio dropped on interruption, transcripts
+                                                  and unawaited control messages dropped
+                                                  on overflow
+  relay_client_pool_size                          pooled genai Clients (client_pool.py)
+  relay_client_pool_lookups_total{result}         pool lookups: hit / miss
+  relay_client_pool_evictions_total               clients evicted (LRU or idle TTL)
+
+The client pool keeps its own counters (it is used from worker threads too), so
+its series are copied in by `set_client_pool()` right before each scrape.
+"""
+
+from bisect import bisect_left
+from collections.abc import Iterator
+
+from tools_config import DIRECTOR_TOOLS, IT_ARCHITECTURE_TOOLS, SPATIAL_TOOLS  # type: ignore
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SETUP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TURN_BUCKETS = (0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0)
+GLASS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+
+# Tool names come from the model, so only registered ones become label values.
+TOOL_NAMES = frozenset(tool.__name__ for tool in (*SPATIAL_TOOLS, *DIRECTOR_TOOLS, *IT_ARCHITECTURE_TOOLS))
+OTHER_TOOL = "other"
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Gauge(Counter):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricFamily:
+    """One metric name and its children, one per label-value tuple."""
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._children: dict[tuple[str, ...], Counter | Histogram] = {}
+
+    def labels(self, *values: str) -> Counter | Gauge | Histogram:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            if self.kind == "histogram":
+                child = Histogram(self.buckets)
+            else:
+                child = Gauge() if self.kind == "gauge" else Counter()
+            self._children[values] = child
+        return child
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in sorted(self._children.items()):
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values, strict=True)]
+            if isinstance(child, Histogram):
+                cumulative = 0
+                for bound, count in zip((*child.buckets, "+Inf"), child.counts, strict=True):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    yield f"{self.name}_bucket{{{','.join([*labels, le])}}} {cumulative}"
+                suffix = f"{{{','.join(labels)}}}" if labels else ""
+                yield f"{self.name}_sum{suffix} {child.sum}"
+                yield f"{self.name}_count{suffix} {child.count}"
+            else:
+                suffix = f"{{{','.join(labels)}}}" if labels else ""
+                yield f"{self.name}{suffix} {child.value}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+ACTIVE_SESSIONS = MetricFamily("relay_active_sessions", "gauge", "Open relay sessions.", ("mode",))
+UPSTREAM_MESSAGES = MetricFamily(
+    "relay_upstream_messages_total", "counter", "Client messages received.", ("mode", "kind")
+)
+BYTES = MetricFamily("relay_bytes_total", "counter", "WebSocket payload bytes.", ("mode", "direction"))
+DOWNSTREAM_EVENTS = MetricFamily("relay_downstream_events_total", "counter", "Events sent to the client.", ("mode",))
+TOOL_CALLS = MetricFamily("relay_tool_calls_total", "counter", "Function calls forwarded.", ("mode", "tool"))
+DUPLICATE_TOOL_CALLS = MetricFamily(
+    "relay_duplicate_tool_calls_total", "counter", "Repeated tool calls suppressed.", ("mode",)
+)
+CONNECT_SECONDS = MetricFamily(
+    "relay_connect_seconds", "histogram", "WebSocket accept to relay running.", ("mode",), SETUP_BUCKETS
+)
+AUTH_SECONDS = MetricFamily("relay_auth_seconds", "histogram", "ID-token verification time.", (), SETUP_BUCKETS)
+MESSAGE_LATENCY = MetricFamily(
+    "relay_message_latency_seconds", "histogram", "Time a message spends inside the relay.", ("direction",)
+)
+TURN_LATENCY = MetricFamily(
+    "relay_turn_latency_seconds", "histogram", "Per-turn latency phases.", ("mode", "phase"), TURN_BUCKETS
+)
+GLASS_LATENCY = MetricFamily(
+    "relay_glass_latency_seconds",
+    "histogram",
+    "Media latency by leg: capture to relay, relay to model, model to client.",
+    ("mode", "leg", "kind"),
+    GLASS_BUCKETS,
+)
+VAD_AUDIO = MetricFamily(
+    "relay_vad_audio_seconds_total", "counter", "Upstream audio seen by the voice gate.", ("mode", "decision")
+)
+
+MODEL_AUDIO_MESSAGES = MetricFamily(
+    "relay_model_audio_messages_total", "counter", "Audio blobs queued for the model.", ("mode",)
+)
+
+AUDIO_INGEST_BYTES = MetricFamily(
+    "relay_audio_ingest_bytes_total",
+    "counter",
+    "Upstream audio decoded by the relay, by stage.",
+    ("mode", "format", "stage"),
+)
+AUDIO_DECODE_SECONDS = MetricFamily(
+    "relay_audio_decode_seconds_total", "counter", "CPU time spent decoding upstream audio.", ("mode", "format")
+)
+
+DOWNSTREAM_SEND = MetricFamily(
+    "relay_downstream_send_seconds",
+    "histogram",
+    "Time from queueing a downstream message to writing it.",
+    ("mode", "class"),
+    LATENCY_BUCKETS,
+)
+DOWNSTREAM_DROPPED = MetricFamily(
+    "relay_downstream_dropped_total", "counter", "Downstream messages dropped by the scheduler.", ("mode", "class")
+)
+
+CLIENT_POOL_SIZE = MetricFamily("relay_client_pool_size", "gauge", "Pooled genai Clients.", ())
+CLIENT_POOL_LOOKUPS = MetricFamily(
+    "relay_client_pool_lookups_total", "counter", "genai Client pool lookups.", ("result",)
+)
+CLIENT_POOL_EVICTIONS = MetricFamily(
+    "relay_client_pool_evictions_total", "counter", "genai Clients evicted from the pool.", ()
+)
+
+REGISTRY: tuple[MetricFamily, ...] = (
+    ACTIVE_SESSIONS,
+    UPSTREAM_MESSAGES,
+    BYTES,
+    DOWNSTREAM_EVENTS,
+    TOOL_CALLS,
+    DUPLICATE_TOOL_CALLS,
+    CONNECT_SECONDS,
+    AUTH_SECONDS,
+    MESSAGE_LATENCY,
+    TURN_LATENCY,
+    GLASS_LATENCY,
+    VAD_AUDIO,
+    MODEL_AUDIO_MESSAGES,
+    AUDIO_INGEST_BYTES,
+    AUDIO_DECODE_SECONDS,
+    DOWNSTREAM_SEND,
+    DOWNSTREAM_DROPPED,
+    CLIENT_POOL_SIZE,
+    CLIENT_POOL_LOOKUPS,
+    CLIENT_POOL_EVICTIONS,
+)
+
+
+class SessionMetrics:
+    """One session's pre-resolved metric children."""
+
+    __slots__ = (
+        "mode",
+        "active",
+        "audio_in",
+        "video_in",
+        "text_in",
+        "bytes_in",
+        "bytes_out",
+        "events_out",
+        "duplicate_calls",
+        "connect",
+        "upstream_latency",
+        "downstream_latency",
+    )
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.active = ACTIVE_SESSIONS.labels(mode)
+        self.audio_in = UPSTREAM_MESSAGES.labels(mode, "audio")
+        self.video_in = UPSTREAM_MESSAGES.labels(mode, "video")
+        self.text_in = UPSTREAM_MESSAGES.labels(mode, "text")
+        self.bytes_in = BYTES.labels(mode, "in")
+        self.bytes_out = BYTES.labels(mode, "out")
+        self.events_out = DOWNSTREAM_EVENTS.labels(mode)
+        self.duplicate_calls = DUPLICATE_TOOL_CALLS.labels(mode)
+        self.connect = CONNECT_SECONDS.labels(mode)
+        self.upstream_latency = MESSAGE_LATENCY.labels("upstream")
+        self.downstream_latency = MESSAGE_LATENCY.labels("downstream")
+
+    def tool_call(self, name: str) -> None:
+        TOOL_CALLS.labels(self.mode, name if name in TOOL_NAMES else OTHER_TOOL).inc()
+
+
+def set_client_pool(stats: dict[str, int]) -> None:
+    """Copy a `ClientPool.stats()` snapshot into its series."""
+    CLIENT_POOL_SIZE.labels().value = stats["size"]
+    CLIENT_POOL_LOOKUPS.labels("hit").value = stats["hits"]
+    CLIENT_POOL_LOOKUPS.labels("miss").value = stats["misses"]
+    CLIENT_POOL_EVICTIONS.labels().value = stats["evictions"]
+
+
+def render_metrics() -> str:
+    return "\n".join(line for family in REGISTRY for line in family.render()) + "\n"
@@ -0,0 +1,141 @@
+"""
+Session Replay
+
+Feeds a recording made by session_recording.py back into a running relay over
+a real WebSocket, with the query parameters of the original session (mode,
+protocol, audio_out, clock_sync, audio_codec; see SESSION_PARAMS). Upstream messages are sent on their recorded schedule
+divided by --speed (1 = real time, 10 = ten times faster, 0 = as fast as the
+socket allows); downstream messages are counted and compared with what the
+relay sent in the recorded session.
+
+Prints (and optionally writes) a JSON result with the send schedule lag, the
+time to the first downstream message, and recorded vs replayed downstream
+counts, so the same recording can serve as a latency / throughput regression.
+
+Usage (from backend/):
+  uv run python replay_session.py recordings/<session>.seyerec --token <Firebase ID token>
+      [--url ws://localhost:8000/ws/live] [--api-key KEY] [--speed 4] [--drain 5] [--output result.json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+import websockets
+
+from session_recording import BINARY, DOWN, TEXT, UP, Recording  # type: ignore
+
+# Query parameters that change how the relay treats a session, with the relay's defaults
+# (a recording made before a parameter existed ran with its default).
+SESSION_PARAMS: dict[str, Any] = {
+    "mode": "spatial",
+    "protocol": 0,
+    "audio_out": "json",
+    "clock_sync": 0,
+    "audio_codec": "pcm",
+}
+
+
+def session_params(metadata: dict[str, Any]) -> dict[str, Any]:
+    """The recorded session's query parameters, for connecting the replay the same way."""
+    return {key: metadata.get(key, default) for key, default in SESSION_PARAMS.items()}
+
+
+def downstream_counts(recording: Recording) -> dict[str, int]:
+    counts = {"text": 0, "binary": 0, "bytes": 0}
+    for msg in recording:
+        if msg.direction == DOWN:
+            counts["text" if msg.kind == TEXT else "binary"] += 1
+            counts["bytes"] += len(msg.payload)
+    return counts
+
+
+async def replay(
+    recording: Recording,
+    url: str,
+    token: str,
+    api_key: str | None = None,
+    speed: float = 1.0,
+    drain_seconds: float = 5.0,
+) -> dict:
+    params = {**session_params(recording.metadata), "token": token}
+    if api_key:
+        params["api_key"] = api_key
+
+    received = {"text": 0, "binary": 0, "bytes": 0}
+    first_downstream: float | None = None
+    max_lag = 0.0
+    sent = 0
+
+    async with websockets.connect(f"{url}?{urlencode(params)}", max_size=None) as ws:
+        started = time.perf_counter()
+
+        async def receive() -> None:
+            nonlocal first_downstream
+            async for message in ws:
+                if first_downstream is None:
+                    first_downstream = time.perf_counter() - started
+                received["binary" if isinstance(message, bytes) else "text"] += 1
+                received["bytes"] += len(message)
+
+        receiver = asyncio.create_task(receive())
+        for msg in recording:
+            if msg.direction != UP:
+                continue
+            if speed > 0:
+                due = started + msg.timestamp / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+            await ws.send(msg.payload if msg.kind == BINARY else msg.as_text())
+            sent += 1
+        send_seconds = time.perf_counter() - started
+
+        try:
+            await asyncio.wait_for(asyncio.shield(receiver), timeout=drain_seconds)
+        except TimeoutError:
+            pass
+        receiver.cancel()
+
+    return {
+        "recording": recording.path.name,
+        "mode": params["mode"],
+        "session_params": session_params(recording.metadata),
+        "speed": speed,
+        "upstream_sent": sent,
+        "send_seconds": round(send_seconds, 3),
+        "max_schedule_lag_ms": round(max_lag * 1000, 2),
+        "first_downstream_ms": round(first_downstream * 1000, 2) if first_downstream is not None else None,
+        "downstream_replayed": received,
+        "downstream_recorded": downstream_counts(recording),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--url", default="ws://localhost:8000/ws/live")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--drain", type=float, default=5.0, help="seconds to keep reading after the last send")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    with Recording(args.recording) as recording:
+        result = await replay(recording, args.url, args.token, args.api_key, args.speed, args.drain)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
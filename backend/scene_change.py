@@ -0,0 +1,100 @@
+"""
+Scene-Change Detection
+
+With a static camera most frames are near-identical, yet each forwarded frame
+still costs tokens and bandwidth. This detector decodes a tiny grayscale
+thumbnail of each JPEG (using the decoder's DCT downscaling, so only ~1/64 of the
+pixels are reconstructed) and compares it with the thumbnail of the last frame
+that was forwarded. Frames where too few pixels changed are suppressed.
+
+The filter is opt-in (SCENE_CHANGE_FILTER=true): it changes which frames the
+model sees, so sessions keep the rate-governed stream unless it is enabled.
+
+Decoding runs in a small shared thread pool (Pillow releases the GIL), so the
+event loop only waits on a future.
+"""
+
+import asyncio
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+SCENE_CHANGE_FILTER = os.getenv("SCENE_CHANGE_FILTER", "false").lower() == "true"
+# Fraction of thumbnail pixels that must change for a frame to count as new.
+SCENE_CHANGE_THRESHOLD = float(os.getenv("SCENE_CHANGE_THRESHOLD", "0.02"))
+# Per-pixel luminance delta (0-1) below which a pixel is treated as sensor noise.
+SCENE_PIXEL_TOLERANCE = float(os.getenv("SCENE_PIXEL_TOLERANCE", "0.08"))
+SCENE_WORKERS = int(os.getenv("SCENE_WORKERS", "2"))
+
+THUMBNAIL_SIZE = (32, 24)
+
+_executor = ThreadPoolExecutor(max_workers=SCENE_WORKERS, thread_name_prefix="scene-change")
+
+
+def thumbnail(image_bytes: bytes) -> np.ndarray | None:
+    """Decode a small float32 luminance thumbnail, or None if the image is unreadable."""
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        img.draft("L", (THUMBNAIL_SIZE[0] * 2, THUMBNAIL_SIZE[1] * 2))
+        img = img.convert("L").resize(THUMBNAIL_SIZE, Image.Resampling.BILINEAR)
+    except Exception:
+        return None
+    return np.asarray(img, dtype=np.float32) * (1.0 / 255.0)
+
+
+def image_size(image_bytes: bytes) -> tuple[int, int]:
+    """(width, height) read from the image header without decoding pixels; (0, 0) if unreadable."""
+    try:
+        return Image.open(io.BytesIO(image_bytes)).size
+    except Exception:
+        return 0, 0
+
+
+def change_score(reference: np.ndarray, current: np.ndarray) -> float:
+    """Fraction of pixels whose luminance moved by more than the noise tolerance."""
+    return float(np.count_nonzero(np.abs(current - reference) > SCENE_PIXEL_TOLERANCE)) / current.size
+
+
+class SceneChangeDetector:
+    """Per-session near-duplicate frame filter."""
+
+    def __init__(self, threshold: float = SCENE_CHANGE_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._reference: np.ndarray | None = None
+
+        self.checked = 0
+        self.suppressed = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    async def is_new_scene(self, image_bytes: bytes, force: bool = False) -> bool:
+        """True if the frame should be forwarded. `force` always forwards it."""
+        started = time.perf_counter()
+        thumb = await asyncio.get_running_loop().run_in_executor(_executor, thumbnail, image_bytes)
+        elapsed = time.perf_counter() - started
+
+        self.checked += 1
+        self._latency_total += elapsed
+        self._latency_max = max(self._latency_max, elapsed)
+
+        if thumb is None:
+            return True
+        if force or self._reference is None or change_score(self._reference, thumb) >= self.threshold:
+            self._reference = thumb
+            return True
+
+        self.suppressed += 1
+        return False
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "checked": self.checked,
+            "suppressed": self.suppressed,
+            "suppression_ratio": round(self.suppressed / self.checked, 3) if self.checked else 0.0,
+            "avg_latency_ms": round(self._latency_total / self.checked * 1000, 2) if self.checked else 0.0,
+            "max_latency_ms": round(self._latency_max * 1000, 2),
+        }
@@ -0,0 +1,225 @@
+"""
+Session Recording
+
+Opt-in recorder for everything a relay session exchanges with its client, so a
+production session can be replayed against the relay later (see
+replay_session.py). Enable with SESSION_RECORDING=true; files go to
+RECORDING_DIR (default backend/recordings/<session_id>.seyerec).
+
+The format is append-only and meant to be memory-mapped:
+
+  file header   MAGIC, uint32 metadata length, metadata JSON
+                (session id, wall-clock start and the session's query
+                parameters: mode, protocol, audio_out, clock_sync, audio_codec)
+  records       "<dBBHI" header: seconds since session start (monotonic),
+                direction (UP/DOWN), kind (TEXT/BINARY), reserved, payload
+                length; then the payload exactly as sent on the WebSocket
+
+Upstream records are the client's raw messages (audio, video and text, in
+whatever protocol the client spoke), downstream records are what the relay
+sent back. Credentials are never written. A session stops recording once its
+file reaches RECORDING_MAX_MB. A truncated tail (crash mid-write) is ignored by
+the reader.
+
+Recording never touches the disk on the event loop: records are packed into a
+per-session batch in memory, and every RECORDING_FLUSH_KB (and on close) the
+batch is handed to one shared writer thread, which also creates the file. If
+the disk falls more than RECORDING_BACKLOG_MB behind, the session stops
+recording rather than buffering without bound.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+SESSION_RECORDING = os.getenv("SESSION_RECORDING", "false").lower() == "true"
+RECORDING_DIR = Path(os.getenv("RECORDING_DIR", str(Path(__file__).resolve().parent / "recordings")))
+RECORDING_MAX_MB = float(os.getenv("RECORDING_MAX_MB", "200"))
+RECORDING_FLUSH_KB = float(os.getenv("RECORDING_FLUSH_KB", "256"))
+RECORDING_BACKLOG_MB = float(os.getenv("RECORDING_BACKLOG_MB", "32"))
+
+MAGIC = b"SEYEREC\x01"
+FILE_HEADER = struct.Struct("<8sI")
+RECORD_HEADER = struct.Struct("<dBBHI")
+
+UP = 0
+DOWN = 1
+TEXT = 1
+BINARY = 2
+
+# One thread for all sessions: batches for a file are written in submission order.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-recording")
+
+
+@dataclass(slots=True, frozen=True)
+class RecordedMessage:
+    timestamp: float
+    direction: int
+    kind: int
+    payload: bytes
+
+    def as_text(self) -> str:
+        return self.payload.decode("utf-8")
+
+
+class SessionRecorder:
+    """Appends one session's WebSocket traffic to a recording file (no-op unless enabled)."""
+
+    def __init__(
+        self,
+        session_id: str,
+        metadata: dict[str, Any],
+        enabled: bool = SESSION_RECORDING,
+        directory: Path = RECORDING_DIR,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.enabled = enabled
+        self.session_id = session_id
+        self._clock = clock
+        self._started = clock()
+        self._max_bytes = int(RECORDING_MAX_MB * 1024 * 1024)
+        self._flush_bytes = int(RECORDING_FLUSH_KB * 1024)
+        self._backlog_max = int(RECORDING_BACKLOG_MB * 1024 * 1024)
+        self._recording = False
+        self._batch: list[bytes] = []
+        self._batch_bytes = 0
+        # Bytes handed to the writer thread and not written yet
+        self._backlog = 0
+        self._backlog_lock = threading.Lock()
+        self._file = None
+        self._done: Future | None = None
+        self.bytes_written = 0
+        self.records = 0
+
+        if not enabled:
+            return
+        self.path = directory / f"{session_id}.seyerec"
+        meta = json.dumps(
+            {"version": 1, "session_id": session_id, "started_at": time.time(), **metadata}
+        ).encode()
+        self._recording = True
+        self._append(FILE_HEADER.pack(MAGIC, len(meta)) + meta)
+        logger.info(f"[{session_id}] Recording session → {self.path}")
+
+    def record(self, direction: int, kind: int, payload: bytes | str) -> None:
+        if not self._recording:
+            return
+        data = payload.encode("utf-8") if isinstance(payload, str) else payload
+        if self.bytes_written + len(data) > self._max_bytes:
+            logger.warning(f"[{self.session_id}] Recording reached {RECORDING_MAX_MB} MB, stopping.")
+            self.close()
+            return
+        self._append(RECORD_HEADER.pack(self._clock() - self._started, direction, kind, 0, len(data)))
+        self._append(data)
+        self.bytes_written += RECORD_HEADER.size + len(data)
+        self.records += 1
+        if self._batch_bytes >= self._flush_bytes:
+            self._flush()
+
+    def record_upstream(self, msg: dict[str, Any]) -> None:
+        """Record a raw ASGI websocket.receive message from the client."""
+        if not self._recording:
+            return
+        if msg.get("bytes") is not None:
+            self.record(UP, BINARY, msg["bytes"])
+        elif msg.get("text") is not None:
+            self.record(UP, TEXT, msg["text"])
+
+    def close(self, wait: bool = False) -> None:
+        """Stop recording; the file is completed on the writer thread (`wait` blocks until it is)."""
+        if self._recording:
+            self._recording = False
+            self._flush()
+            self._done = _writer.submit(self._close_file)
+        if wait and self._done is not None:
+            self._done.result()
+
+    # -- batching ------------------------------------------------------------
+
+    def _append(self, data: bytes) -> None:
+        self._batch.append(data)
+        self._batch_bytes += len(data)
+
+    def _flush(self) -> None:
+        if not self._batch:
+            return
+        batch, size = self._batch, self._batch_bytes
+        self._batch, self._batch_bytes = [], 0
+        with self._backlog_lock:
+            if self._backlog + size > self._backlog_max:
+                backlog = self._backlog
+            else:
+                backlog = None
+                self._backlog += size
+        if backlog is not None:
+            logger.warning(f"[{self.session_id}] Recording {backlog / 1e6:.1f} MB behind the disk, stopping.")
+            self._recording = False
+            self._done = _writer.submit(self._close_file)
+            return
+        _writer.submit(self._write, batch, size)
+
+    # -- writer thread ---------------------------------------------------------
+
+    def _write(self, batch: list[bytes], size: int) -> None:
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("wb", buffering=1024 * 1024)
+            self._file.writelines(batch)
+        except Exception as e:
+            logger.error(f"[{self.session_id}] Recording write failed: {e}")
+            self._recording = False
+        finally:
+            with self._backlog_lock:
+                self._backlog -= size
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Recording:
+    """Memory-mapped reader for a .seyerec file."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_len = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a session recording")
+        self._records_start = FILE_HEADER.size + meta_len
+        self.metadata: dict[str, Any] = json.loads(self._map[FILE_HEADER.size : self._records_start])
+
+    def __iter__(self) -> Iterator[RecordedMessage]:
+        offset = self._records_start
+        end = len(self._map)
+        while offset + RECORD_HEADER.size <= end:
+            timestamp, direction, kind, _, length = RECORD_HEADER.unpack_from(self._map, offset)
+            start = offset + RECORD_HEADER.size
+            if start + length > end:
+                break
+            yield RecordedMessage(timestamp, direction, kind, self._map[start : start + length])
+            offset = start + length
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "Recording":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
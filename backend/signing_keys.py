@@ -0,0 +1,154 @@
+"""
+Signing-Key Cache
+
+Firebase ID tokens are RS256 JWTs signed with one of Google's rotating keys,
+published as X.509 certificates keyed by `kid`. This cache keeps the current set
+in memory so token verification never touches the network on the hot path:
+
+  - a daemon thread refetches the set ahead of the Cache-Control max-age
+    (at 1 - SIGNING_KEYS_REFRESH_AHEAD of it) and retries on failure
+  - an unknown `kid` (a rotation the refresher has not seen yet) triggers one
+    blocking fetch, at most every SIGNING_KEYS_MIN_FETCH_INTERVAL seconds so
+    forged key ids cannot turn into a fetch storm
+  - when a refresh fails, the previous keys stay in use
+
+SIGNING_KEYS_URL can point at a local stand-in server (see
+benchmarks/bench_auth_latency.py).
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import urllib.request
+from collections.abc import Callable
+
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+from cryptography.x509 import load_pem_x509_certificate
+from loguru import logger
+
+GOOGLE_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+SIGNING_KEYS_URL = os.getenv("SIGNING_KEYS_URL", GOOGLE_CERTS_URL)
+# Refresh once this fraction of max-age is left on the cached set.
+SIGNING_KEYS_REFRESH_AHEAD = float(os.getenv("SIGNING_KEYS_REFRESH_AHEAD", "0.2"))
+SIGNING_KEYS_MIN_FETCH_INTERVAL = float(os.getenv("SIGNING_KEYS_MIN_FETCH_INTERVAL", "30"))
+SIGNING_KEYS_FETCH_TIMEOUT = float(os.getenv("SIGNING_KEYS_FETCH_TIMEOUT", "5"))
+
+DEFAULT_MAX_AGE = 3600.0
+RETRY_SECONDS = 30.0
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def max_age(cache_control: str | None) -> float:
+    match = _MAX_AGE_RE.search(cache_control or "")
+    return float(match.group(1)) if match else DEFAULT_MAX_AGE
+
+
+def parse_certificates(body: bytes) -> dict[str, RSAPublicKey]:
+    """`{kid: PEM certificate}` JSON into `{kid: public key}`."""
+    return {
+        kid: load_pem_x509_certificate(pem.encode()).public_key()
+        for kid, pem in json.loads(body).items()
+    }
+
+
+class SigningKeyCache:
+    """In-memory, background-refreshed set of token signing keys."""
+
+    def __init__(
+        self,
+        url: str = SIGNING_KEYS_URL,
+        clock: Callable[[], float] = time.monotonic,
+        min_fetch_interval: float = SIGNING_KEYS_MIN_FETCH_INTERVAL,
+    ) -> None:
+        self.url = url
+        self._clock = clock
+        self._min_fetch_interval = min_fetch_interval
+        self._keys: dict[str, RSAPublicKey] = {}
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._last_fetch = -math.inf
+        self._fetch_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.blocking_fetches = 0
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background refresher (idempotent)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="signing-keys", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    # -- lookups ---------------------------------------------------------------
+
+    def get_key(self, kid: str) -> RSAPublicKey | None:
+        """The public key for `kid`, fetching synchronously only if it is unknown."""
+        key = self._keys.get(kid)
+        if key is not None and self._clock() < self._expires_at:
+            return key
+
+        # Unknown kid, or the background refresher has fallen behind.
+        self.blocking_fetches += 1
+        self.refresh()
+        return self._keys.get(kid, key)
+
+    def refresh(self) -> bool:
+        """Fetch the key set now. Returns False if the fetch failed or was rate-limited."""
+        with self._fetch_lock:
+            if self._clock() - self._last_fetch < self._min_fetch_interval:
+                return False
+            self._last_fetch = self._clock()
+            try:
+                request = urllib.request.Request(self.url, headers={"Accept": "application/json"})
+                with urllib.request.urlopen(request, timeout=SIGNING_KEYS_FETCH_TIMEOUT) as response:
+                    keys = parse_certificates(response.read())
+                    age = max_age(response.headers.get("Cache-Control"))
+            except Exception as e:
+                self.fetch_errors += 1
+                logger.warning(f"Signing key refresh failed ({self.url}): {e}")
+                return False
+
+            fetched_at = self._clock()
+            self._keys = keys
+            self._expires_at = fetched_at + age
+            self._refresh_at = fetched_at + age * (1 - SIGNING_KEYS_REFRESH_AHEAD)
+            self.fetches += 1
+            logger.debug(f"Signing keys refreshed: {len(keys)} keys, max-age {age:.0f}s")
+            return True
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "keys": len(self._keys),
+            "ttl_seconds": round(max(0.0, self._expires_at - self._clock()), 1),
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "blocking_fetches": self.blocking_fetches,
+        }
+
+    # -- background refresher --------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            delay = self._refresh_at - self._clock()
+            if delay > 0 and self._stop.wait(delay):
+                return
+            if not self.refresh() and self._clock() >= self._refresh_at:
+                self._stop.wait(RETRY_SECONDS)
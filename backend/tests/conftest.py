@@ -0,0 +1,16 @@
+import pytest
+
+
+class FakeClock:
+    """A monotonic clock the test moves by hand (`clock.now = ...`)."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
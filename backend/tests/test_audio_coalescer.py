@@ -0,0 +1,42 @@
+import asyncio
+
+from google.adk.agents.live_request_queue import LiveRequest
+
+from audio_coalescer import AudioCoalescer
+from ingest_queue import IngestQueue
+
+PCM = "audio/pcm;rate=16000"
+
+
+async def drain(queue: IngestQueue, n: int) -> list[LiveRequest]:
+    return [await queue.get() for _ in range(n)]
+
+
+def test_small_chunks_merge_until_target():
+    async def run() -> tuple[list[int], AudioCoalescer]:
+        queue = IngestQueue()
+        coalescer = AudioCoalescer(queue, target_ms=60)
+        for i in range(6):
+            await coalescer.put(PCM, bytes(640), float(i))  # 20 ms each
+        reqs = await drain(queue, 2)
+        coalescer.close()
+        return [len(req.blob.data) for req in reqs], coalescer
+
+    sizes, coalescer = asyncio.run(run())
+    assert sizes == [1920, 1920]
+    assert coalescer.stats()["merge_ratio"] == 3.0
+
+
+def test_passthrough_chunk_flushes_pending_pcm_first():
+    async def run() -> tuple[list[str], AudioCoalescer]:
+        queue = IngestQueue()
+        coalescer = AudioCoalescer(queue, target_ms=60)
+        await coalescer.put(PCM, bytes(640), 0.0)
+        await coalescer.put("audio/ogg;codecs=opus", b"opus", 1.0)
+        reqs = await drain(queue, 2)
+        coalescer.close()
+        return [req.blob.mime_type for req in reqs], coalescer
+
+    order, coalescer = asyncio.run(run())
+    assert order == [PCM, "audio/ogg;codecs=opus"]
+    assert coalescer.flushes["mime"] == 1
@@ -0,0 +1,45 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import audio_ingest
+from audio_ingest import INGEST_MAX_DECODERS, TARGET_MIME, AudioIngest
+
+CHUNK = np.zeros(2048, dtype="<i2").tobytes()  # 4 KB
+
+
+def decode(ingest: AudioIngest, mime_type: str, data: bytes = CHUNK):
+    return asyncio.run(ingest.decode(mime_type, data))
+
+
+@pytest.mark.parametrize("mime_type", ["audio/pcm;rate=2", "audio/pcm;rate=0", "audio/pcmu;rate=1000000"])
+def test_out_of_range_rates_are_dropped(mime_type):
+    ingest = AudioIngest()
+    assert decode(ingest, mime_type) is None
+    assert ingest.dropped == 1
+
+
+def test_supported_rate_is_resampled_to_16k():
+    mime_type, pcm = decode(AudioIngest(), "audio/pcm;rate=48000", np.zeros(4800, dtype="<i2").tobytes())
+    assert mime_type == TARGET_MIME
+    assert abs(len(pcm) // 2 - 1600) <= 1
+
+
+def test_decoder_cache_is_bounded():
+    ingest = AudioIngest()
+    for i in range(50):
+        decode(ingest, f"audio/pcm;rate=48000;x={i}")
+    assert len(ingest._decoders) == INGEST_MAX_DECODERS
+
+
+def test_decoder_crash_drops_the_chunk_only(monkeypatch):
+    class Broken:
+        def decode(self, data: bytes) -> bytes:
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(audio_ingest, "create_decoder", lambda mime_type: Broken())
+    ingest = AudioIngest()
+    assert decode(ingest, "audio/pcm;rate=48000") is None
+    assert decode(ingest, "audio/pcm;rate=48000") is None
+    assert ingest.dropped == 2
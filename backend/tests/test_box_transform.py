@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from benchmarks.bench_box_transform import legacy_boxes, random_batch
+from box_transform import (
+    letterbox_padding,
+    normalized_to_padded,
+    normalized_to_pixel,
+    padded_to_normalized,
+    padded_to_pixel,
+    pixel_to_normalized,
+)
+
+SEEDS = range(5)
+
+
+@pytest.fixture(params=SEEDS)
+def batch(request) -> tuple[np.random.Generator, np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(request.param)
+    return (rng, *random_batch(rng, 5000))
+
+
+def test_pixel_round_trip_stays_inside_frame(batch):
+    _, boxes, w, h = batch
+    pixels = normalized_to_pixel(boxes, w, h)
+
+    np.testing.assert_allclose(pixel_to_normalized(pixels, w, h), boxes, atol=1e-9)
+    assert np.all(pixels[:, 0] <= pixels[:, 2]) and np.all(pixels[:, 1] <= pixels[:, 3])
+    assert np.all(pixels >= 0)
+    assert np.all(pixels[:, [0, 2]] <= w[:, None] + 1e-9) and np.all(pixels[:, [1, 3]] <= h[:, None] + 1e-9)
+
+
+def test_padded_round_trip_stays_inside_letterbox(batch):
+    _, boxes, w, h = batch
+    padded = normalized_to_padded(boxes, w, h)
+    pad_y, pad_x = letterbox_padding(w, h)
+
+    np.testing.assert_allclose(padded_to_normalized(padded, w, h), boxes, atol=1e-9)
+    assert np.all(padded[:, [0, 2]] >= pad_y[:, None] - 1e-9)
+    assert np.all(padded[:, [0, 2]] <= 1000 - pad_y[:, None] + 1e-9)
+    assert np.all(padded[:, [1, 3]] >= pad_x[:, None] - 1e-9)
+    assert np.all((pad_y == 0) | (pad_x == 0))
+
+    square = w == h
+    np.testing.assert_allclose(padded[square], boxes[square], atol=1e-9)
+
+
+def test_unpadding_clamps_letterbox_bars_into_frame(batch):
+    # Any padded input, even inside the letterbox bars, lands inside the frame.
+    _, boxes, w, h = batch
+    unpadded = padded_to_pixel(boxes, w, h)
+
+    assert np.all(unpadded >= 0)
+    assert np.all(unpadded[:, [0, 2]] <= w[:, None] + 1e-9) and np.all(unpadded[:, [1, 3]] <= h[:, None] + 1e-9)
+
+
+def test_batch_matches_single_boxes_and_legacy_math(batch):
+    rng, boxes, w, h = batch
+    pixels = normalized_to_pixel(boxes, w, h)
+    unpadded = padded_to_pixel(boxes, w, h)
+
+    for i in rng.integers(0, len(boxes), size=50):
+        np.testing.assert_allclose(normalized_to_pixel(boxes[i], w[i], h[i]), pixels[i])
+        np.testing.assert_allclose(padded_to_pixel(boxes[i], w[i], h[i]), unpadded[i])
+        # Legacy math has no upper clamp, so compare on boxes that stay inside the padded region.
+        legacy_direct, legacy_unpad = legacy_boxes(boxes[i], w[i], h[i])
+        np.testing.assert_allclose(pixels[i], legacy_direct, atol=1e-9)
+        inside = normalized_to_padded(padded_to_normalized(boxes[i], w[i], h[i]), w[i], h[i])
+        if np.allclose(inside, boxes[i]):
+            np.testing.assert_allclose(unpadded[i], legacy_unpad, atol=1e-6)
+
+
+@pytest.mark.parametrize(("width", "height"), [(1920, 1080), (1080, 1920), (640, 640)])
+def test_rotation_swaps_letterbox_axis(width, height):
+    pad_y, pad_x = letterbox_padding(width, height)
+    rot_y, rot_x = letterbox_padding(height, width)
+
+    np.testing.assert_allclose([pad_y, pad_x], [rot_x, rot_y])
+    if width > height:
+        assert pad_y > 0 and pad_x == 0
+    elif width < height:
+        assert pad_x > 0 and pad_y == 0
+    else:
+        assert pad_y == pad_x == 0
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from downstream_scheduler import AUDIO, CONTROL, TRANSCRIPT, DownstreamScheduler
+
+
+class Socket:
+    def __init__(self) -> None:
+        self.written: list[str | bytes] = []
+
+    async def write(self, data: str | bytes) -> None:
+        self.written.append(data)
+
+
+def test_interrupt_keeps_transcript_and_turn_complete_riding_on_audio():
+    async def run() -> list[str | bytes]:
+        socket = Socket()
+        scheduler = DownstreamScheduler(socket.write, "test", lead_ms=0)
+        await scheduler.put(AUDIO, [b"frame-1"], 0.5)
+        await scheduler.put(AUDIO, [b"frame-2", json.dumps({"outputTranscription": {"text": "hi"}})], 0.5)
+        transcript = json.dumps({"outputTranscription": {"text": "there"}})
+        await scheduler.put(AUDIO, [b"frame-3", transcript], 0.5, keep=[transcript])
+        done = json.dumps({"turnComplete": True})
+        await scheduler.put(AUDIO, [b"frame-4", done], 0.5, keep=[done])
+        scheduler.interrupt()
+        writer = asyncio.create_task(scheduler.run())
+        await scheduler.drain()
+        writer.cancel()
+        assert scheduler.dropped[AUDIO] == 2
+        return socket.written
+
+    assert asyncio.run(run()) == [
+        json.dumps({"outputTranscription": {"text": "there"}}),
+        json.dumps({"turnComplete": True}),
+    ]
+
+
+def test_audio_put_waits_for_the_writer_when_lane_is_full():
+    async def run() -> tuple[bool, bool, DownstreamScheduler]:
+        socket = Socket()
+        scheduler = DownstreamScheduler(socket.write, "test", lead_ms=10_000, audio_max_seconds=1.0)
+        await scheduler.put(AUDIO, [b"a"], 0.6)
+        await scheduler.put(AUDIO, [b"b"], 0.6)
+        third = asyncio.create_task(scheduler.put(AUDIO, [b"c"], 0.6))
+        await asyncio.sleep(0.01)
+        blocked = not third.done()
+        writer = asyncio.create_task(scheduler.run())
+        await asyncio.wait_for(third, 1)
+        await scheduler.drain()
+        writer.cancel()
+        return blocked, socket.written == [b"a", b"b", b"c"], scheduler
+
+    blocked, in_order, scheduler = asyncio.run(run())
+    assert blocked and in_order
+    assert scheduler.waits == 1 and scheduler.dropped[AUDIO] == 0
+
+
+def test_full_lanes_drop_by_policy():
+    async def run() -> DownstreamScheduler:
+        scheduler = DownstreamScheduler(Socket().write, "test", transcript_max=2, control_max=2)
+        for i in range(3):
+            scheduler.put_nowait(CONTROL, [f"ping-{i}"])
+            scheduler.put_nowait(TRANSCRIPT, [f"text-{i}"])
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert scheduler.dropped == {CONTROL: 1, AUDIO: 0, TRANSCRIPT: 1}
+    assert [item.payloads for item in scheduler._queues[CONTROL]] == [["ping-0"], ["ping-1"]]
+    assert [item.payloads for item in scheduler._queues[TRANSCRIPT]] == [["text-1"], ["text-2"]]
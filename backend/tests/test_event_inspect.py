@@ -0,0 +1,28 @@
+from google.genai import types
+
+from event_inspect import tool_call_boxes
+
+
+def call(call_id: str, box_2d) -> types.FunctionCall:
+    return types.FunctionCall(id=call_id, name="track_and_highlight", args={"box_2d": box_2d})
+
+
+def test_malformed_boxes_are_skipped():
+    calls = [
+        call("ok", [100, 200, 300, 400]),
+        call("nan", [100, float("nan"), 300, 400]),
+        call("inf", [100, 200, float("inf"), 400]),
+        call("text", ["100", 200, 300, 400]),
+        call("short", [100, 200, 300]),
+        call("bool", [True, 200, 300, 400]),
+        call("dict", {"ymin": 100}),
+        types.FunctionCall(id="none", name="clear_spatial_highlights", args={}),
+    ]
+    boxes = tool_call_boxes(calls, 1000, 500)
+
+    assert [box["id"] for box in boxes] == ["ok"]
+    assert boxes[0]["box"] == [200.0, 50.0, 400.0, 150.0]
+
+
+def test_unknown_frame_size_yields_no_boxes():
+    assert tool_call_boxes([call("ok", [100, 200, 300, 400])], 0, 0) == []
@@ -0,0 +1,116 @@
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import firebase_auth
+from benchmarks.bench_auth_latency import PROJECT_ID, KeyServer, make_signing_key
+from signing_keys import SigningKeyCache
+
+MIN_FETCH_INTERVAL = 30.0
+
+
+@pytest.fixture(scope="module")
+def key_server():
+    server = KeyServer()
+    key, cert = make_signing_key("kid-a")
+    server.certs = {"kid-a": cert}
+    yield server, key
+    server.close()
+
+
+@pytest.fixture
+def keys(monkeypatch, clock, key_server) -> tuple[KeyServer, rsa.RSAPrivateKey, SigningKeyCache]:
+    server, key = key_server
+    cache = SigningKeyCache(url=server.url, clock=clock, min_fetch_interval=MIN_FETCH_INTERVAL)
+    assert cache.refresh()
+    monkeypatch.setattr(firebase_auth, "signing_keys", cache)
+    return server, key, cache
+
+
+def token(key, kid: str = "kid-a", algorithm: str = "RS256", **overrides) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "auth_time": now - 60,
+        "sub": "user-1",
+        "iat": now - 5,
+        "exp": now + 3600,
+        **overrides,
+    }
+    return jwt.encode(claims, key, algorithm=algorithm, headers={"kid": kid})
+
+
+def test_valid_token(keys):
+    _, key, cache = keys
+    assert firebase_auth.verify_token_offline(token(key), PROJECT_ID)["uid"] == "user-1"
+    assert cache.blocking_fetches == 0
+
+
+def test_forged_signature_is_rejected(keys):
+    impostor = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with pytest.raises(jwt.InvalidSignatureError):
+        firebase_auth.verify_token_offline(token(impostor), PROJECT_ID)
+
+
+@pytest.mark.parametrize(
+    ("claims", "error"),
+    [
+        ({"aud": "another-project"}, jwt.InvalidAudienceError),
+        ({"iss": "https://securetoken.google.com/another-project"}, jwt.InvalidIssuerError),
+        ({"iss": "https://accounts.google.com"}, jwt.InvalidIssuerError),
+        ({"exp": int(time.time()) - 10}, jwt.ExpiredSignatureError),
+        ({"iat": int(time.time()) + 600}, jwt.ImmatureSignatureError),
+        ({"auth_time": int(time.time()) + 600}, jwt.InvalidTokenError),
+        ({"sub": ""}, jwt.InvalidTokenError),
+    ],
+)
+def test_bad_claims_are_rejected(keys, claims, error):
+    _, key, _ = keys
+    with pytest.raises(error):
+        firebase_auth.verify_token_offline(token(key, **claims), PROJECT_ID)
+
+
+def test_non_rs256_algorithms_are_rejected(keys):
+    _, key, _ = keys
+    for forged in (
+        token("shared-secret-long-enough-for-hs256!", algorithm="HS256"),
+        token(key, algorithm="RS512"),
+        token(None, algorithm="none"),
+    ):
+        with pytest.raises(jwt.InvalidAlgorithmError):
+            firebase_auth.verify_token_offline(forged, PROJECT_ID)
+
+
+def test_unknown_kid_costs_exactly_one_blocking_fetch(keys, clock):
+    server, key, cache = keys
+    rotated, cert = make_signing_key("kid-b")
+    server.certs = {**server.certs, "kid-b": cert}
+    hits = server.hits
+    clock.now += MIN_FETCH_INTERVAL
+
+    for i in range(5):
+        claims = firebase_auth.verify_token_offline(token(rotated, kid="kid-b", sub=f"user-{i}"), PROJECT_ID)
+        assert claims["uid"] == f"user-{i}"
+    assert cache.blocking_fetches == 1
+    assert server.hits == hits + 1
+
+
+def test_unknown_kid_refetches_are_rate_limited(keys, clock):
+    server, key, cache = keys
+    hits = server.hits
+    clock.now += MIN_FETCH_INTERVAL
+
+    for i in range(20):
+        with pytest.raises(jwt.InvalidTokenError, match="Unknown signing key"):
+            firebase_auth.verify_token_offline(token(key, kid=f"forged-{i}"), PROJECT_ID)
+    assert server.hits == hits + 1
+
+    clock.now += MIN_FETCH_INTERVAL
+    with pytest.raises(jwt.InvalidTokenError, match="Unknown signing key"):
+        firebase_auth.verify_token_offline(token(key, kid="forged-again"), PROJECT_ID)
+    assert server.hits == hits + 2
+    # Known keys keep verifying while the refetches are throttled
+    assert firebase_auth.verify_token_offline(token(key), PROJECT_ID)["uid"] == "user-1"
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import pytest
+
+import frame_diagnostics
+from frame_diagnostics import FrameDiagnostics
+
+BOX = {"box_2d": [100, 100, 200, 200], "label": "mug"}
+
+
+class RecordingWriter:
+    root = Path("diagnostics")
+
+    def __init__(self) -> None:
+        self.jobs = []
+
+    def submit(self, job) -> None:
+        self.jobs.append(job)
+
+    def annotated_seq(self) -> int:
+        return self.jobs[-1].args[0].seq
+
+
+@pytest.fixture
+def writer() -> RecordingWriter:
+    return RecordingWriter()
+
+
+@pytest.fixture
+def diag(monkeypatch, clock, writer) -> FrameDiagnostics:
+    monkeypatch.setattr(frame_diagnostics, "DIAGNOSTICS_ENABLED", True)
+    return FrameDiagnostics("test", writer=writer, clock=clock)
+
+
+def capture_frames(diag: FrameDiagnostics, clock, until: float) -> None:
+    while clock.now < until:
+        diag.capture_frame(b"jpeg", 640, 480)
+        clock.now += 0.5
+
+
+def test_tool_call_first_uses_end_of_user_input(diag, clock, writer):
+    capture_frames(diag, clock, 2.0)  # frames 1-4 at 0.0 .. 1.5
+    clock.now = 1.75
+    diag.note_user_input()  # user finished asking
+    clock.now = 2.0
+    capture_frames(diag, clock, 4.0)  # frames 5-8 while the model thinks
+    diag.mark_model_turn()
+    diag.annotate_tool_call("track_and_highlight", BOX)
+    assert writer.annotated_seq() == 4
+
+
+def test_turn_without_user_input_falls_back_to_model_output(diag, clock, writer):
+    capture_frames(diag, clock, 2.0)
+    clock.now = 1.75
+    diag.mark_model_turn()
+    clock.now = 2.0
+    capture_frames(diag, clock, 4.0)
+    diag.annotate_tool_call("track_and_highlight", BOX)
+    assert writer.annotated_seq() == 4
+
+
+def test_user_input_is_consumed_by_one_turn(diag, clock, writer):
+    capture_frames(diag, clock, 1.0)
+    diag.note_user_input()
+    diag.mark_model_turn()
+    capture_frames(diag, clock, 3.0)
+    diag.mark_model_turn()  # next turn, no new user input
+    diag.annotate_tool_call("track_and_highlight", BOX)
+    assert writer.annotated_seq() == 6
@@ -0,0 +1,58 @@
+import asyncio
+
+from google.genai import types
+
+from frame_governor import VIDEO_MAX_STALE_SECONDS, FrameGovernor
+from ingest_queue import IngestQueue
+
+
+class StaticScene:
+    """A scene filter that sees every frame as a duplicate unless forced."""
+
+    async def is_new_scene(self, image_bytes: bytes, force: bool = False) -> bool:
+        return force
+
+    def stats(self) -> dict[str, float]:
+        return {}
+
+
+def backed_up_ingest() -> IngestQueue:
+    # A frame stuck in the video lane keeps the governor at its lowest pressure scale.
+    ingest = IngestQueue()
+    ingest.send_realtime(types.Blob(mime_type="image/jpeg", data=b"\xff"))
+    return ingest
+
+
+def forward_times(governor: FrameGovernor, clock, seconds: float, step: float) -> list[float]:
+    async def run() -> list[float]:
+        times = []
+        for i in range(round(seconds / step)):
+            clock.now = i * step
+            if await governor.admit(b"frame"):
+                times.append(clock.now)
+        return times
+
+    return asyncio.run(run())
+
+
+def test_stale_frame_bypasses_rate_limit_under_pressure(clock):
+    governor = FrameGovernor(backed_up_ingest(), scene=StaticScene(), clock=clock)
+    times = forward_times(governor, clock, 120.0, 0.5)
+    assert governor.target_fps() < 1 / VIDEO_MAX_STALE_SECONDS
+    gaps = [b - a for a, b in zip(times, times[1:], strict=False)]
+    assert gaps and max(gaps) <= VIDEO_MAX_STALE_SECONDS + 0.5
+
+
+def test_disabled_governor_forwards_every_frame(clock):
+    governor = FrameGovernor(backed_up_ingest(), clock=clock, enabled=False)
+    times = forward_times(governor, clock, 10.0, 0.1)
+    assert len(times) == 100
+    assert governor.skipped == 0
+    assert governor.rate_update() is None
+
+
+def test_enabled_governor_limits_idle_rate(clock):
+    governor = FrameGovernor(IngestQueue(), clock=clock)
+    times = forward_times(governor, clock, 10.0, 0.1)
+    assert len(times) < 10
+    assert governor.rate_update() is not None
@@ -0,0 +1,81 @@
+import asyncio
+
+from google.adk.agents.live_request_queue import LiveRequest
+from google.genai import types
+
+from ingest_queue import IngestQueue
+
+AUDIO = types.Blob(mime_type="audio/pcm;rate=16000", data=b"\x00\x01" * 160)
+
+
+def frame(n: int) -> types.Blob:
+    return types.Blob(mime_type="image/jpeg", data=bytes([n]))
+
+
+async def drain(queue: IngestQueue, n: int) -> list[LiveRequest]:
+    return [await queue.get() for _ in range(n)]
+
+
+def kind(req: LiveRequest) -> str:
+    if req.content is not None:
+        return "content"
+    if req.activity_end is not None:
+        return "activity_end"
+    if req.close:
+        return "close"
+    return (req.blob.mime_type or "").split("/")[0]
+
+
+def test_text_does_not_overtake_flushed_audio():
+    async def run() -> list[str]:
+        queue = IngestQueue()
+        await queue.put_realtime(AUDIO)
+        queue.send_content(types.Content(role="user", parts=[types.Part(text="what is this?")]))
+        return [kind(req) for req in await drain(queue, 2)]
+
+    assert asyncio.run(run()) == ["audio", "content"]
+
+
+def test_control_and_audio_keep_send_order():
+    async def run() -> list[str]:
+        queue = IngestQueue()
+        queue.send_realtime(AUDIO)
+        queue.send_activity_end()
+        queue.send_realtime(AUDIO)
+        queue.close()
+        return [kind(req) for req in await drain(queue, 4)]
+
+    assert asyncio.run(run()) == ["audio", "activity_end", "audio", "close"]
+
+
+def test_video_is_latest_wins_and_served_after_ordered_lane():
+    async def run() -> tuple[list[str], IngestQueue]:
+        queue = IngestQueue(video_max=1)
+        queue.send_realtime(frame(1))
+        queue.send_realtime(frame(2))
+        queue.send_realtime(AUDIO)
+        reqs = await drain(queue, 2)
+        return [kind(req) for req in reqs] + [reqs[1].blob.data.hex()], queue
+
+    order, queue = asyncio.run(run())
+    assert order == ["audio", "image", "02"]
+    assert queue.video_dropped == 1
+
+
+def test_put_realtime_waits_for_room():
+    async def run() -> IngestQueue:
+        queue = IngestQueue(audio_max=2)
+        queue.send_content(types.Content(role="user", parts=[types.Part(text="hi")]))
+        await queue.put_realtime(AUDIO)
+        await queue.put_realtime(AUDIO)
+        blocked = asyncio.create_task(queue.put_realtime(AUDIO))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        assert queue.stats()["control_depth"] == 1
+        await drain(queue, 2)  # content, then the first audio frees a slot
+        await asyncio.wait_for(blocked, 1)
+        return queue
+
+    queue = asyncio.run(run())
+    assert queue.audio_waits == 1
+    assert queue.audio_depth == 2
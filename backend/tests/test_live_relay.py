@@ -0,0 +1,131 @@
+"""Smoke test: the relay (uvicorn main:app) end to end against fake_live_server.py."""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlencode
+
+import pytest
+import websockets
+
+from benchmarks.bench_auth_latency import PROJECT_ID, KeyServer, make_signing_key, sign_token
+from fake_live_server import FakeLiveServer, FakeScript
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SCRIPT = FakeScript(audio_chunks=40, chunk_ms=40.0, first_response_ms=50.0, jitter_ms=0.0)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(process: subprocess.Popen, url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert process.poll() is None, f"relay exited with code {process.returncode}"
+        try:
+            urllib.request.urlopen(url, timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError("relay did not become ready")
+
+
+@pytest.fixture
+def relay(tmp_path):
+    """(event loop, fake Live API, ID token, relay port), the relay running in a subprocess."""
+    loop = asyncio.new_event_loop()
+    fake = FakeLiveServer(SCRIPT, port=free_port(), keep_received=4)
+    loop.run_until_complete(fake.start())
+    keys = KeyServer()
+    signing_key, cert = make_signing_key("smoke-kid")
+    keys.certs = {"smoke-kid": cert}
+    port = free_port()
+    env = {
+        **os.environ,
+        "GEMINI_BASE_URL": fake.base_url,
+        "GEMINI_CA_FILE": str(fake.cert_file),
+        "GEMINI_API_KEY": "fake",
+        "FIREBASE_ADMIN_PROJECT_ID": PROJECT_ID,
+        "FIREBASE_OFFLINE_VERIFY": "true",
+        "SIGNING_KEYS_URL": keys.url,
+    }
+    with (tmp_path / "relay.log").open("w") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        try:
+            wait_ready(process, f"http://127.0.0.1:{port}/")
+            yield loop, fake, sign_token(signing_key, "smoke-kid", "smoke-user"), port
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+            loop.run_until_complete(fake.stop())
+            loop.close()
+            keys.close()
+
+
+async def events_until(ws, predicate, timeout: float = 15.0) -> list[dict]:
+    """JSON events from the relay up to and including the first one matching `predicate`."""
+    events = []
+    async with asyncio.timeout(timeout):
+        async for message in ws:
+            event = json.loads(message)
+            events.append(event)
+            if predicate(event):
+                return events
+    raise AssertionError(f"connection closed after {len(events)} events")
+
+
+def audio_parts(event: dict) -> list[dict]:
+    parts = (event.get("content") or {}).get("parts") or []
+    return [part["inlineData"] for part in parts if "inlineData" in part]
+
+
+def test_text_turn_and_interruption(relay):
+    loop, fake, token, port = relay
+
+    async def session() -> tuple[list[dict], list[dict]]:
+        url = f"ws://127.0.0.1:{port}/ws/live?{urlencode({'mode': 'spatial', 'token': token})}"
+        async with websockets.connect(url, max_size=None) as ws:
+            await ws.send(json.dumps({"text": "where is my mug"}))
+            first = await events_until(ws, lambda e: bool(e.get("turnComplete")))
+
+            await ws.send(json.dumps({"text": "and the keys?"}))
+            await events_until(ws, lambda e: bool(audio_parts(e)))
+            await ws.send(json.dumps({"text": "never mind"}))
+            second = await events_until(ws, lambda e: bool(e.get("interrupted")))
+            return first, second
+
+    first, second = loop.run_until_complete(session())
+
+    parts = [part for e in first for part in (e.get("content") or {}).get("parts") or []]
+    assert [part["functionCall"]["name"] for part in parts if "functionCall" in part] == ["track_and_highlight"]
+    audio = [blob for e in first for blob in audio_parts(e)]
+    assert len(audio) == SCRIPT.audio_chunks
+    assert all(blob["mimeType"].startswith("audio/pcm") for blob in audio)
+
+    def final(key: str) -> str:
+        texts = [e[key]["text"] for e in first if (e.get(key) or {}).get("finished")]
+        assert len(texts) == 1
+        return texts[0].strip()
+
+    assert final("inputTranscription") == SCRIPT.input_transcript
+    assert final("outputTranscription") == SCRIPT.output_transcript
+
+    assert second[-1]["interrupted"] is True
+    assert fake.interruptions == 1
+    assert fake.received_count("clientContent") == 3
+    assert len(fake.received) == 4 < fake.received_count()
@@ -0,0 +1,22 @@
+from relay_metrics import TOOL_CALLS, SessionMetrics, render_metrics, set_client_pool
+
+
+def test_unregistered_tool_names_share_one_label():
+    metrics = SessionMetrics("spatial")
+    metrics.tool_call("track_and_highlight")
+    for i in range(50):
+        metrics.tool_call(f"made_up_{i}")
+
+    assert TOOL_CALLS.labels("spatial", "track_and_highlight").value == 1
+    assert TOOL_CALLS.labels("spatial", "other").value == 50
+    assert "made_up_" not in render_metrics()
+
+
+def test_client_pool_stats_are_exported():
+    set_client_pool({"size": 3, "hits": 10, "misses": 4, "evictions": 1})
+    text = render_metrics()
+
+    assert "relay_client_pool_size 3" in text
+    assert 'relay_client_pool_lookups_total{result="hit"} 10' in text
+    assert 'relay_client_pool_lookups_total{result="miss"} 4' in text
+    assert "relay_client_pool_evictions_total 1" in text
@@ -0,0 +1,78 @@
+import asyncio
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+from replay_session import SESSION_PARAMS, replay, session_params
+from session_recording import BINARY, DOWN, TEXT, UP, Recording, SessionRecorder
+
+PARAMS = {"mode": "spatial", "protocol": 1, "audio_out": "binary", "clock_sync": 1, "audio_codec": "opus"}
+
+
+def make_recording(directory, metadata) -> Recording:
+    recorder = SessionRecorder("s1", metadata, enabled=True, directory=directory)
+    recorder.record_upstream({"type": "websocket.receive", "bytes": b"\x01\x02audio"})
+    recorder.record_upstream({"type": "websocket.receive", "text": '{"clockPong": {"id": 1}}'})
+    recorder.record(DOWN, TEXT, '{"clockPing": {"id": 1}}')
+    recorder.close(wait=True)
+    return Recording(recorder.path)
+
+
+def test_recording_round_trips_session_params_and_messages(tmp_path):
+    with make_recording(tmp_path, PARAMS) as recording:
+        assert session_params(recording.metadata) == PARAMS
+        assert recording.metadata["session_id"] == "s1"
+        messages = [(msg.direction, msg.kind, msg.payload) for msg in recording]
+    assert messages == [
+        (UP, BINARY, b"\x01\x02audio"),
+        (UP, TEXT, b'{"clockPong": {"id": 1}}'),
+        (DOWN, TEXT, b'{"clockPing": {"id": 1}}'),
+    ]
+
+
+def test_old_recordings_replay_with_relay_defaults(tmp_path):
+    with make_recording(tmp_path, {"mode": "spatial", "protocol": 0, "audio_out": "json"}) as recording:
+        assert session_params(recording.metadata) == SESSION_PARAMS
+
+
+def test_replay_connects_with_recorded_params(tmp_path):
+    seen: dict[str, list[str]] = {}
+
+    async def handler(connection) -> None:
+        seen.update(parse_qs(urlparse(connection.request.path).query))
+        async for _ in connection:
+            pass
+
+    async def run() -> dict:
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            with make_recording(tmp_path, PARAMS) as recording:
+                return await replay(recording, f"ws://127.0.0.1:{port}/ws/live", "token", speed=0, drain_seconds=0.1)
+
+    result = asyncio.run(run())
+    assert {key: seen[key][0] for key in PARAMS} == {key: str(value) for key, value in PARAMS.items()}
+    assert result["session_params"] == PARAMS
+    assert result["upstream_sent"] == 2
+
+
+def test_records_are_batched_and_written_off_the_calling_thread(tmp_path):
+    recorder = SessionRecorder("s2", PARAMS, enabled=True, directory=tmp_path)
+    for i in range(10):
+        recorder.record(DOWN, TEXT, f'{{"n": {i}}}')
+    assert not recorder.path.exists()
+
+    recorder.close(wait=True)
+    with Recording(recorder.path) as recording:
+        assert [msg.as_text() for msg in recording] == [f'{{"n": {i}}}' for i in range(10)]
+
+
+def test_recording_stops_when_the_disk_falls_behind(tmp_path):
+    recorder = SessionRecorder("s3", PARAMS, enabled=True, directory=tmp_path)
+    recorder._flush_bytes = 0
+    recorder._backlog_max = 0
+    recorder.record(UP, BINARY, b"audio")
+    recorder.record(UP, BINARY, b"more")
+    recorder.close(wait=True)
+
+    assert recorder.records == 1
+    assert not recorder.path.exists()
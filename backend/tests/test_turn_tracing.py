@@ -0,0 +1,51 @@
+from turn_tracing import TurnTracer
+
+
+def tracer(clock) -> TurnTracer:
+    return TurnTracer("session", "test", enabled=False, clock=clock)
+
+
+def test_turn_starts_at_speech_onset(clock):
+    t = tracer(clock)
+    clock.now = 1.0
+    t.speech_start()
+    clock.now = 2.0
+    t.on_event(transcribed=True, audio=False, tool_names=[], ends_turn=False, interrupted=False)
+    clock.now = 2.5
+    t.on_event(transcribed=False, audio=True, tool_names=[], ends_turn=False, interrupted=False)
+
+    assert (t.turn_start, t.speech_end, t.first_audio) == (1.0, 2.0, 2.5)
+
+
+def test_without_voice_gate_first_transcription_starts_turn(clock):
+    t = tracer(clock)
+    clock.now = 3.0
+    t.on_event(transcribed=True, audio=False, tool_names=[], ends_turn=False, interrupted=False)
+
+    assert t.turn_start == 3.0
+
+
+def test_barge_in_starts_next_turn(clock):
+    t = tracer(clock)
+    t.speech_start()
+    clock.now = 1.0
+    t.on_event(transcribed=False, audio=True, tool_names=[], ends_turn=False, interrupted=False)
+    clock.now = 2.0
+    t.speech_start()
+    clock.now = 2.2
+    t.on_event(transcribed=False, audio=False, tool_names=[], ends_turn=True, interrupted=True)
+
+    assert t.turns == 1
+    assert t.turn_start == 2.0
+
+
+def test_onset_during_answer_is_forgotten_when_turn_completes(clock):
+    t = tracer(clock)
+    t.speech_start()
+    clock.now = 1.0
+    t.on_event(transcribed=False, audio=True, tool_names=[], ends_turn=False, interrupted=False)
+    t.speech_start()
+    clock.now = 2.0
+    t.on_event(transcribed=False, audio=False, tool_names=[], ends_turn=True, interrupted=False)
+
+    assert t.turn_start is None
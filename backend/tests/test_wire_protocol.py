@@ -0,0 +1,54 @@
+import struct
+
+import pytest
+
+from wire_protocol import (
+    KIND_AUDIO,
+    KIND_VIDEO,
+    MEDIA_HEADER,
+    MIME_TYPES,
+    WIRE_VERSION,
+    WireProtocolError,
+    decode_media_frame,
+    encode_media_frame,
+)
+
+
+def raw_frame(kind: int, mime_type: str, flags: int = 0, data: bytes = b"payload") -> bytes:
+    return MEDIA_HEADER.pack(WIRE_VERSION, kind, MIME_TYPES.index(mime_type), flags, 0, 0, 1.5) + data
+
+
+def test_round_trip():
+    message = encode_media_frame(KIND_VIDEO, "image/jpeg", b"\xff\xd8jpeg", width=640, height=480, client_ts=12.5)
+    frame = decode_media_frame(message)
+    assert (frame.kind, frame.mime_type, frame.width, frame.height) == (KIND_VIDEO, "image/jpeg", 640, 480)
+    assert frame.client_ts == 12.5
+    assert frame.data == b"\xff\xd8jpeg"
+
+
+@pytest.mark.parametrize(
+    ("kind", "mime_type"),
+    [(KIND_AUDIO, "image/jpeg"), (KIND_VIDEO, "audio/pcm;rate=16000"), (KIND_VIDEO, "audio/opus")],
+)
+def test_kind_must_match_mime_type(kind: int, mime_type: str):
+    with pytest.raises(WireProtocolError, match="does not match"):
+        decode_media_frame(raw_frame(kind, mime_type))
+
+
+@pytest.mark.parametrize("flags", [0x01, 0x80])
+def test_reserved_flags_must_be_zero(flags: int):
+    with pytest.raises(WireProtocolError, match="flags"):
+        decode_media_frame(raw_frame(KIND_AUDIO, "audio/pcm;rate=16000", flags=flags))
+
+
+def test_rejects_bad_header():
+    with pytest.raises(WireProtocolError):
+        decode_media_frame(b"\x01\x01")
+    with pytest.raises(WireProtocolError, match="version"):
+        decode_media_frame(struct.pack("<B", 9) + raw_frame(KIND_AUDIO, "audio/pcm;rate=16000")[1:])
+    with pytest.raises(WireProtocolError, match="mime code"):
+        decode_media_frame(MEDIA_HEADER.pack(WIRE_VERSION, KIND_AUDIO, 255, 0, 0, 0, 0.0))
+
+
+def test_wire_protocol_error_is_value_error():
+    assert issubclass(WireProtocolError, ValueError)
@@ -0,0 +1,230 @@
+"""
+Turn Tracing
+
+Per-turn latency as the user feels it: from when they speak to the first model
+audio, and to the `track_and_highlight` highlight. Each session has a
+TurnTracer that the relay feeds from both loops:
+
+  upstream_task    speech_start()   voice gate onset (voice_activity.py) → turn
+                                    start; an onset while the model is answering
+                                    starts the next turn
+                   user_text()      typed input → turn start if none, end of speech
+  downstream_task  on_event()       input transcriptions (the first one starts the
+                                    turn when there is no voice gate, the last one
+                                    before the model answers is taken as end of
+                                    speech), first model audio, first function
+                                    call, turnComplete / interrupted → turn end
+
+Raw upstream audio never starts a turn: the microphone streams continuously, so
+"the first chunk after the last turn" is just the next frame of room noise.
+
+Marks are taken when the downstream event has been sent to the client, so they
+include the runner and the relay's own send path.
+
+Every finished turn records its phases in the relay_turn_latency_seconds
+histogram (per mode, see relay_metrics.py):
+
+  first_transcription   turn start → first input transcription
+  first_audio           end of speech → first model audio sent
+  first_tool_call       end of speech → first function call sent
+  turn                  turn start → turn end
+
+With TURN_TRACING=true each turn is also written to TRACE_FILE in the Chrome
+Trace Event format (JSON array; open in https://ui.perfetto.dev or
+chrome://tracing). Each session is its own track with `user` and `model` spans
+and instant marks for the first transcription, audio and tool call. The file
+is appended to and never closed with `]`, which the format allows, so a
+crashed process still leaves a loadable trace.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from relay_metrics import TURN_LATENCY  # type: ignore
+
+TURN_TRACING = os.getenv("TURN_TRACING", "false").lower() == "true"
+TRACE_FILE = Path(
+    os.getenv("TRACE_FILE", str(Path(__file__).resolve().parent / "traces" / f"turns-{os.getpid()}.json"))
+)
+
+
+class TraceWriter:
+    """Appends Chrome trace events to one file shared by all sessions."""
+
+    def __init__(self, path: Path = TRACE_FILE) -> None:
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+        self._next_tid = 0
+
+    def next_tid(self) -> int:
+        with self._lock:
+            self._next_tid += 1
+            return self._next_tid
+
+    def write(self, events: list[dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(event, separators=(",", ":")) + ",\n" for event in events)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a")
+                if self._file.tell() == 0:
+                    self._file.write("[\n")
+                logger.info(f"Turn traces → {self.path}")
+            self._file.write(lines)
+            self._file.flush()
+
+
+trace_writer = TraceWriter()
+
+
+class TurnTracer:
+    """Tracks one session's current turn and reports it when the turn ends."""
+
+    def __init__(
+        self,
+        session_id: str,
+        mode: str,
+        enabled: bool = TURN_TRACING,
+        writer: TraceWriter = trace_writer,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.session_id = session_id
+        self.mode = mode
+        self.enabled = enabled
+        self._writer = writer
+        self._clock = clock
+        self._phases = {
+            phase: TURN_LATENCY.labels(mode, phase)
+            for phase in ("first_transcription", "first_audio", "first_tool_call", "turn")
+        }
+        self.turns = 0
+        self._next_start: float | None = None
+        self._tid = 0
+        if enabled:
+            self._tid = writer.next_tid()
+            writer.write(
+                [
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": os.getpid(),
+                        "tid": self._tid,
+                        "args": {"name": f"{mode} {session_id[:8]}"},
+                    }
+                ]
+            )
+        self._reset()
+
+    def _reset(self) -> None:
+        self.turn_start: float | None = self._next_start
+        self._next_start = None
+        self.first_transcription: float | None = None
+        self.speech_end: float | None = None
+        self.first_audio: float | None = None
+        self.first_tool_call: float | None = None
+        self.tool_name: str | None = None
+
+    def speech_start(self) -> None:
+        """The voice gate opened: the user started speaking."""
+        now = self._clock()
+        if self.turn_start is None:
+            self.turn_start = now
+        elif self.first_audio is not None or self.first_tool_call is not None:
+            # Barge-in: if this turn ends `interrupted`, the speech belongs to the next one
+            self._next_start = now
+
+    def user_text(self) -> None:
+        now = self._clock()
+        if self.turn_start is None:
+            self.turn_start = now
+        if self.first_audio is None and self.first_tool_call is None:
+            self.speech_end = now
+
+    def on_event(
+        self, transcribed: bool, audio: bool, tool_names: list[str], ends_turn: bool, interrupted: bool
+    ) -> None:
+        """Called once the downstream event has been sent to the client."""
+        now = self._clock()
+        if self.turn_start is None and (transcribed or audio or tool_names):
+            self.turn_start = now
+        answered = self.first_audio is not None or self.first_tool_call is not None
+        if transcribed:
+            if self.first_transcription is None:
+                self.first_transcription = now
+            if not answered:
+                self.speech_end = now
+        if (audio or tool_names) and self.speech_end is None:
+            self.speech_end = now
+        if audio and self.first_audio is None:
+            self.first_audio = now
+        if tool_names and self.first_tool_call is None:
+            self.first_tool_call = now
+            self.tool_name = tool_names[0]
+        if ends_turn:
+            self._finish(now, interrupted)
+
+    def _finish(self, end: float, interrupted: bool) -> None:
+        if not interrupted:
+            self._next_start = None
+        start = self.turn_start
+        if start is None:
+            self._reset()
+            return
+        self.turns += 1
+        phases: dict[str, float] = {"turn": end - start}
+        if self.first_transcription is not None:
+            phases["first_transcription"] = self.first_transcription - start
+        if self.speech_end is not None:
+            if self.first_audio is not None:
+                phases["first_audio"] = self.first_audio - self.speech_end
+            if self.first_tool_call is not None:
+                phases["first_tool_call"] = self.first_tool_call - self.speech_end
+        for phase, seconds in phases.items():
+            self._phases[phase].observe(seconds)
+        if self.enabled:
+            self._writer.write(self._trace_events(start, end, interrupted, phases))
+        self._reset()
+
+    def _trace_events(
+        self, start: float, end: float, interrupted: bool, phases: dict[str, float]
+    ) -> list[dict[str, Any]]:
+        pid, tid = os.getpid(), self._tid
+
+        def us(t: float) -> float:
+            return round(t * 1e6, 1)
+
+        args = {
+            "session": self.session_id,
+            "mode": self.mode,
+            "turn": self.turns,
+            "interrupted": interrupted,
+            **{f"{phase}_ms": round(seconds * 1000, 2) for phase, seconds in phases.items()},
+        }
+        speech_end = self.speech_end if self.speech_end is not None else start
+        events = [
+            {"name": "turn", "cat": "turn", "ph": "X", "ts": us(start), "dur": us(end - start), "args": args},
+            {"name": "user", "cat": "upstream", "ph": "X", "ts": us(start), "dur": us(speech_end - start)},
+            {"name": "model", "cat": "downstream", "ph": "X", "ts": us(speech_end), "dur": us(end - speech_end)},
+        ]
+        marks = (
+            ("first_transcription", self.first_transcription, None),
+            ("first_audio", self.first_audio, None),
+            ("first_tool_call", self.first_tool_call, {"tool": self.tool_name}),
+        )
+        for name, t, extra in marks:
+            if t is not None:
+                event = {"name": name, "cat": "mark", "ph": "i", "s": "t", "ts": us(t)}
+                if extra:
+                    event["args"] = extra
+                events.append(event)
+        for event in events:
+            event["pid"], event["tid"] = pid, tid
+        return events
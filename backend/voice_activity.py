@@ -0,0 +1,145 @@
+"""
+Server-Side Voice Activity Gate
+
+Browsers stream the microphone continuously, so most upstream audio is
+silence that still costs uplink to the model and model-side processing. With
+SERVER_VAD=true each session runs a VoiceGate over its raw 16 kHz PCM and only
+forwards speech, plus:
+
+  pre-roll    the last VAD_PREROLL_MS of audio before a speech onset, flushed
+              together with the onset chunk, so quiet word beginnings are not
+              clipped and the onset is not delayed
+  hang-over   VAD_HANGOVER_MS of audio after the last speech frame. The model
+              decides end-of-turn with its own activity detection, which needs
+              to hear trailing silence (the ADK queue has no audio-stream-end
+              signal), so keep this above the model's silence window.
+
+Each chunk is split into VAD_FRAME_MS frames and classified with two
+vectorized features: frame energy in dBFS against an adaptive noise floor
+(drops straight to the quietest frame, rises slowly with a VAD_FLOOR_RISE_MS
+time constant so constant room noise is learned but an utterance is not), and
+zero-crossing rate (which keeps low-energy fricatives such as "s" / "f" that
+energy alone would drop). A chunk counts as speech if any of its frames does.
+
+Anything other than audio/pcm at 16 kHz passes through untouched.
+"""
+
+import math
+import os
+from collections import deque
+
+import numpy as np
+
+SERVER_VAD = os.getenv("SERVER_VAD", "false").lower() == "true"
+VAD_FRAME_MS = float(os.getenv("VAD_FRAME_MS", "20"))
+VAD_PREROLL_MS = float(os.getenv("VAD_PREROLL_MS", "300"))
+VAD_HANGOVER_MS = float(os.getenv("VAD_HANGOVER_MS", "1200"))
+# Absolute floor for speech energy, and how far above the tracked noise floor speech must be.
+VAD_THRESHOLD_DBFS = float(os.getenv("VAD_THRESHOLD_DBFS", "-50"))
+VAD_NOISE_MARGIN_DB = float(os.getenv("VAD_NOISE_MARGIN_DB", "12"))
+# Fricatives: lower energy is accepted when the zero-crossing rate is high.
+VAD_FRICATIVE_DB = float(os.getenv("VAD_FRICATIVE_DB", "8"))
+VAD_FRICATIVE_ZCR = float(os.getenv("VAD_FRICATIVE_ZCR", "0.3"))
+VAD_FLOOR_RISE_MS = float(os.getenv("VAD_FLOOR_RISE_MS", "10000"))
+
+SAMPLE_RATE = 16000
+PCM_MIME_TYPES = frozenset({"audio/pcm;rate=16000", "audio/pcm"})
+_FULL_SCALE_SQ = 32768.0**2
+
+
+def frame_features(samples: np.ndarray, frame: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame energy (dBFS) and zero-crossing rate of int16 samples.
+
+    A trailing partial frame is kept when it holds at least half a frame.
+    """
+    n = samples.size // frame
+    if samples.size - n * frame >= frame // 2:
+        samples = np.concatenate([samples, np.zeros((n + 1) * frame - samples.size, dtype=samples.dtype)])
+        n += 1
+    if n == 0:
+        return np.empty(0), np.empty(0)
+    frames = samples[: n * frame].reshape(n, frame).astype(np.float32)
+    energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) / _FULL_SCALE_SQ + 1e-12)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame - 1)
+    return energy_db, zcr
+
+
+class VoiceGate:
+    """Per-session speech gate over a 16 kHz PCM stream."""
+
+    def __init__(
+        self,
+        preroll_ms: float = VAD_PREROLL_MS,
+        hangover_ms: float = VAD_HANGOVER_MS,
+        frame_ms: float = VAD_FRAME_MS,
+    ) -> None:
+        self._frame = max(2, int(SAMPLE_RATE * frame_ms / 1000))
+        self._preroll_bytes = int(SAMPLE_RATE * preroll_ms / 1000) * 2
+        self._hangover_ms = hangover_ms
+        self._preroll: deque[bytes] = deque()
+        self._preroll_size = 0
+        self._hang_ms = 0.0
+        self._noise_floor_db = VAD_THRESHOLD_DBFS - VAD_NOISE_MARGIN_DB
+        self.open = False
+
+        self.audio_ms = 0.0
+        self.forwarded_ms = 0.0
+        self.segments = 0
+
+    def is_speech(self, data: bytes) -> bool:
+        samples = np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+        energy_db, zcr = frame_features(samples, self._frame)
+        if energy_db.size == 0:
+            return False
+        threshold = max(VAD_THRESHOLD_DBFS, self._noise_floor_db + VAD_NOISE_MARGIN_DB)
+        speech = (energy_db > threshold) | ((energy_db > threshold - VAD_FRICATIVE_DB) & (zcr > VAD_FRICATIVE_ZCR))
+
+        quietest = float(energy_db.min())
+        if quietest < self._noise_floor_db:
+            self._noise_floor_db = quietest
+        else:
+            rise = 1 - math.exp(-samples.size / SAMPLE_RATE * 1000 / VAD_FLOOR_RISE_MS)
+            self._noise_floor_db += rise * (quietest - self._noise_floor_db)
+        return bool(speech.any())
+
+    def admit(self, mime_type: str, data: bytes) -> list[bytes]:
+        """Chunks to forward now (possibly empty; pre-roll first on a speech onset)."""
+        if mime_type not in PCM_MIME_TYPES:
+            return [data]
+        chunk_ms = len(data) / 2 / SAMPLE_RATE * 1000
+        self.audio_ms += chunk_ms
+
+        if self.is_speech(data):
+            self._hang_ms = self._hangover_ms
+            if not self.open:
+                self.open = True
+                self.segments += 1
+                out = [*self._preroll, data]
+                self.forwarded_ms += (self._preroll_size + len(data)) / 2 / SAMPLE_RATE * 1000
+                self._preroll.clear()
+                self._preroll_size = 0
+                return out
+        elif self.open:
+            self._hang_ms -= chunk_ms
+            if self._hang_ms <= 0:
+                self.open = False
+        else:
+            self._preroll.append(data)
+            self._preroll_size += len(data)
+            while self._preroll and self._preroll_size - len(self._preroll[0]) >= self._preroll_bytes:
+                self._preroll_size -= len(self._preroll.popleft())
+            return []
+
+        self.forwarded_ms += chunk_ms
+        return [data]
+
+    def stats(self) -> dict[str, float | int]:
+        suppressed = self.audio_ms - self.forwarded_ms
+        return {
+            "audio_ms": round(self.audio_ms),
+            "suppressed_ms": round(suppressed),
+            "suppressed_ratio": round(suppressed / self.audio_ms, 3) if self.audio_ms else 0.0,
+            "segments": self.segments,
+            "noise_floor_dbfs": round(self._noise_floor_db, 1),
+        }
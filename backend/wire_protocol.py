@@ -0,0 +1,177 @@
+"""
+Binary Wire Protocol
+
+Versioned framing for media sent over /ws/live as binary WebSocket messages.
+Clients opt in with the `protocol=1` query parameter; without it every binary
+message is still treated as raw 16 kHz PCM and video travels as base64 JSON.
+
+Upstream media frame (client → relay), little-endian, 16-byte header:
+
+    u8  version     WIRE_VERSION
+    u8  kind        KIND_AUDIO | KIND_VIDEO
+    u8  mime        index into MIME_TYPES
+    u8  flags       reserved, must be 0
+    u16 width       frame width in px (0 for audio)
+    u16 height      frame height in px (0 for audio)
+    f64 client_ts   client capture time in ms (performance.timeOrigin + now())
+
+followed by the raw payload (JPEG bytes, PCM samples, µ-law bytes or one
+Opus packet), with no base64. MIME_TYPES is append-only.
+
+Downstream audio frame (relay → client, `audio_out=binary`), 12-byte header:
+
+    u8  version     WIRE_VERSION
+    u8  kind        KIND_AUDIO_OUT
+    u8  mime        index into MIME_TYPES
+    u8  flags       reserved, 0
+    u32 turn_id     relay turn counter, advances on turnComplete / interrupted
+    u32 seq         chunk sequence number within the turn
+
+followed by raw model PCM, or one µ-law chunk / Opus packet with `audio_codec`
+(downstream_codec.py). The event the audio came from is still sent as JSON
+with its audio parts removed, unless nothing but audio was in it.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Any
+
+WIRE_VERSION = 1
+
+KIND_AUDIO = 1
+KIND_VIDEO = 2
+KIND_AUDIO_OUT = 3
+
+MIME_TYPES: tuple[str, ...] = (
+    "audio/pcm;rate=16000",
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+    "audio/pcm;rate=24000",
+    # Upstream ingest formats, decoded to 16 kHz PCM by the relay (see audio_ingest.py)
+    "audio/pcm;rate=48000",
+    "audio/pcm;rate=44100",
+    "audio/pcmu;rate=16000",
+    "audio/pcmu;rate=8000",
+    "audio/opus",
+    # Downstream model audio with audio_codec=pcmu (see downstream_codec.py)
+    "audio/pcmu;rate=24000",
+)
+_MIME_CODES: dict[str, int] = {mime: code for code, mime in enumerate(MIME_TYPES)}
+_KIND_MIME_PREFIX: dict[int, str] = {KIND_AUDIO: "audio/", KIND_VIDEO: "image/"}
+
+MEDIA_HEADER = struct.Struct("<BBBBHHd")
+AUDIO_OUT_HEADER = struct.Struct("<BBBBII")
+
+
+class WireProtocolError(ValueError):
+    """Raised when a binary message does not match the negotiated framing."""
+
+
+@dataclass(slots=True, frozen=True)
+class MediaFrame:
+    """A decoded upstream media frame."""
+
+    kind: int
+    mime_type: str
+    width: int
+    height: int
+    client_ts: float
+    data: bytes
+
+
+def encode_media_frame(
+    kind: int,
+    mime_type: str,
+    data: bytes,
+    width: int = 0,
+    height: int = 0,
+    client_ts: float = 0.0,
+) -> bytes:
+    """Build a binary media frame. Used by benchmarks and test clients."""
+    mime_code = _MIME_CODES.get(mime_type)
+    if mime_code is None:
+        raise WireProtocolError(f"Unsupported mime type: {mime_type}")
+    header = MEDIA_HEADER.pack(WIRE_VERSION, kind, mime_code, 0, width, height, client_ts)
+    return header + data
+
+
+def decode_media_frame(message: bytes) -> MediaFrame:
+    """Parse a binary media frame received from a `protocol=1` client."""
+    if len(message) < MEDIA_HEADER.size:
+        raise WireProtocolError(f"Frame too short ({len(message)} bytes)")
+
+    version, kind, mime_code, flags, width, height, client_ts = MEDIA_HEADER.unpack_from(message)
+
+    if version != WIRE_VERSION:
+        raise WireProtocolError(f"Unsupported wire version: {version}")
+    if kind not in (KIND_AUDIO, KIND_VIDEO):
+        raise WireProtocolError(f"Unknown frame kind: {kind}")
+    if mime_code >= len(MIME_TYPES):
+        raise WireProtocolError(f"Unknown mime code: {mime_code}")
+    if flags != 0:
+        raise WireProtocolError(f"Reserved flags must be 0, got {flags:#04x}")
+    mime_type = MIME_TYPES[mime_code]
+    if not mime_type.startswith(_KIND_MIME_PREFIX[kind]):
+        raise WireProtocolError(f"Mime type {mime_type} does not match frame kind {kind}")
+
+    # Single slice copy: the Blob handed to the ADK must own plain bytes.
+    return MediaFrame(
+        kind=kind,
+        mime_type=mime_type,
+        width=width,
+        height=height,
+        client_ts=client_ts,
+        data=message[MEDIA_HEADER.size :],
+    )
+
+
+def encode_audio_frame(turn_id: int, seq: int, mime_type: str, data: bytes) -> bytes:
+    """Build a downstream binary audio frame for an `audio_out=binary` client."""
+    mime_code = _MIME_CODES.get(mime_type)
+    if mime_code is None:
+        raise WireProtocolError(f"Unsupported mime type: {mime_type}")
+    return AUDIO_OUT_HEADER.pack(WIRE_VERSION, KIND_AUDIO_OUT, mime_code, 0, turn_id, seq) + data
+
+
+def split_audio_parts(event: Any) -> tuple[list[Any], Any | None]:
+    """Separate binary-framable audio from an ADK event.
+
+    Returns the audio `Blob`s and a shallow copy of the event without them, or
+    `None` in place of the event when the audio was the only thing it carried.
+    Audio with a mime type outside MIME_TYPES stays inline in the event.
+    """
+    content = event.content
+    if not content or not content.parts:
+        return [], event
+
+    audio: list[Any] = []
+    rest: list[Any] = []
+    for part in content.parts:
+        blob = part.inline_data
+        if blob is not None and blob.data and blob.mime_type in _MIME_CODES and blob.mime_type.startswith("audio/"):
+            audio.append(blob)
+        else:
+            rest.append(part)
+
+    if not audio:
+        return [], event
+
+    if not rest and not _carries_signal(event):
+        return audio, None
+
+    stripped_content = content.model_copy(update={"parts": rest}) if rest else None
+    return audio, event.model_copy(update={"content": stripped_content})
+
+
+def _carries_signal(event: Any) -> bool:
+    """True if the event has anything besides audio that a client acts on."""
+    return bool(
+        event.turn_complete
+        or event.interrupted
+        or event.input_transcription
+        or event.output_transcription
+        or event.error_code
+        or event.usage_metadata
+        or event.live_session_resumption_update
+    )